@@ -0,0 +1,238 @@
+"""
+Streaming Alert Ingestion for Oumi RL
+
+Reads alert feeds in the mock-data format (mock-data/*.json: a JSON array
+of alerts with source, timestamp, location, severity, disaster_type,
+affected_population) or JSONL streams with one alert per line. Large arrays
+are decoded one object at a time from a buffered reader, so memory does not
+grow with the file size.
+
+Alerts are grouped into live disaster events. Each event keeps its alert
+count, highest severity, largest affected population and first/last alert
+times, updated in O(1) per alert. An event's `DisasterState` (for
+OumiRLAgent) or `DisasterStateRepresentation` (for OumiRLPriorityOptimizer)
+can be built at any time. num_alerts is the number of alerts grouped into
+the event, and response_delay is the number of hours since its first alert,
+measured on the feed's own clock (the latest timestamp seen).
+
+Usage:
+    python alert_ingestion.py ../mock-data/flood-alerts.json ../mock-data/earthquake-alerts.json
+    cat alerts.jsonl | python alert_ingestion.py - --resources 12
+"""
+
+import itertools
+import json
+import sys
+from datetime import datetime
+from typing import Callable, Dict, Hashable, IO, Iterable, Iterator, List, Optional
+
+from oumi_rl.encoding import SEVERITY_CODES, SEVERITY_NAMES
+from priority_optimization import DisasterStateRepresentation
+from train_rl_model import DisasterState
+
+
+_CHUNK_SIZE = 1 << 16
+_WHITESPACE = " \t\r\n"
+
+
+def _iter_json_array(f: IO[str], buffer: str) -> Iterator[Dict]:
+    """Decode the objects of a JSON array one at a time"""
+    decoder = json.JSONDecoder()
+    position = buffer.index("[") + 1
+    while True:
+        # Skip separators, pulling more input whenever the buffer runs out
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE + ",":
+                position += 1
+            if position < len(buffer):
+                break
+            buffer, position = f.read(_CHUNK_SIZE), 0
+            if not buffer:
+                raise ValueError("Unterminated JSON array")
+        if buffer[position] == "]":
+            return
+
+        while True:
+            try:
+                alert, end = decoder.raw_decode(buffer, position)
+                break
+            except json.JSONDecodeError:
+                more = f.read(_CHUNK_SIZE)
+                if not more:
+                    raise
+                buffer, position = buffer[position:] + more, 0
+        yield alert
+        position = end
+
+
+def iter_alerts(source: IO[str]) -> Iterator[Dict]:
+    """
+    Stream alerts from a JSON array or JSONL text stream
+
+    The format is detected from the first non-whitespace character.
+    """
+    buffer = ""
+    while not buffer.strip():
+        chunk = source.read(_CHUNK_SIZE)
+        if not chunk:
+            return
+        buffer += chunk
+
+    if buffer.lstrip()[0] == "[":
+        yield from _iter_json_array(source, buffer)
+        return
+
+    # JSONL: finish the partial line in the buffer, then go line by line
+    lines = buffer.split("\n")
+    lines[-1] += source.readline()
+    for line in itertools.chain(lines, source):
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_alert_files(paths: Iterable[str]) -> Iterator[Dict]:
+    """Stream alerts from several files in order; "-" reads stdin"""
+    for path in paths:
+        if path == "-":
+            yield from iter_alerts(sys.stdin)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                yield from iter_alerts(f)
+
+
+def parse_timestamp(value: str) -> float:
+    """ISO 8601 timestamp (e.g. 2024-03-15T08:23:00Z) to epoch seconds"""
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+class DisasterEvent:
+    """Running aggregate of the alerts grouped into one disaster"""
+
+    __slots__ = (
+        'key', 'disaster_type', 'severity', 'num_alerts', 'affected_population',
+        'first_seen', 'last_seen', 'response_delay', 'latitude', 'longitude', 'name',
+    )
+
+    def __init__(self, key: Hashable, alert: Dict, timestamp: float):
+        location = alert.get("location") or {}
+        self.key = key
+        self.disaster_type = alert.get("disaster_type", "earthquake")
+        self.severity = SEVERITY_CODES.get(alert.get("severity"), 1)
+        self.num_alerts = 0
+        self.affected_population = 0
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.response_delay = 0.0
+        self.latitude = location.get("latitude")
+        self.longitude = location.get("longitude")
+        self.name = location.get("name", "")
+
+    def add(self, alert: Dict, timestamp: float):
+        """Fold one alert into the aggregate"""
+        self.num_alerts += 1
+        self.severity = max(self.severity, SEVERITY_CODES.get(alert.get("severity"), 1))
+        self.affected_population = max(self.affected_population, alert.get("affected_population") or 0)
+        self.first_seen = min(self.first_seen, timestamp)
+        self.last_seen = max(self.last_seen, timestamp)
+        self.response_delay = (self.last_seen - self.first_seen) / 3600
+
+    def to_disaster_state(self, now: Optional[float] = None, available_resources: int = 10) -> DisasterState:
+        """State for OumiRLAgent; response_delay is measured up to `now` if given"""
+        delay = self.response_delay if now is None else max(now - self.first_seen, 0.0) / 3600
+        return DisasterState(
+            severity=self.severity,
+            num_alerts=self.num_alerts,
+            response_delay=delay,
+            available_resources=available_resources,
+            disaster_type=self.disaster_type,
+        )
+
+    def to_representation(
+        self,
+        now: Optional[float] = None,
+        available_resources: int = 10
+    ) -> DisasterStateRepresentation:
+        """State for OumiRLPriorityOptimizer"""
+        delay = self.response_delay if now is None else max(now - self.first_seen, 0.0) / 3600
+        return DisasterStateRepresentation(
+            severity=SEVERITY_NAMES[self.severity],
+            disaster_type=self.disaster_type,
+            affected_population=self.affected_population,
+            available_resources=available_resources,
+            time_elapsed=delay,
+        )
+
+    def __repr__(self):
+        return (f"Event({self.name or self.key}, {self.disaster_type}, {SEVERITY_NAMES[self.severity]}, "
+                f"alerts={self.num_alerts}, delay={self.response_delay:.1f}h)")
+
+
+def location_key(alert: Dict) -> Hashable:
+    """Group alerts by disaster type and location name"""
+    return alert.get("disaster_type"), (alert.get("location") or {}).get("name")
+
+
+class AlertAggregator:
+    """
+    Groups a stream of alerts into DisasterEvents
+
+    Args:
+        event_key: Maps an alert to the key of the event it belongs to
+            (default: disaster type and location name)
+    """
+
+    def __init__(self, event_key: Callable[[Dict], Hashable] = location_key):
+        self.event_key = event_key
+        self.events: Dict[Hashable, DisasterEvent] = {}
+        self.clock = float("-inf")
+        self.alerts_seen = 0
+
+    def add(self, alert: Dict) -> DisasterEvent:
+        """Ingest one alert and return the event it was grouped into"""
+        timestamp = parse_timestamp(alert["timestamp"])
+        key = self.event_key(alert)
+        event = self.events.get(key)
+        if event is None:
+            event = self.events[key] = DisasterEvent(key, alert, timestamp)
+        event.add(alert, timestamp)
+
+        self.alerts_seen += 1
+        if timestamp > self.clock:
+            self.clock = timestamp
+        return event
+
+    def ingest(self, alerts: Iterable[Dict]) -> int:
+        """Ingest a stream of alerts; returns how many were read"""
+        count = 0
+        for alert in alerts:
+            self.add(alert)
+            count += 1
+        return count
+
+    def disaster_states(self, available_resources: int = 10) -> List[DisasterState]:
+        """Current DisasterState of every event, delays measured to the feed clock"""
+        return [event.to_disaster_state(self.clock, available_resources) for event in self.events.values()]
+
+    def representations(self, available_resources: int = 10) -> List[DisasterStateRepresentation]:
+        """Current DisasterStateRepresentation of every event"""
+        return [event.to_representation(self.clock, available_resources) for event in self.events.values()]
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Stream alert feeds into live disaster states")
+    parser.add_argument("paths", nargs="+", help="Alert files (JSON array or JSONL); - for stdin")
+    parser.add_argument("--resources", type=int, default=10, help="Available resource units per event")
+    args = parser.parse_args()
+
+    aggregator = AlertAggregator()
+    started = time.perf_counter()
+    count = aggregator.ingest(iter_alert_files(args.paths))
+    elapsed = time.perf_counter() - started
+
+    for event in sorted(aggregator.events.values(), key=lambda e: (-e.severity, -e.num_alerts)):
+        print(f"{event!r:70s} -> {event.to_disaster_state(aggregator.clock, args.resources)}")
+    print(f"\n{count} alerts -> {len(aggregator.events)} events in {elapsed:.3f}s "
+          f"({count / max(elapsed, 1e-9):,.0f} alerts/sec)")
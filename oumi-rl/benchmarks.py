@@ -0,0 +1,295 @@
+"""
+Benchmark Suite for the Oumi RL Hot Paths
+
+Measures, offline and on CPU only:
+- Per-call latency: select_action, the simulator's scalar draws, RewardFunction.calculate,
+  OumiRLPriorityOptimizer.optimize_actions and their batch counterparts
+- Training throughput (episodes/sec) of the train_agent loop, one episode at
+  a time and batched, at several scales (1k, 100k, 1M episodes by default)
+- Peak traced memory of training and the traced size of training_history,
+  measured on a separate run so tracing does not skew the throughput
+- Error of the priority lookup table against exact scoring
+- Process startup: wall time of fresh interpreters importing the package
+  and scoring one disaster, checked against --startup-budget-ms
+
+Results are written as JSON so runs can be compared:
+
+    python benchmarks.py --output bench_before.json
+    python benchmarks.py --output bench_after.json --compare bench_before.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from priority_optimization import DisasterStateRepresentation, OumiRLPriorityOptimizer
+from random_streams import spawn_generators
+from train_rl_model import DisasterSimulator, OumiRLAgent, RewardFunction
+
+
+def _seeded(seed: int) -> Tuple[OumiRLAgent, DisasterSimulator]:
+    """Agent and simulator on streams derived from `seed`, as train_agent builds them"""
+    agent_rng, simulator_rng = spawn_generators(seed, 2)
+    return OumiRLAgent(rng=agent_rng), DisasterSimulator(rng=simulator_rng)
+
+
+def time_per_call(fn: Callable[[], object], calls: int, repeats: int = 5) -> Dict[str, float]:
+    """Median and best microseconds per call over `repeats` runs of `calls` calls"""
+    runs = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        runs.append((time.perf_counter() - started) / calls * 1e6)
+    return {'median_us': float(np.median(runs)), 'best_us': float(min(runs)), 'calls': calls}
+
+
+def bench_latency(calls: int, batch_size: int, seed: int) -> Dict[str, Dict]:
+    """Per-call latency of the scalar hot paths and per-row latency of the batch APIs"""
+    agent, simulator = _seeded(seed)
+    optimizer = OumiRLPriorityOptimizer()
+    lookup_optimizer = OumiRLPriorityOptimizer()
+    lookup_optimizer.enable_lookup_table()
+
+    state = simulator.generate_state()
+    action, _ = agent.select_action(state, explore=False)
+    outcome = simulator.simulate_outcome(state, action)
+    disaster = {'severity': 'critical', 'disaster_type': 'earthquake', 'affected_population': 25000}
+    disaster_state = DisasterStateRepresentation('high', 'flood', 12345, 7, 3.0)
+
+    states = simulator.generate_state_batch(batch_size)
+    actions, _ = agent.select_action_batch(states, explore=False)
+    outcomes = simulator.simulate_outcome_batch(states, actions)
+    disasters = [disaster] * batch_size
+
+    def per_row(fn: Callable[[], object]) -> Dict[str, float]:
+        result = time_per_call(fn, calls=max(calls // batch_size, 3))
+        result['median_us'] /= batch_size
+        result['best_us'] /= batch_size
+        result['batch_size'] = batch_size
+        return result
+
+    return {
+        'select_action_greedy': time_per_call(lambda: agent.select_action(state, explore=False), calls),
+        'select_action_explore': time_per_call(lambda: agent.select_action(state, explore=True), calls),
+        'generate_state': time_per_call(simulator.generate_state, calls),
+        'simulate_outcome': time_per_call(lambda: simulator.simulate_outcome(state, action), calls),
+        'reward_calculate': time_per_call(lambda: RewardFunction.calculate(state, action, outcome), calls),
+        'optimize_actions': time_per_call(lambda: optimizer.optimize_actions(disaster), calls),
+        'calculate_priority': time_per_call(lambda: optimizer.calculate_priority(disaster_state, 'medical'), calls),
+        'calculate_priority_lookup': time_per_call(
+            lambda: lookup_optimizer.calculate_priority(disaster_state, 'medical'), calls
+        ),
+        'select_action_batch_per_row': per_row(lambda: agent.select_action_batch(states, explore=True)),
+        'reward_calculate_batch_per_row': per_row(lambda: RewardFunction.calculate_batch(
+            states.severity, states.num_alerts, states.available_resources,
+            actions.rescue_allocation, actions.medical_deployment, actions.logistics_routing,
+            outcomes['response_time_hours'], outcomes['people_helped'],
+        )),
+        'optimize_actions_batch_per_row': per_row(lambda: optimizer.optimize_actions_batch(disasters)),
+    }
+
+
+def _train(num_episodes: int, batch_size: Optional[int], seed: int) -> Tuple[OumiRLAgent, np.ndarray]:
+    """The train_agent loop without printing or saving"""
+    agent, simulator = _seeded(seed)
+    episode_rewards = np.empty(num_episodes)
+    if batch_size is None:
+        for episode in range(num_episodes):
+            episode_rewards[episode] = simulator.run_episode(agent)
+    else:
+        done = 0
+        while done < num_episodes:
+            size = min(batch_size, num_episodes - done)
+            episode_rewards[done:done + size] = simulator.run_batch(agent, size)
+            done += size
+    return agent, episode_rewards
+
+
+def bench_training(num_episodes: int, batch_size: Optional[int], seed: int) -> Dict:
+    """
+    Episodes/sec and memory of the train_agent loop
+
+    Throughput is timed on a run without tracemalloc, whose per-allocation
+    hooks would slow the scalar loop far more than the batched one. Memory
+    comes from a second, traced run with the same seed: the peak traced
+    during training, and the traced memory released by dropping
+    training_history afterwards.
+    """
+    started = time.perf_counter()
+    _, episode_rewards = _train(num_episodes, batch_size, seed)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    agent, _ = _train(num_episodes, batch_size, seed)
+    current, peak = tracemalloc.get_traced_memory()
+    agent.training_history = None
+    gc.collect()
+    without_history, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'episodes': num_episodes,
+        'batch_size': batch_size,
+        'seconds': elapsed,
+        'episodes_per_sec': num_episodes / elapsed,
+        'peak_traced_mb': peak / 2**20,
+        'training_history_mb': (current - without_history) / 2**20,
+        'mean_reward_last_100': float(np.mean(episode_rewards[-100:])),
+    }
+
+
+# Fresh-interpreter commands timed by bench_startup
+STARTUP_COMMANDS = {
+    'python': ['-c', 'pass'],
+    'import oumi_rl': ['-c', 'import oumi_rl'],
+    'score one disaster (python -m oumi_rl)': [
+        '-m', 'oumi_rl', '{"severity": "critical", "disaster_type": "flood", "affected_population": 25000}',
+    ],
+    'import priority_optimization': ['-c', 'import priority_optimization'],
+    'import train_rl_model': ['-c', 'import train_rl_model'],
+}
+
+
+def bench_startup(repeats: int = 10) -> Dict[str, Dict[str, float]]:
+    """Median and best wall time (ms) of each STARTUP_COMMANDS process"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for name, arguments in STARTUP_COMMANDS.items():
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, *arguments], cwd=here, check=True, stdout=subprocess.DEVNULL)
+            timings.append((time.perf_counter() - started) * 1e3)
+        results[name] = {'median_ms': float(np.median(timings)), 'min_ms': float(np.min(timings))}
+    return results
+
+
+def run_suite(
+    scales: List[int],
+    batch_size: int,
+    max_scalar_episodes: int,
+    latency_calls: int,
+    seed: int,
+) -> Dict:
+    """Run every benchmark and return the results document"""
+    results = {
+        'metadata': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'seed': seed,
+        },
+        'latency': bench_latency(latency_calls, batch_size, seed),
+        'lookup_table_error': OumiRLPriorityOptimizer().enable_lookup_table().error_report(seed=seed),
+        'startup': bench_startup(),
+        'training': [],
+    }
+
+    for scale in scales:
+        if scale <= max_scalar_episodes:
+            results['training'].append(bench_training(scale, None, seed))
+        results['training'].append(bench_training(scale, batch_size, seed))
+
+    return results
+
+
+def compare(current: Dict, baseline: Dict) -> List[str]:
+    """Lines describing the change of each metric against a baseline run"""
+    lines = []
+    for name, result in current['latency'].items():
+        before = baseline.get('latency', {}).get(name)
+        if before:
+            ratio = result['median_us'] / before['median_us']
+            lines.append(f"{name:34s} {before['median_us']:10.3f}us -> {result['median_us']:10.3f}us  x{ratio:.2f}")
+
+    for name, result in current.get('startup', {}).items():
+        before = baseline.get('startup', {}).get(name)
+        if before:
+            ratio = result['median_ms'] / before['median_ms']
+            lines.append(f"startup: {name:25s} {before['median_ms']:8.1f}ms -> {result['median_ms']:8.1f}ms  x{ratio:.2f}")
+
+    previous = {(r['episodes'], r['batch_size']): r for r in baseline.get('training', [])}
+    for result in current['training']:
+        before = previous.get((result['episodes'], result['batch_size']))
+        if before:
+            ratio = result['episodes_per_sec'] / before['episodes_per_sec']
+            label = f"train {result['episodes']} eps, batch={result['batch_size']}"
+            lines.append(
+                f"{label:34s} {before['episodes_per_sec']:10.0f}/s -> {result['episodes_per_sec']:10.0f}/s  x{ratio:.2f}"
+            )
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Oumi RL hot paths (CPU only, offline)")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write JSON results")
+    parser.add_argument("--compare", default=None, help="Baseline results JSON to compare against")
+    parser.add_argument("--scales", default="1000,100000,1000000",
+                        help="Comma-separated training episode counts")
+    parser.add_argument("--batch-size", type=int, default=4096, help="Batch size for batched benchmarks")
+    parser.add_argument("--max-scalar-episodes", type=int, default=100000,
+                        help="Largest scale also run one episode at a time")
+    parser.add_argument("--latency-calls", type=int, default=2000, help="Calls per latency measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quick", action="store_true", help="Small scales for a fast smoke run")
+    parser.add_argument("--startup-budget-ms", type=float, default=None,
+                        help="Exit non-zero if scoring one disaster in a fresh process takes longer")
+    parser.add_argument("--startup-only", action="store_true", help="Only run the startup benchmark")
+    args = parser.parse_args()
+
+    if args.startup_only:
+        startup = bench_startup()
+        for name, result in startup.items():
+            print(f"startup: {name:40s} {result['median_ms']:8.1f} ms (min {result['min_ms']:.1f})")
+        scoring = startup['score one disaster (python -m oumi_rl)']['median_ms']
+        if args.startup_budget_ms is not None and scoring > args.startup_budget_ms:
+            sys.exit(f"startup budget exceeded: {scoring:.1f} ms > {args.startup_budget_ms:.1f} ms")
+        sys.exit(0)
+
+    if args.quick:
+        args.scales, args.max_scalar_episodes, args.latency_calls = "1000,10000", 1000, 500
+
+    results = run_suite(
+        [int(s) for s in args.scales.split(",")],
+        args.batch_size, args.max_scalar_episodes, args.latency_calls, args.seed,
+    )
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    for name, result in results['latency'].items():
+        print(f"{name:34s} {result['median_us']:10.3f} us/call")
+    for result in results['training']:
+        label = f"train {result['episodes']} eps, batch={result['batch_size']}"
+        print(f"{label:34s} {result['episodes_per_sec']:10.0f} eps/s  "
+              f"peak {result['peak_traced_mb']:.1f} MB, history {result['training_history_mb']:.1f} MB")
+    error = results['lookup_table_error']
+    print(f"priority lookup table error: max {max(error['max_error']):.3f}, "
+          f"bound {max(error['error_bound']):.3f} priority points")
+    for name, result in results['startup'].items():
+        print(f"startup: {name:40s} {result['median_ms']:8.1f} ms (min {result['min_ms']:.1f})")
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.compare}:")
+        for line in compare(results, baseline):
+            print(line)
+
+    scoring = results['startup']['score one disaster (python -m oumi_rl)']['median_ms']
+    if args.startup_budget_ms is not None and scoring > args.startup_budget_ms:
+        sys.exit(f"startup budget exceeded: {scoring:.1f} ms > {args.startup_budget_ms:.1f} ms")
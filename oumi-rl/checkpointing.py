@@ -0,0 +1,202 @@
+"""
+Training Checkpoints for Oumi RL
+
+Periodic, atomic snapshots of a training run so a crash does not lose the
+compute spent so far. A checkpoint is a single .npz file holding:
+- Agent weights, hyperparameters and episode counter
+- The agent's and simulator's random streams, including unused buffered
+  draws (see random_streams.py)
+- TrainingHistory and ReplayBuffer contents and cursors
+- Episode rewards so far and the run configuration
+
+Files are written to a temporary name and renamed into place, and only the
+newest `keep` checkpoints are retained. Restoring the latest checkpoint and
+continuing with the same configuration reproduces the uninterrupted run
+bit for bit.
+"""
+
+import glob
+import json
+import os
+from typing import Dict, Optional
+
+import numpy as np
+
+
+CHECKPOINT_PATTERN = "checkpoint_*.npz"
+
+
+def _history_state(history) -> Dict[str, np.ndarray]:
+    arrays = {f"history_{name}": history.column(name) for name in history.COLUMNS}
+    arrays["history_cursor"] = np.array([history.total, len(history), history._next, history._unspilled])
+    if history.spill_dir is not None:
+        # Spill files are append-only; remember their sizes so rows written
+        # after this checkpoint can be truncated away on resume
+        arrays["history_spill_sizes"] = np.array([
+            os.path.getsize(path) if os.path.exists(path) else 0
+            for path in (os.path.join(history.spill_dir, f"{name}.bin") for name in history.COLUMNS)
+        ])
+    return arrays
+
+
+def _restore_history(history, arrays: Dict[str, np.ndarray]):
+    total, size, next_index, unspilled = arrays["history_cursor"].tolist()
+    for name in history.COLUMNS:
+        getattr(history, name)[:size] = arrays[f"history_{name}"]
+    history.total, history._size, history._next, history._unspilled = total, size, next_index, unspilled
+
+    if history.spill_dir is not None and "history_spill_sizes" in arrays:
+        for name, spill_size in zip(history.COLUMNS, arrays["history_spill_sizes"].tolist()):
+            path = os.path.join(history.spill_dir, f"{name}.bin")
+            if os.path.exists(path):
+                with open(path, "r+b") as f:
+                    f.truncate(spill_size)
+
+
+def _replay_state(replay) -> Dict[str, np.ndarray]:
+    size = len(replay)
+    arrays = {
+        f"replay_{name}": getattr(replay, name)[:size]
+        for name in ("features", "action_types", "rewards", "priorities", "next_states", "next_budgets", "dones")
+    }
+    arrays["replay_cursor"] = np.array([size, replay._next])
+    arrays["replay_max_priority"] = np.array(replay._max_priority)
+    return arrays
+
+
+def _restore_replay(replay, arrays: Dict[str, np.ndarray]):
+    size, next_index = arrays["replay_cursor"].tolist()
+    for name in ("features", "action_types", "rewards", "priorities", "next_states", "next_budgets", "dones"):
+        getattr(replay, name)[:size] = arrays[f"replay_{name}"]
+    replay._size, replay._next = size, next_index
+    replay._max_priority = float(arrays["replay_max_priority"])
+
+
+def _rng_state(prefix: str, draws) -> Dict[str, np.ndarray]:
+    return {f"{prefix}_rng_{name}": value for name, value in draws.get_state().items()}
+
+
+def _restore_rng(prefix: str, draws, arrays: Dict[str, np.ndarray]):
+    if f"{prefix}_rng_bit_generator" not in arrays:
+        raise ValueError(f"Checkpoint has no {prefix} random stream to restore")
+    draws.set_state({
+        name[len(prefix) + 5:]: value for name, value in arrays.items() if name.startswith(f"{prefix}_rng_")
+    })
+
+
+def save_checkpoint(
+    directory: str,
+    agent,
+    episode: int,
+    episode_rewards: np.ndarray,
+    config: Dict,
+    extra: Optional[Dict] = None,
+    keep: int = 3,
+    simulator=None,
+) -> str:
+    """
+    Atomically write a checkpoint and rotate old ones
+
+    Args:
+        directory: Checkpoint directory (created if missing)
+        agent: OumiRLAgent being trained
+        episode: Episodes completed so far
+        episode_rewards: Rewards of the completed episodes
+        config: Run configuration; resuming requires the same values
+        extra: Additional JSON-serializable loop state (e.g. sync round)
+        keep: Number of most recent checkpoints to retain, including the new
+            one (at least 1)
+        simulator: DisasterSimulator whose random stream is saved too
+
+    Returns:
+        Path of the new checkpoint
+    """
+    if keep < 1:
+        raise ValueError(f"keep must be at least 1, got {keep}")
+    os.makedirs(directory, exist_ok=True)
+
+    arrays = {f"weights_{k}": v for k, v in agent.weights.items()}
+    arrays.update(_history_state(agent.training_history))
+    if agent.replay is not None:
+        arrays.update(_replay_state(agent.replay))
+    arrays.update(_rng_state("agent", agent.draws))
+    if simulator is not None:
+        arrays.update(_rng_state("simulator", simulator.draws))
+    arrays["episode_rewards"] = np.asarray(episode_rewards[:episode])
+    arrays["metadata"] = np.array(json.dumps({
+        "episode": episode,
+        "episodes_trained": agent.episodes_trained,
+        "hyperparameters": _hyperparameters(agent),
+        "config": config,
+        "extra": extra or {},
+    }))
+
+    path = os.path.join(directory, f"checkpoint_{episode:012d}.npz")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    for old in sorted(glob.glob(os.path.join(directory, CHECKPOINT_PATTERN)))[:-keep]:
+        os.remove(old)
+
+    return path
+
+
+def _hyperparameters(agent) -> Dict[str, float]:
+    return {
+        "learning_rate": agent.learning_rate,
+        "discount_factor": agent.discount_factor,
+        "epsilon": agent.epsilon,
+    }
+
+
+def latest_checkpoint(directory: str) -> Optional[str]:
+    """Path of the newest checkpoint in a directory, if any"""
+    checkpoints = sorted(glob.glob(os.path.join(directory, CHECKPOINT_PATTERN)))
+    return checkpoints[-1] if checkpoints else None
+
+
+def restore_checkpoint(path: str, agent, config: Dict, simulator=None) -> Dict:
+    """
+    Load a checkpoint into `agent` (and `simulator`'s random stream)
+
+    Raises ValueError if the checkpoint was written by a run with a
+    different configuration or if `agent` was built with different
+    hyperparameters, rather than silently continuing with either.
+
+    Returns:
+        Dictionary with episode, episode_rewards and extra loop state
+    """
+    with np.load(path) as data:
+        arrays = {name: data[name] for name in data.files}
+
+    metadata = json.loads(str(arrays["metadata"]))
+    if metadata["config"] != config:
+        raise ValueError(
+            f"Checkpoint {path} was written with {metadata['config']}, cannot resume with {config}"
+        )
+    if metadata["hyperparameters"] != _hyperparameters(agent):
+        raise ValueError(
+            f"Checkpoint {path} was written with hyperparameters {metadata['hyperparameters']}, "
+            f"cannot resume with {_hyperparameters(agent)}"
+        )
+
+    agent.weights = {
+        name[len("weights_"):]: arrays[name].copy() for name in arrays if name.startswith("weights_")
+    }
+    agent.episodes_trained = metadata["episodes_trained"]
+    _restore_history(agent.training_history, arrays)
+    if agent.replay is not None:
+        _restore_replay(agent.replay, arrays)
+    _restore_rng("agent", agent.draws, arrays)
+    if simulator is not None:
+        _restore_rng("simulator", simulator.draws, arrays)
+
+    return {
+        "episode": metadata["episode"],
+        "episode_rewards": arrays["episode_rewards"],
+        "extra": metadata["extra"],
+    }
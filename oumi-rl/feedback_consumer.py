@@ -0,0 +1,333 @@
+"""
+Asynchronous Batched Feedback for OumiRLPriorityOptimizer
+
+Calling `update_from_feedback` inline from a request path applies one
+gradient step per outcome on the caller's time. FeedbackConsumer instead
+takes outcome events from an asyncio queue and applies them in batches:
+- a batch closes when it holds `max_batch` events or `max_delay` seconds
+  after its first event arrived, whichever comes first
+- rewards are computed for the whole batch with calculate_reward_batch
+- one update_from_feedback_batch call applies the mean gradient per action
+  type and publishes the new weights copy-on-write, so scorers never wait
+  for an update and never see a half-updated weight set
+
+An event is a dict:
+
+    {
+        "disaster": {"severity": "high", "disaster_type": "flood",
+                     "affected_population": 20000, "available_resources": 7},
+        "action_type": "rescue",
+        "action_taken": {"estimated_impact": 500, "resources_allocated": 4},
+        "outcome": {"people_helped": 430, "completion_time_hours": 6,
+                    "deadline_hours": 12, "resources_used": 4},
+    }
+
+with an optional precomputed "reward" instead of action_taken / outcome.
+Events with an unknown action type are skipped; malformed events (including
+a severity or disaster_type that is given but not a string) and those with a
+non-finite reward or state feature are counted as invalid and left out of
+the update, so one bad event never fails or poisons its batch.
+
+Usage:
+    python feedback_consumer.py --events 100000 --max-batch 512 --max-delay 0.01
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from oumi_rl.encoding import DISASTER_TYPES, PRIORITY_ACTION_TYPES, SEVERITY_NAMES
+from priority_optimization import OumiRLPriorityOptimizer, calculate_reward_batch, encode_state_matrix
+
+
+EVENT_SECTIONS = ("disaster", "action_taken", "outcome")
+
+
+def is_well_formed(event) -> bool:
+    """Whether an event is a dict whose sections, where present, are dicts"""
+    return isinstance(event, dict) and all(isinstance(event.get(key, {}), dict) for key in EVENT_SECTIONS)
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _float_column(values: List) -> np.ndarray:
+    # Fast path for clean input; values that are not numbers become NaN
+    try:
+        return np.array(values, dtype=float)
+    except (TypeError, ValueError):
+        return np.array([_to_float(v) for v in values], dtype=float)
+
+
+def feedback_columns(events: List[Dict]) -> Dict[str, np.ndarray]:
+    """Column arrays of a list of well-formed events, with calculate_reward's defaults"""
+    disasters = [e.get("disaster", {}) for e in events]
+    taken = [e.get("action_taken", {}) for e in events]
+    outcomes = [e.get("outcome", {}) for e in events]
+    return {
+        "severity": [d.get("severity", "medium") for d in disasters],
+        "disaster_type": [d.get("disaster_type", "earthquake") for d in disasters],
+        "affected_population": _float_column([d.get("affected_population", 1000) for d in disasters]),
+        "available_resources": _float_column([d.get("available_resources", 7) for d in disasters]),
+        "time_elapsed": _float_column([d.get("time_elapsed", 0.0) for d in disasters]),
+        "action_type": [e.get("action_type") for e in events],
+        "estimated_impact": _float_column([a.get("estimated_impact", 1) for a in taken]),
+        "resources_allocated": _float_column([a.get("resources_allocated", 1) for a in taken]),
+        "people_helped": _float_column([o.get("people_helped", 0) for o in outcomes]),
+        "completion_time_hours": _float_column([o.get("completion_time_hours", 24) for o in outcomes]),
+        "deadline_hours": _float_column([o.get("deadline_hours", 24) for o in outcomes]),
+        "resources_used": _float_column([o.get("resources_used", 1) for o in outcomes]),
+        "reward": _float_column([e.get("reward") for e in events]),
+    }
+
+
+class FeedbackConsumer:
+    """
+    Queue-fed, batched feedback updates for one optimizer
+
+    Args:
+        optimizer: Optimizer whose weights are updated and published
+        max_batch: Apply a batch as soon as it holds this many events
+        max_delay: Seconds after a batch's first event before it is applied
+        learning_rate: Step size (default: optimizer.learning_rate)
+        max_queue: Queue bound; submit() waits and submit_nowait() drops
+            events when it is full
+    """
+
+    def __init__(
+        self,
+        optimizer: OumiRLPriorityOptimizer,
+        max_batch: int = 256,
+        max_delay: float = 0.05,
+        learning_rate: Optional[float] = None,
+        max_queue: int = 100_000,
+    ):
+        self.optimizer = optimizer
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.learning_rate = learning_rate
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.stats = {
+            "events": 0, "skipped": 0, "invalid": 0, "dropped": 0,
+            "batches": 0, "failed_batches": 0, "update_seconds": 0.0,
+        }
+        self.last_error: Optional[BaseException] = None  # Last exception raised by a batch in run()
+        self._action_index = {action_type: i for i, action_type in enumerate(optimizer.action_types)}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._batch: List[Dict] = []  # Taken from the queue, not applied yet
+
+    async def submit(self, event: Dict):
+        """Queue one outcome event, waiting while the queue is full"""
+        await self.queue.put(event)
+
+    def submit_nowait(self, event: Dict) -> bool:
+        """Queue one outcome event; False (and counted as dropped) if full"""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            return False
+
+    def submit_threadsafe(self, event: Dict):
+        """Queue an event from a thread outside the consumer's event loop"""
+        self._loop.call_soon_threadsafe(self.submit_nowait, event)
+
+    def apply(self, events: List[Dict]) -> int:
+        """
+        Apply one batch of events now
+
+        Returns: number of events applied (unknown action types are skipped,
+        malformed and non-finite events are counted as invalid)
+        """
+        started = time.perf_counter()
+        well_formed = [e for e in events if is_well_formed(e)]
+        self.stats["invalid"] += len(events) - len(well_formed)
+        events = well_formed
+        if not events:
+            return 0
+
+        columns = feedback_columns(events)
+        indices = np.array([self._action_index.get(t, -1) for t in columns["action_type"]])
+        known = indices >= 0
+        self.stats["skipped"] += int(len(events) - known.sum())
+        if not known.any():
+            return 0
+
+        rewards = calculate_reward_batch(
+            columns["estimated_impact"], columns["resources_allocated"], columns["people_helped"],
+            columns["completion_time_hours"], columns["deadline_hours"], columns["resources_used"],
+        )
+        # A reward that is given but not a number stays NaN and is dropped below
+        precomputed = np.array([e.get("reward") is not None for e in events])
+        rewards = np.where(precomputed, columns["reward"], rewards)
+
+        state_matrix = encode_state_matrix(
+            columns["severity"], columns["disaster_type"], columns["affected_population"],
+            columns["available_resources"], columns["time_elapsed"],
+        )
+        # NaN or inf in one row would spread to its action type's weights
+        valid = np.isfinite(rewards) & np.isfinite(state_matrix).all(axis=1)
+        # Missing labels default to strings in feedback_columns; anything else was sent as-is
+        valid &= np.array([isinstance(severity, str) and isinstance(disaster_type, str)
+                           for severity, disaster_type in zip(columns["severity"], columns["disaster_type"])])
+        keep = known & valid
+        self.stats["invalid"] += int((known & ~valid).sum())
+        if not keep.any():
+            return 0
+        self.optimizer.update_from_feedback_batch(
+            state_matrix[keep], indices[keep], rewards[keep], self.learning_rate
+        )
+
+        applied = int(keep.sum())
+        self.stats["events"] += applied
+        self.stats["batches"] += 1
+        self.stats["update_seconds"] += time.perf_counter() - started
+        return applied
+
+    async def _next_batch(self) -> List[Dict]:
+        batch = self._batch
+        batch.append(await self.queue.get())
+        deadline = asyncio.get_running_loop().time() + self.max_delay
+        while len(batch) < self.max_batch:
+            # Take whatever is already queued before waiting for more
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            remaining = deadline - asyncio.get_running_loop().time()
+            if len(batch) >= self.max_batch or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def run(self):
+        """Consume and apply batches until cancelled; a batch that raises is counted and dropped"""
+        self._loop = asyncio.get_running_loop()
+        # The flag ends the loop even if wait_for swallowed the cancellation
+        while not self._stopping:
+            batch = await self._next_batch()
+            self._batch = []
+            try:
+                self.apply(batch)
+            except Exception as error:
+                self.stats["failed_batches"] += 1
+                self.last_error = error
+
+    def start(self) -> asyncio.Task:
+        """Run the consumer as a task on the current event loop"""
+        self._loop = asyncio.get_running_loop()
+        self._stopping = False
+        self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def drain(self) -> int:
+        """Apply everything queued so far without waiting for the triggers"""
+        applied = 0
+        while not self.queue.empty():
+            batch = [self.queue.get_nowait() for _ in range(min(self.max_batch, self.queue.qsize()))]
+            applied += self.apply(batch)
+        return applied
+
+    async def stop(self) -> int:
+        """Stop the consumer task, then apply the events still queued"""
+        if self._task is not None:
+            self._stopping = True
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        applied = 0
+        if self._batch:
+            batch, self._batch = self._batch, []
+            applied = self.apply(batch)
+        return applied + await self.drain()
+
+
+def random_events(num_events: int, seed: int = 0) -> List[Dict]:
+    """Synthetic outcome events for benchmarking"""
+    rng = np.random.default_rng(seed)
+    events = []
+    for _ in range(num_events):
+        allocated = int(rng.integers(1, 10))
+        events.append({
+            "disaster": {
+                "severity": SEVERITY_NAMES[rng.integers(4)],
+                "disaster_type": DISASTER_TYPES[rng.integers(6)],
+                "affected_population": int(rng.integers(100, 200000)),
+                "available_resources": int(rng.integers(1, 11)),
+            },
+            "action_type": PRIORITY_ACTION_TYPES[rng.integers(4)],
+            "action_taken": {"estimated_impact": int(rng.integers(50, 1000)), "resources_allocated": allocated},
+            "outcome": {
+                "people_helped": int(rng.integers(0, 1500)),
+                "completion_time_hours": float(rng.uniform(1, 36)),
+                "deadline_hours": 24,
+                "resources_used": int(rng.integers(0, allocated + 3)),
+            },
+        })
+    return events
+
+
+async def _benchmark(events: List[Dict], max_batch: int, max_delay: float, producers: int) -> Dict:
+    optimizer = OumiRLPriorityOptimizer()
+    consumer = FeedbackConsumer(optimizer, max_batch=max_batch, max_delay=max_delay)
+    consumer.start()
+
+    async def produce(chunk: List[Dict]):
+        for i, event in enumerate(chunk):
+            await consumer.submit(event)
+            if i % 64 == 0:
+                await asyncio.sleep(0)  # let other producers and the consumer run
+
+    started = time.perf_counter()
+    await asyncio.gather(*(produce(events[i::producers]) for i in range(producers)))
+    await consumer.stop()
+    elapsed = time.perf_counter() - started
+    return {
+        "events_per_sec": len(events) / elapsed,
+        "batches": consumer.stats["batches"],
+        "mean_batch": consumer.stats["events"] / max(consumer.stats["batches"], 1),
+        "weights_version": optimizer.weights_version,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from priority_optimization import DisasterStateRepresentation, calculate_reward
+
+    parser = argparse.ArgumentParser(description="Benchmark batched asynchronous feedback updates")
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--max-batch", type=int, default=512)
+    parser.add_argument("--max-delay", type=float, default=0.01)
+    parser.add_argument("--producers", type=int, default=8, help="Concurrent producer coroutines")
+    args = parser.parse_args()
+
+    events = random_events(args.events)
+
+    optimizer = OumiRLPriorityOptimizer()
+    started = time.perf_counter()
+    for event in events:
+        d = event["disaster"]
+        state = DisasterStateRepresentation(
+            d["severity"], d["disaster_type"], d["affected_population"], d["available_resources"], 0.0
+        )
+        optimizer.update_from_feedback(state, event["action_type"], calculate_reward(event["action_taken"], event["outcome"]))
+    inline = args.events / (time.perf_counter() - started)
+    print(f"inline update_from_feedback: {inline:12,.0f} events/sec")
+
+    result = asyncio.run(_benchmark(events, args.max_batch, args.max_delay, args.producers))
+    print(f"FeedbackConsumer:            {result['events_per_sec']:12,.0f} events/sec "
+          f"({result['batches']} batches, mean size {result['mean_batch']:.0f})")
@@ -0,0 +1,371 @@
+"""
+Hyperparameter Sweeps for Oumi RL
+
+Grid or random search over agent settings (learning_rate, discount_factor,
+epsilon, replay_capacity) and simulator settings (horizon, step_hours),
+run on a process pool.
+
+Trials are trained in rungs. After each rung except the last, trials are
+ranked by their score and only the best `keep_fraction` go on to the next
+rung (successive halving). Rungs end on multiples of the batch size, so
+every rung includes at least one update and resuming at a rung boundary
+splits no batch. Between rungs each trial's state is kept as a checkpoint
+(checkpointing.py), so a trial that runs through every rung learns exactly
+what it would in one uninterrupted run.
+
+A trial's score is the mean reward per decision of its greedy policy on
+one shared set of `eval_states` simulated states (policy_evaluation.py,
+common random numbers). Unlike the rolling "Avg Reward (last 100)" of
+training episodes, which sums rewards over up to `horizon` steps and
+includes exploration, it is comparable across horizons.
+
+Every trial uses the same seed schedule: repeat r of every trial starts
+from seed `seed + r`. Trials therefore get the same initial weights and
+random streams, and differences in score come from the settings. The score
+of a trial is its mean over the repeats.
+
+Results are printed as one table and written to CSV. The best trial's
+policy is exported with save_policy (JSON for .json paths, binary otherwise).
+
+Usage:
+    python hyperparameter_sweep.py --mode grid \\
+        --param learning_rate=0.001,0.01,0.05 --param epsilon=0.1,0.2
+    python hyperparameter_sweep.py --mode random --trials 16 \\
+        --param learning_rate=0.001:0.05 --param horizon=1,3,5 --workers 4
+"""
+
+import itertools
+import math
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from checkpointing import latest_checkpoint, restore_checkpoint, save_checkpoint
+from policy_evaluation import agent_policy, evaluate_policies
+from random_streams import spawn_generators
+from train_rl_model import DisasterSimulator, OumiRLAgent
+
+
+# Values are a list of choices, or a (low, high) range for random search
+SearchSpace = Dict[str, Union[List, Tuple[float, float]]]
+
+DEFAULT_PARAMS = {
+    'learning_rate': 0.01,
+    'discount_factor': 0.95,
+    'epsilon': 0.2,
+    'replay_capacity': 0,
+    'horizon': 1,
+    'step_hours': 2.0,
+}
+
+DEFAULT_SPACE: SearchSpace = {
+    'learning_rate': [0.001, 0.01, 0.05],
+    'discount_factor': [0.9, 0.95],
+    'epsilon': [0.1, 0.2],
+}
+
+
+def grid_trials(space: SearchSpace) -> List[Dict]:
+    """Every combination of the listed values"""
+    names = list(space)
+    for name in names:
+        if isinstance(space[name], tuple):
+            raise ValueError(f"Grid search needs a list of values for {name}, got range {space[name]}")
+    return [{**DEFAULT_PARAMS, **dict(zip(names, values))}
+            for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_trials(space: SearchSpace, num_trials: int, seed: int = 0) -> List[Dict]:
+    """`num_trials` samples: uniform over ranges, uniform choice from lists"""
+    rng = np.random.default_rng(seed)
+    trials = []
+    for _ in range(num_trials):
+        params = dict(DEFAULT_PARAMS)
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                params[name] = float(rng.uniform(*values))
+            else:
+                params[name] = values[int(rng.integers(len(values)))]
+        trials.append(params)
+    return trials
+
+
+def _trial_dir(sweep_dir: str, trial: int, repeat: int) -> str:
+    return os.path.join(sweep_dir, f"trial_{trial:04d}", f"repeat_{repeat}")
+
+
+def _make_agent(params: Dict, rng: Optional[np.random.Generator] = None) -> OumiRLAgent:
+    return OumiRLAgent(
+        learning_rate=params['learning_rate'],
+        discount_factor=params['discount_factor'],
+        epsilon=params['epsilon'],
+        history_capacity=1000,
+        replay_capacity=int(params['replay_capacity']),
+        rng=rng,
+    )
+
+
+def _run_segment(
+    params: Dict,
+    trial: int,
+    repeat: int,
+    stop: int,
+    batch_size: int,
+    seed: int,
+    sweep_dir: str,
+    eval_states: int = 10000,
+) -> Tuple[int, int, float, float, float]:
+    """
+    Train one (trial, repeat) from its last checkpoint up to `stop` episodes
+
+    Returns: (trial, repeat, rolling average reward of the last 100 episodes,
+    greedy evaluation reward on the states of `seed`, seconds)
+    """
+    started = time.perf_counter()
+    agent_rng, simulator_rng = spawn_generators(seed + repeat, 2)
+
+    agent = _make_agent(params, agent_rng)
+    simulator = DisasterSimulator(step_hours=params['step_hours'], rng=simulator_rng)
+    horizon = int(params['horizon'])
+    config = {'params': params, 'batch_size': batch_size, 'seed': seed + repeat}
+
+    directory = _trial_dir(sweep_dir, trial, repeat)
+    episode_rewards = np.empty(stop)
+    done = 0
+    checkpoint_path = latest_checkpoint(directory)
+    if checkpoint_path is not None:
+        restored = restore_checkpoint(checkpoint_path, agent, config, simulator)
+        done = restored['episode']
+        episode_rewards[:done] = restored['episode_rewards']
+
+    while done < stop:
+        size = min(batch_size, stop - done)
+        if horizon > 1:
+            episode_rewards[done:done + size] = simulator.run_multistep_batch(agent, size, horizon)
+        else:
+            episode_rewards[done:done + size] = simulator.run_batch(agent, size)
+        done += size
+
+    save_checkpoint(directory, agent, stop, episode_rewards, config, keep=1, simulator=simulator)
+    # The base seed (not seed + repeat), so every trial and repeat sees the same states
+    evaluation = evaluate_policies({'greedy': agent_policy(agent)}, eval_states, seed)
+    return (
+        trial, repeat, float(np.mean(episode_rewards[-100:])),
+        evaluation['policies']['greedy']['mean'], time.perf_counter() - started,
+    )
+
+
+def rung_schedule(num_episodes: int, num_rungs: int, batch_size: int = 1) -> List[int]:
+    """
+    Episode counts at the end of each rung, doubling up to num_episodes
+
+    Each count is rounded up to a multiple of batch_size (capped at
+    num_episodes) so every rung trains at least one batch; rungs that
+    collapse onto the same count are merged.
+    """
+    milestones = []
+    for r in range(num_rungs):
+        stop = max(num_episodes >> (num_rungs - 1 - r), 1)
+        stop = min(-(-stop // batch_size) * batch_size, num_episodes)
+        if not milestones or stop > milestones[-1]:
+            milestones.append(stop)
+    return milestones
+
+
+def run_sweep(
+    trials: Sequence[Dict],
+    num_episodes: int = 20000,
+    batch_size: int = 1024,
+    num_workers: int = 1,
+    num_rungs: int = 3,
+    keep_fraction: float = 0.5,
+    repeats: int = 1,
+    seed: int = 0,
+    sweep_dir: str = "sweep_runs",
+    eval_states: int = 10000,
+) -> List[Dict]:
+    """
+    Train every trial with successive-halving early stopping
+
+    Args:
+        trials: Parameter dictionaries (see grid_trials / random_trials)
+        num_episodes: Episodes for trials that survive every rung
+        batch_size: Simulation batch size
+        num_workers: Worker processes
+        num_rungs: Number of rungs; rung r ends at num_episodes / 2**(rungs-1-r),
+            rounded up to a multiple of batch_size
+        keep_fraction: Fraction of trials promoted after each rung
+        repeats: Seeds per trial (seed, seed + 1, ...), shared by all trials
+        seed: Base seed of the shared schedule and of the evaluation states
+        sweep_dir: Directory for per-trial checkpoints
+        eval_states: Simulated states each trial's greedy policy is scored on
+
+    Returns:
+        One result per trial, best first: trial, params, status,
+        episodes, eval_reward, avg_reward_last_100, seconds
+    """
+    results = [
+        {'trial': i, 'params': params, 'status': 'running', 'episodes': 0,
+         'eval_reward': float('-inf'), 'avg_reward_last_100': float('-inf'), 'seconds': 0.0}
+        for i, params in enumerate(trials)
+    ]
+    active = list(range(len(trials)))
+    milestones = rung_schedule(num_episodes, num_rungs, batch_size)
+
+    # Checkpoints left over from an earlier sweep would be resumed from
+    if os.path.isdir(sweep_dir):
+        for name in os.listdir(sweep_dir):
+            if name.startswith("trial_"):
+                shutil.rmtree(os.path.join(sweep_dir, name))
+
+    with ProcessPoolExecutor(max_workers=num_workers) as pool:
+        for rung, stop in enumerate(milestones):
+            futures = [
+                pool.submit(_run_segment, trials[i], i, repeat, stop, batch_size, seed, sweep_dir, eval_states)
+                for i in active for repeat in range(repeats)
+            ]
+            rolling: Dict[int, List[float]] = {i: [] for i in active}
+            scores: Dict[int, List[float]] = {i: [] for i in active}
+            for future in futures:
+                trial, _, avg_reward, score, seconds = future.result()
+                rolling[trial].append(avg_reward)
+                scores[trial].append(score)
+                results[trial]['seconds'] += seconds
+
+            for i in active:
+                results[i]['episodes'] = stop
+                results[i]['avg_reward_last_100'] = float(np.mean(rolling[i]))
+                results[i]['eval_reward'] = float(np.mean(scores[i]))
+
+            ranked = sorted(active, key=lambda i: results[i]['eval_reward'], reverse=True)
+            print(f"Rung {rung + 1}/{len(milestones)} | Episode {stop} | {len(active)} trials | "
+                  f"best eval reward: {results[ranked[0]]['eval_reward']:.2f}")
+
+            if rung < len(milestones) - 1:
+                keep = max(1, math.ceil(len(active) * keep_fraction))
+                for i in ranked[keep:]:
+                    results[i]['status'] = f"stopped@{stop}"
+                active = ranked[:keep]
+
+    for i in active:
+        results[i]['status'] = 'completed'
+    return sorted(results, key=lambda r: (r['status'] == 'completed', r['eval_reward']), reverse=True)
+
+
+def remove_trial_dirs(sweep_dir: str, num_trials: int, remove_sweep_dir: bool = False):
+    """
+    Delete the checkpoints of trials 0..num_trials-1 and nothing else
+
+    With remove_sweep_dir, `sweep_dir` itself is removed too if that leaves
+    it empty (pass it only when the sweep created the directory).
+    """
+    for trial in range(num_trials):
+        shutil.rmtree(os.path.dirname(_trial_dir(sweep_dir, trial, 0)), ignore_errors=True)
+    if remove_sweep_dir and os.path.isdir(sweep_dir) and not os.listdir(sweep_dir):
+        os.rmdir(sweep_dir)
+
+
+def format_table(results: List[Dict]) -> str:
+    """Results as an aligned text table"""
+    names = list(results[0]['params']) if results else []
+    header = ['trial'] + names + ['status', 'episodes', 'eval_reward', 'avg_reward_last_100', 'seconds']
+    rows = [
+        [str(r['trial'])] + [f"{r['params'][n]:g}" if isinstance(r['params'][n], float) else str(r['params'][n])
+                             for n in names]
+        + [r['status'], str(r['episodes']), f"{r['eval_reward']:.3f}", f"{r['avg_reward_last_100']:.3f}",
+           f"{r['seconds']:.2f}"]
+        for r in results
+    ]
+    widths = [max(len(cell) for cell in column) for column in zip(header, *rows)]
+    return "\n".join(" | ".join(cell.ljust(w) for cell, w in zip(row, widths)) for row in [header] + rows)
+
+
+def write_results_csv(results: List[Dict], filepath: str):
+    """Write one row per trial, parameters flattened into columns"""
+    import csv
+
+    names = list(results[0]['params']) if results else []
+    with open(filepath, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(['trial'] + names + ['status', 'episodes', 'eval_reward', 'avg_reward_last_100', 'seconds'])
+        for r in results:
+            writer.writerow([r['trial']] + [r['params'][n] for n in names]
+                            + [r['status'], r['episodes'], r['eval_reward'], r['avg_reward_last_100'], r['seconds']])
+
+
+def export_best_policy(best: Dict, batch_size: int, seed: int, sweep_dir: str, output_path: str) -> OumiRLAgent:
+    """Load the best trial's final checkpoint (repeat 0) and save its policy"""
+    agent = _make_agent(best['params'])
+    config = {'params': best['params'], 'batch_size': batch_size, 'seed': seed}
+    restore_checkpoint(latest_checkpoint(_trial_dir(sweep_dir, best['trial'], 0)), agent, config)
+    agent.save_policy(output_path)
+    return agent
+
+
+def _parse_value(text: str):
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_param(spec: str) -> Tuple[str, Union[List, Tuple[float, float]]]:
+    """Parse 'name=a,b,c' (choices) or 'name=low:high' (range)"""
+    name, _, values = spec.partition("=")
+    if name not in DEFAULT_PARAMS:
+        raise ValueError(f"Unknown parameter {name!r}; expected one of {sorted(DEFAULT_PARAMS)}")
+    if ":" in values:
+        low, high = values.split(":")
+        return name, (float(low), float(high))
+    return name, [_parse_value(v) for v in values.split(",")]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Grid or random hyperparameter search for OumiRLAgent")
+    parser.add_argument("--mode", choices=["grid", "random"], default="grid")
+    parser.add_argument("--param", action="append", default=[],
+                        help="name=v1,v2,... or name=low:high (random mode); repeatable")
+    parser.add_argument("--trials", type=int, default=16, help="Number of trials in random mode")
+    parser.add_argument("--episodes", type=int, default=20000, help="Episodes for fully trained trials")
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--rungs", type=int, default=3, help="Early-stopping rungs")
+    parser.add_argument("--keep-fraction", type=float, default=0.5, help="Fraction promoted per rung")
+    parser.add_argument("--repeats", type=int, default=1, help="Seeds per trial")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--eval-states", type=int, default=10000,
+                        help="Simulated states each trial's greedy policy is scored on")
+    parser.add_argument("--sweep-dir", default="sweep_runs", help="Directory for trial checkpoints")
+    parser.add_argument("--results", default="sweep_results.csv", help="Where to write the results table")
+    parser.add_argument("--output", default="best_policy.json", help="Where to export the best policy")
+    parser.add_argument("--keep-checkpoints", action="store_true",
+                        help="Keep the trial checkpoints in --sweep-dir afterwards")
+    args = parser.parse_args()
+
+    space = dict(parse_param(spec) for spec in args.param) if args.param else DEFAULT_SPACE
+    trials = grid_trials(space) if args.mode == "grid" else random_trials(space, args.trials, args.seed)
+    print(f"Sweeping {len(trials)} trials ({args.mode}) over {', '.join(space)}\n")
+    created_sweep_dir = not os.path.exists(args.sweep_dir)
+
+    results = run_sweep(
+        trials, args.episodes, args.batch_size, args.workers, args.rungs,
+        args.keep_fraction, args.repeats, args.seed, args.sweep_dir, args.eval_states,
+    )
+
+    print("\n" + format_table(results))
+    write_results_csv(results, args.results)
+    export_best_policy(results[0], args.batch_size, args.seed, args.sweep_dir, args.output)
+    if not args.keep_checkpoints:
+        remove_trial_dirs(args.sweep_dir, len(trials), remove_sweep_dir=created_sweep_dir)
+
+    print(f"\nResults written to {args.results}")
+    print(f"Best trial {results[0]['trial']}: {results[0]['params']}")
+    print(f"Best policy saved to {args.output}")
@@ -0,0 +1,424 @@
+"""
+Local SQLite Stand-in for the Supabase RL Tables
+
+Mirrors `disasters`, `priority_actions`, `rl_decisions` and
+`rl_training_data` from supabase/migrations in one SQLite file, with the
+same indexes, so training and evaluation can run offline:
+- bulk `executemany` inserts, including simulator output (insert_simulated)
+- aggregations computed by SQLite (action_type_stats, decision_rewards)
+- a chunked cursor reader over rl_training_data whose rows go straight into
+  offline_training.rows_to_batch and apply_optimizer_batch / apply_agent_batch
+
+Postgres types map to SQLite as: uuid and timestamptz -> TEXT (ISO 8601 UTC,
+so text order is time order), jsonb -> TEXT holding JSON, boolean -> INTEGER.
+
+Usage:
+    python local_store.py generate --db rl_local.db --episodes 100000
+    python local_store.py stats --db rl_local.db
+    python local_store.py train --db rl_local.db --target optimizer --output offline_policy.json
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from oumi_rl.encoding import DISASTER_TYPES, SEVERITY_NAMES
+from offline_training import apply_agent_batch, apply_optimizer_batch, rows_to_batch
+from priority_optimization import OumiRLPriorityOptimizer
+from train_rl_model import ACTION_TYPES, DisasterSimulator, OumiRLAgent
+
+
+_NOW = "(strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))"
+_UUID = "(lower(hex(randomblob(16))))"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS disasters (
+  id text PRIMARY KEY DEFAULT {_UUID},
+  title text NOT NULL,
+  description text NOT NULL,
+  disaster_type text NOT NULL,
+  severity text NOT NULL DEFAULT 'medium',
+  latitude real NOT NULL,
+  longitude real NOT NULL,
+  affected_population integer DEFAULT 0,
+  status text NOT NULL DEFAULT 'active',
+  metadata text DEFAULT '{{}}',
+  created_at text DEFAULT {_NOW},
+  updated_at text DEFAULT {_NOW}
+);
+
+CREATE TABLE IF NOT EXISTS priority_actions (
+  id text PRIMARY KEY DEFAULT {_UUID},
+  disaster_id text NOT NULL REFERENCES disasters(id) ON DELETE CASCADE,
+  action_type text NOT NULL,
+  description text NOT NULL,
+  priority_score real DEFAULT 50.0,
+  status text NOT NULL DEFAULT 'pending',
+  assigned_resources text DEFAULT '[]',
+  estimated_impact integer DEFAULT 0,
+  deadline text,
+  completed_at text,
+  created_at text DEFAULT {_NOW}
+);
+
+CREATE TABLE IF NOT EXISTS rl_decisions (
+  id text PRIMARY KEY DEFAULT {_UUID},
+  disaster_id text NOT NULL REFERENCES disasters(id) ON DELETE CASCADE,
+  state_snapshot text NOT NULL,
+  action_taken text NOT NULL,
+  reward real DEFAULT 0.0,
+  model_version text DEFAULT 'v1.0',
+  created_at text DEFAULT {_NOW}
+);
+
+CREATE TABLE IF NOT EXISTS rl_training_data (
+  id text PRIMARY KEY DEFAULT {_UUID},
+  action_id text REFERENCES priority_actions(id) ON DELETE CASCADE,
+  disaster_id text REFERENCES disasters(id) ON DELETE CASCADE,
+  action_type text NOT NULL,
+  success integer DEFAULT 1,
+  completion_time text DEFAULT {_NOW},
+  initial_priority_score real DEFAULT 0,
+  final_priority_score real DEFAULT 0,
+  actual_impact integer DEFAULT 0,
+  estimated_impact integer DEFAULT 0,
+  reward_score real DEFAULT 0,
+  metadata text DEFAULT '{{}}',
+  created_at text DEFAULT {_NOW}
+);
+
+CREATE INDEX IF NOT EXISTS idx_disasters_status ON disasters(status);
+CREATE INDEX IF NOT EXISTS idx_disasters_severity ON disasters(severity);
+CREATE INDEX IF NOT EXISTS idx_disasters_created_at ON disasters(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_priority_actions_disaster_id ON priority_actions(disaster_id);
+CREATE INDEX IF NOT EXISTS idx_priority_actions_status ON priority_actions(status);
+CREATE INDEX IF NOT EXISTS idx_priority_actions_priority_score ON priority_actions(priority_score DESC);
+CREATE INDEX IF NOT EXISTS idx_rl_decisions_disaster_id ON rl_decisions(disaster_id);
+CREATE INDEX IF NOT EXISTS idx_rl_training_action_id ON rl_training_data(action_id);
+CREATE INDEX IF NOT EXISTS idx_rl_training_disaster_id ON rl_training_data(disaster_id);
+CREATE INDEX IF NOT EXISTS idx_rl_training_action_type ON rl_training_data(action_type);
+CREATE INDEX IF NOT EXISTS idx_rl_training_success ON rl_training_data(success);
+CREATE INDEX IF NOT EXISTS idx_rl_training_created_at ON rl_training_data(created_at DESC);
+"""
+
+TABLES = ("disasters", "priority_actions", "rl_decisions", "rl_training_data")
+
+# metadata fields read by offline_training.rows_to_batch, extracted by SQLite
+# so the reader hands over flat rows and no JSON is parsed in Python
+TRAINING_METADATA_FIELDS = (
+    "severity", "disaster_type", "affected_population", "available_resources", "time_elapsed",
+    "num_alerts", "rescue_allocation", "medical_deployment", "logistics_routing",
+    "resources_allocated", "resources_used", "completion_time_hours", "deadline_hours",
+)
+
+
+# Floats are bound as repr() text and embedded with json(): json_object
+# would print bound REALs with 15 significant digits and lose precision
+_STATE_JSON = ("'severity', ?, 'disaster_type', ?, 'num_alerts', ?, 'time_elapsed', json(?), "
+               "'available_resources', ?")
+_ALLOCATION_JSON = "'rescue_allocation', ?, 'medical_deployment', ?, 'logistics_routing', ?"
+
+
+def _timestamps(start_time: datetime, offset: int, count: int) -> List[str]:
+    """ISO 8601 UTC timestamps one second apart, from start_time + offset seconds"""
+    start = np.datetime64(start_time.astimezone(timezone.utc).replace(tzinfo=None), "ms")
+    moments = start + (np.arange(offset, offset + count) * 1000).astype("timedelta64[ms]")
+    return [f"{moment}Z" for moment in np.datetime_as_string(moments, unit="ms").tolist()]
+
+
+def _ids(count: int) -> List[str]:
+    """Random 128-bit hex ids, as the schema's id default generates"""
+    blob = os.urandom(16 * count).hex()
+    return [blob[i:i + 32] for i in range(0, 32 * count, 32)]
+
+
+def _sql_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+class LocalStore:
+    """
+    SQLite database with the Supabase RL schema
+
+    Args:
+        path: Database file, or ":memory:"
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode = WAL")
+            self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def insert_many(self, table: str, rows: Sequence[Dict], chunk_size: int = 50_000) -> int:
+        """
+        Insert dict rows with executemany in one transaction
+
+        Every row must have the same keys; dict and list values are stored as
+        JSON. Omitted columns take the schema defaults.
+
+        Returns: number of rows inserted
+        """
+        if table not in TABLES:
+            raise ValueError(f"Unknown table {table!r}; expected one of {', '.join(TABLES)}")
+        if not rows:
+            return 0
+        columns = list(rows[0])
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        with self.connection:
+            for start in range(0, len(rows), chunk_size):
+                self.connection.executemany(
+                    sql, ([_sql_value(row[c]) for c in columns] for row in rows[start:start + chunk_size])
+                )
+        return len(rows)
+
+    def insert_simulated(
+        self,
+        num_episodes: int,
+        agent: Optional[OumiRLAgent] = None,
+        batch_size: int = 10_000,
+        model_version: str = "simulated",
+        start_time: Optional[datetime] = None,
+        simulator: Optional[DisasterSimulator] = None,
+    ) -> int:
+        """
+        Run single-step simulator episodes and store them in all four tables
+
+        Each episode becomes one disaster, the priority action the agent chose
+        (epsilon-greedy), its rl_decisions row and its rl_training_data row.
+        The training row's metadata holds the state, allocations and outcome,
+        so reading it back reproduces the agent's features and reward. States
+        and outcome noise come from `simulator` (default: unseeded).
+
+        Returns: number of episodes stored
+        """
+        agent = agent or OumiRLAgent()
+        simulator = simulator or DisasterSimulator()
+        start_time = start_time or datetime.now(timezone.utc)
+        done = 0
+
+        while done < num_episodes:
+            size = min(batch_size, num_episodes - done)
+            states = simulator.generate_state_batch(size)
+            actions, action_types = agent.select_action_batch(states, explore=True)
+            outcomes = simulator.simulate_outcome_batch(states, actions)
+            rewards = simulator.reward_fn.calculate_batch(
+                states.severity, states.num_alerts, states.available_resources,
+                actions.rescue_allocation, actions.medical_deployment, actions.logistics_routing,
+                outcomes['response_time_hours'], outcomes['people_helped'],
+            )
+            # Expected people helped without the simulator's noise
+            estimated = ((states.severity + 1) * 250 * outcomes['resources_used'] / 15.0).astype(np.int64)
+            priority = np.clip(rewards, 0, 100)
+
+            # Rows are built column-wise; the JSON columns are assembled by
+            # SQLite's json_object from plain values
+            created_at = _timestamps(start_time, done, size)
+            disaster_ids, action_ids, decision_ids, training_ids = (_ids(size) for _ in range(4))
+            severity = np.array(SEVERITY_NAMES)[states.severity].tolist()
+            disaster_type = np.array(DISASTER_TYPES)[states.disaster_type].tolist()
+            action_type = np.array(ACTION_TYPES)[action_types].tolist()
+            num_alerts = states.num_alerts.tolist()
+            state = (severity, disaster_type, num_alerts, list(map(repr, states.response_delay.tolist())),
+                     states.available_resources.tolist())
+            allocation = (actions.rescue_allocation.tolist(), actions.medical_deployment.tolist(),
+                          actions.logistics_routing.tolist())
+            reward, score, estimate = rewards.tolist(), priority.tolist(), estimated.tolist()
+
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT INTO disasters (id, title, description, disaster_type, severity, latitude, longitude,"
+                    " metadata, created_at) VALUES (?, 'Simulated ' || ?, 'Generated by local_store.insert_simulated',"
+                    " ?, ?, 0.0, 0.0, json_object('num_alerts', ?), ?)",
+                    zip(disaster_ids, disaster_type, disaster_type, severity, num_alerts, created_at))
+                self.connection.executemany(
+                    "INSERT INTO priority_actions (id, disaster_id, action_type, description, priority_score, status,"
+                    " assigned_resources, estimated_impact, created_at) VALUES (?, ?, ?, ? || ' response', ?,"
+                    " 'completed', json_object(" + _ALLOCATION_JSON + "), ?, ?)",
+                    zip(action_ids, disaster_ids, action_type, action_type, score, *allocation, estimate, created_at))
+                self.connection.executemany(
+                    "INSERT INTO rl_decisions (id, disaster_id, state_snapshot, action_taken, reward, model_version,"
+                    " created_at) VALUES (?, ?, json_object(" + _STATE_JSON + "),"
+                    " json_object('action_type', ?, " + _ALLOCATION_JSON + "), ?, ?, ?)",
+                    zip(decision_ids, disaster_ids, *state, action_type, *allocation, reward,
+                        [model_version] * size, created_at))
+                self.connection.executemany(
+                    "INSERT INTO rl_training_data (id, action_id, disaster_id, action_type, success, completion_time,"
+                    " initial_priority_score, actual_impact, estimated_impact, reward_score, metadata, created_at)"
+                    " VALUES (?, ?, ?, ?, ? > 0, ?, ?, ?, ?, ?, json_object(" + _STATE_JSON + ", "
+                    + _ALLOCATION_JSON + ", 'resources_used', ?, 'completion_time_hours', json(?)), ?)",
+                    zip(training_ids, action_ids, disaster_ids, action_type, reward, created_at, score,
+                        outcomes['people_helped'].tolist(), estimate, reward, *state, *allocation,
+                        outcomes['resources_used'].tolist(), list(map(repr, outcomes['response_time_hours'].tolist())),
+                        created_at))
+            done += size
+
+        return done
+
+    def count(self, table: str) -> int:
+        if table not in TABLES:
+            raise ValueError(f"Unknown table {table!r}; expected one of {', '.join(TABLES)}")
+        return self.connection.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+
+    def action_type_stats(self, since: Optional[str] = None) -> Dict[str, Dict]:
+        """
+        Per-action-type aggregates of rl_training_data, computed in SQLite
+
+        Returns: {action_type: {rows, mean_reward, success_rate,
+        mean_actual_impact, mean_estimated_impact}}
+        """
+        sql = (
+            "SELECT action_type, count(*), avg(reward_score), avg(success), avg(actual_impact), avg(estimated_impact)"
+            " FROM rl_training_data"
+        )
+        params: List = []
+        if since is not None:
+            sql += " WHERE created_at >= ?"
+            params.append(since)
+        sql += " GROUP BY action_type ORDER BY action_type"
+        return {
+            action_type: {
+                "rows": rows, "mean_reward": reward, "success_rate": success,
+                "mean_actual_impact": actual, "mean_estimated_impact": estimated,
+            }
+            for action_type, rows, reward, success, actual, estimated in self.connection.execute(sql, params)
+        }
+
+    def decision_rewards(self) -> Dict[str, Dict]:
+        """Per-model_version decision count and mean / min / max reward of rl_decisions"""
+        sql = (
+            "SELECT model_version, count(*), avg(reward), min(reward), max(reward)"
+            " FROM rl_decisions GROUP BY model_version ORDER BY model_version"
+        )
+        return {
+            version: {"decisions": n, "mean_reward": mean, "min_reward": low, "max_reward": high}
+            for version, n, mean, low, high in self.connection.execute(sql)
+        }
+
+    def iter_training_chunks(
+        self,
+        chunk_size: int = 10_000,
+        action_type: Optional[str] = None,
+        success: Optional[bool] = None,
+        since: Optional[str] = None,
+        after_rowid: int = 0,
+    ) -> Iterator[Tuple[List[Dict], int]]:
+        """
+        Stream rl_training_data in insertion order, chunk_size rows at a time
+
+        Rows are flat dicts in the shape offline_training.rows_to_batch
+        expects (metadata fields are extracted into columns by SQLite). The
+        filters use the action_type, success and created_at indexes.
+
+        Yields: (rows, last_rowid); pass last_rowid back as after_rowid to
+        continue from there
+        """
+        extracted = ", ".join(f"json_extract(metadata, '$.{field}') AS {field}" for field in TRAINING_METADATA_FIELDS)
+        sql = (
+            f"SELECT rowid, action_type, success, actual_impact, estimated_impact, reward_score, {extracted}"
+            " FROM rl_training_data WHERE rowid > ?"
+        )
+        params: List = [after_rowid]
+        if action_type is not None:
+            sql += " AND action_type = ?"
+            params.append(action_type)
+        if success is not None:
+            sql += " AND success = ?"
+            params.append(int(success))
+        if since is not None:
+            sql += " AND created_at >= ?"
+            params.append(since)
+        sql += " ORDER BY rowid"
+
+        cursor = self.connection.execute(sql, params)
+        names = [column[0] for column in cursor.description]
+        while True:
+            fetched = cursor.fetchmany(chunk_size)
+            if not fetched:
+                return
+            yield [dict(zip(names, row)) for row in fetched], fetched[-1][0]
+
+
+def train_from_store(
+    store: LocalStore,
+    target: str = "optimizer",
+    chunk_size: int = 10_000,
+    model=None,
+    **filters,
+):
+    """
+    Train the optimizer or agent from rl_training_data, one minibatch per chunk
+
+    Same updates as offline_training.train_offline on an export of the table.
+
+    Returns: (model, rows_trained)
+    """
+    if model is None:
+        model = OumiRLPriorityOptimizer() if target == "optimizer" else OumiRLAgent(history_capacity=chunk_size)
+    apply_batch = apply_optimizer_batch if target == "optimizer" else apply_agent_batch
+    rows_trained = 0
+    for rows, _ in store.iter_training_chunks(chunk_size, **filters):
+        rows_trained += apply_batch(model, rows_to_batch(rows))
+    return model, rows_trained
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from random_streams import spawn_generators
+
+    parser = argparse.ArgumentParser(description="Local SQLite copy of the Supabase RL tables")
+    parser.add_argument("command", choices=["generate", "stats", "train"])
+    parser.add_argument("--db", default="rl_local.db", help="SQLite database file")
+    parser.add_argument("--episodes", type=int, default=100000, help="Simulated episodes to insert (generate)")
+    parser.add_argument("--policy", default=None, help="Agent policy used to generate actions")
+    parser.add_argument("--target", choices=["optimizer", "agent"], default="optimizer")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--output", default="offline_policy.json", help="Where to write learned weights (train)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    store = LocalStore(args.db)
+    started = time.perf_counter()
+    if args.command == "generate":
+        agent_rng, simulator_rng = spawn_generators(args.seed, 2)
+        agent = OumiRLAgent(rng=agent_rng)
+        if args.policy:
+            agent.load_policy(args.policy)
+        count = store.insert_simulated(args.episodes, agent, simulator=DisasterSimulator(rng=simulator_rng))
+        elapsed = time.perf_counter() - started
+        print(f"Inserted {count} episodes into {args.db} in {elapsed:.2f}s ({count / elapsed:,.0f} episodes/sec)")
+    elif args.command == "stats":
+        for table in TABLES:
+            print(f"{table:18s} {store.count(table):10d} rows")
+        print()
+        for action_type, stats in store.action_type_stats().items():
+            print(f"{action_type:14s} rows {stats['rows']:8d} | mean reward {stats['mean_reward']:7.2f} | "
+                  f"success {stats['success_rate']:.1%} | impact {stats['mean_actual_impact']:.0f}"
+                  f" (est. {stats['mean_estimated_impact']:.0f})")
+        for version, stats in store.decision_rewards().items():
+            print(f"model {version}: {stats['decisions']} decisions, mean reward {stats['mean_reward']:.2f}")
+    else:
+        model, rows_trained = train_from_store(store, args.target, args.chunk_size)
+        elapsed = time.perf_counter() - started
+        with open(args.output, "w") as f:
+            json.dump({"weights": {k: v.tolist() for k, v in model.weights.items()},
+                       "training_episodes": rows_trained}, f, indent=2)
+        print(f"Trained on {rows_trained} rows in {elapsed:.2f}s ({rows_trained / elapsed:,.0f} rows/sec)")
+        print(f"Policy saved to {args.output}")
+    store.close()
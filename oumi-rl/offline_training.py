@@ -0,0 +1,307 @@
+"""
+Offline Training from rl_training_data Exports
+
+Streams a JSONL or CSV export of the `rl_training_data` table
+(supabase/migrations/20251214013459_add_rl_training_table.sql) in fixed-size
+chunks and applies one minibatch update per chunk, so memory use does not
+depend on the file size.
+
+Each row's reward is its `reward_score`. If that is missing, the reward is
+recomputed from actual vs estimated impact with `calculate_reward_batch`.
+Disaster state and allocations are taken from the row or its `metadata`
+object when present (severity, disaster_type, affected_population,
+available_resources, time_elapsed, num_alerts, rescue_allocation,
+medical_deployment, logistics_routing). Otherwise the defaults used by
+`optimize_actions` apply. Rows whose action_type is not a known action
+(e.g. 'training_session') are skipped.
+
+Targets:
+- optimizer: OumiRLPriorityOptimizer.update_from_feedback_batch (all four action types)
+- agent:     OumiRLAgent.update_batch (rescue, medical and logistics rows)
+
+Progress is stored as a byte offset and row count in a state file after each
+checkpoint, so an interrupted run can continue with --resume.
+
+Usage:
+    python offline_training.py rl_training_data.jsonl --target optimizer \\
+        --output offline_policy.json --state-file offline_state.json
+    python offline_training.py rl_training_data.csv --target agent --resume
+"""
+
+import csv
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from oumi_rl.encoding import DISASTER_TYPES, SEVERITY_NAMES
+from policy_format import load_policy_weights
+from priority_optimization import (
+    OumiRLPriorityOptimizer,
+    calculate_reward_batch,
+    encode_state_matrix,
+)
+from random_streams import spawn_generators
+from train_rl_model import ACTION_TYPES, DisasterStateBatch, OumiRLAgent
+
+
+def _iter_jsonl(f, offset: int) -> Iterator[Tuple[Dict, int]]:
+    f.seek(offset)
+    for line in iter(f.readline, b""):
+        offset += len(line)
+        if line.strip():
+            yield json.loads(line), offset
+
+
+def _iter_csv(f, offset: int) -> Iterator[Tuple[Dict, int]]:
+    f.seek(0)
+    header_line = f.readline()
+    columns = next(csv.reader([header_line.decode()]))
+    offset = max(offset, len(header_line))
+    f.seek(offset)
+
+    consumed = [offset]
+
+    def lines():
+        for line in iter(f.readline, b""):
+            consumed[0] += len(line)
+            yield line.decode()
+
+    # csv.reader pulls exactly the lines of one record at a time (including
+    # quoted multi-line fields), so `consumed` is the offset after each row
+    for values in csv.reader(lines()):
+        if values:
+            yield dict(zip(columns, values)), consumed[0]
+
+
+def iter_row_chunks(
+    filepath: str,
+    chunk_size: int = 10000,
+    offset: int = 0,
+) -> Iterator[Tuple[List[Dict], int]]:
+    """
+    Stream an export in chunks of rows
+
+    Yields: (rows, byte offset just past the last row of the chunk)
+    """
+    reader = _iter_csv if filepath.endswith(".csv") else _iter_jsonl
+    with open(filepath, "rb") as f:
+        chunk: List[Dict] = []
+        for row, end_offset in reader(f, offset):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield chunk, end_offset
+                chunk = []
+        if chunk:
+            yield chunk, end_offset
+
+
+def _metadata(row: Dict) -> Dict:
+    metadata = row.get("metadata") or {}
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata)
+        except ValueError:
+            metadata = {}
+    return metadata
+
+
+def _column(rows: List[Dict], metadata: List[Dict], name: str, default, dtype=float) -> np.ndarray:
+    """One column, taken from the row, else its metadata, else `default`"""
+    values = []
+    for row, meta in zip(rows, metadata):
+        value = row.get(name)
+        if value in (None, ""):
+            value = meta.get(name, default)
+        values.append(default if value in (None, "") else value)
+    return np.array(values, dtype=dtype)
+
+
+def rows_to_batch(rows: List[Dict]) -> Dict[str, np.ndarray]:
+    """Convert exported rows into feature and reward columns"""
+    metadata = [_metadata(row) for row in rows]
+    severity = [row.get("severity") or meta.get("severity") or meta.get("disaster_severity") or "medium"
+                for row, meta in zip(rows, metadata)]
+    disaster_type = [row.get("disaster_type") or meta.get("disaster_type") or "earthquake"
+                     for row, meta in zip(rows, metadata)]
+
+    estimated_impact = _column(rows, metadata, "estimated_impact", 0)
+    actual_impact = _column(rows, metadata, "actual_impact", 0)
+    reward_score = _column(rows, metadata, "reward_score", np.nan)
+    recomputed = calculate_reward_batch(
+        estimated_impact,
+        _column(rows, metadata, "resources_allocated", 1),
+        actual_impact,
+        _column(rows, metadata, "completion_time_hours", 24),
+        _column(rows, metadata, "deadline_hours", 24),
+        _column(rows, metadata, "resources_used", 1),
+    )
+
+    return {
+        "action_type": np.array([row.get("action_type", "") for row in rows]),
+        "severity": np.array(severity),
+        "disaster_type": np.array(disaster_type),
+        "affected_population": _column(rows, metadata, "affected_population", 1000),
+        "available_resources": _column(rows, metadata, "available_resources", 7),
+        "time_elapsed": _column(rows, metadata, "time_elapsed", 0.0),
+        "num_alerts": _column(rows, metadata, "num_alerts", 1, dtype=np.int64),
+        "rescue_allocation": _column(rows, metadata, "rescue_allocation", 0, dtype=np.int64),
+        "medical_deployment": _column(rows, metadata, "medical_deployment", 0, dtype=np.int64),
+        "logistics_routing": _column(rows, metadata, "logistics_routing", 0, dtype=np.int64),
+        "reward": np.where(np.isnan(reward_score), recomputed, reward_score),
+    }
+
+
+def _action_indices(action_types: np.ndarray, names: List[str]) -> np.ndarray:
+    """Index of each action type in `names`, -1 for unknown types"""
+    lookup = {name: i for i, name in enumerate(names)}
+    unique, inverse = np.unique(action_types, return_inverse=True)
+    return np.array([lookup.get(name, -1) for name in unique.tolist()], dtype=np.int64)[inverse]
+
+
+def apply_optimizer_batch(optimizer: OumiRLPriorityOptimizer, batch: Dict[str, np.ndarray]) -> int:
+    """Minibatch feedback update of the priority optimizer; returns rows used"""
+    indices = _action_indices(batch["action_type"], optimizer.action_types)
+    keep = indices >= 0
+    if not keep.any():
+        return 0
+    state_matrix = encode_state_matrix(
+        batch["severity"][keep], batch["disaster_type"][keep], batch["affected_population"][keep],
+        batch["available_resources"][keep], batch["time_elapsed"][keep],
+    )
+    optimizer.update_from_feedback_batch(state_matrix, indices[keep], batch["reward"][keep])
+    return int(keep.sum())
+
+
+def apply_agent_batch(agent: OumiRLAgent, batch: Dict[str, np.ndarray]) -> int:
+    """Minibatch TD update of the Q-learning agent; returns rows used"""
+    indices = _action_indices(batch["action_type"], ACTION_TYPES)
+    keep = indices >= 0
+    if not keep.any():
+        return 0
+    severity = _action_indices(batch["severity"][keep], SEVERITY_NAMES)
+    disaster_type = _action_indices(batch["disaster_type"][keep], DISASTER_TYPES)
+    states = DisasterStateBatch(
+        severity=np.where(severity >= 0, severity, 1),
+        num_alerts=batch["num_alerts"][keep],
+        response_delay=batch["time_elapsed"][keep],
+        available_resources=batch["available_resources"][keep],
+        disaster_type=np.maximum(disaster_type, 0),
+    )
+    actions = np.column_stack([
+        batch["rescue_allocation"][keep], batch["medical_deployment"][keep], batch["logistics_routing"][keep],
+    ]) / 10.0
+    features = np.concatenate([states.to_matrix(), actions], axis=1)
+    agent.update_batch(features, indices[keep], batch["reward"][keep])
+    return int(keep.sum())
+
+
+def _save_weights(weights: Dict[str, np.ndarray], filepath: str, rows_trained: int):
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"weights": {k: v.tolist() for k, v in weights.items()},
+                   "training_episodes": rows_trained}, f, indent=2)
+    os.replace(tmp_path, filepath)
+
+
+def _save_state(filepath: str, state: Dict):
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, filepath)
+
+
+def train_offline(
+    export_path: str,
+    target: str = "optimizer",
+    chunk_size: int = 10000,
+    output_path: str = "offline_policy.json",
+    state_path: Optional[str] = None,
+    resume: bool = False,
+    checkpoint_every: int = 10,
+    seed: Optional[int] = 0,
+) -> Dict:
+    """
+    Train from an exported rl_training_data file
+
+    Args:
+        export_path: JSONL or CSV export
+        target: "optimizer" or "agent"
+        chunk_size: Rows per minibatch update
+        output_path: JSON policy written at every checkpoint and at the end
+        state_path: Cursor file (byte offset, rows read) for resuming
+        resume: Continue from the cursor in state_path and the weights in output_path
+        checkpoint_every: Chunks between checkpoints
+        seed: Seed of the agent's initial weights (target "agent")
+
+    Returns:
+        Final cursor: export, target, byte offset, rows read and rows trained on
+
+    Raises:
+        ValueError: If the cursor being resumed was written for another
+            export file or target
+    """
+    state_path = state_path or f"{output_path}.state"
+    cursor = {
+        "export": os.path.abspath(export_path), "target": target,
+        "offset": 0, "rows_read": 0, "rows_trained": 0,
+    }
+
+    if target == "optimizer":
+        model = OumiRLPriorityOptimizer()
+    else:
+        model = OumiRLAgent(history_capacity=chunk_size, rng=spawn_generators(seed, 1)[0])
+    if resume and os.path.exists(state_path):
+        with open(state_path) as f:
+            saved = json.load(f)
+        # Cursors written before the target was recorded are taken to match it
+        for key in ("export", "target"):
+            if saved.get(key, cursor[key]) != cursor[key]:
+                raise ValueError(
+                    f"{state_path} was written for {key} {saved[key]!r}, cannot resume with {cursor[key]!r}"
+                )
+        cursor = {**saved, "target": target}
+        model.weights, _ = load_policy_weights(output_path)
+        print(f"Resuming {export_path} at byte {cursor['offset']} (row {cursor['rows_read']})")
+
+    apply_batch = apply_optimizer_batch if target == "optimizer" else apply_agent_batch
+
+    chunks = 0
+    for rows, end_offset in iter_row_chunks(export_path, chunk_size, cursor["offset"]):
+        cursor["rows_trained"] += apply_batch(model, rows_to_batch(rows))
+        cursor["rows_read"] += len(rows)
+        cursor["offset"] = end_offset
+        chunks += 1
+
+        if chunks % checkpoint_every == 0:
+            # Weights first, then the cursor, so a crash never skips unsaved rows
+            _save_weights(model.weights, output_path, cursor["rows_trained"])
+            _save_state(state_path, cursor)
+            print(f"Rows read: {cursor['rows_read']} | trained: {cursor['rows_trained']}")
+
+    _save_weights(model.weights, output_path, cursor["rows_trained"])
+    _save_state(state_path, cursor)
+    print(f"Offline training complete: {cursor['rows_trained']} of {cursor['rows_read']} rows used")
+    print(f"Policy saved to {output_path}")
+    return cursor
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train from an rl_training_data export (JSONL or CSV)")
+    parser.add_argument("export", help="Path to the exported rows (.jsonl or .csv)")
+    parser.add_argument("--target", choices=["optimizer", "agent"], default="optimizer")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows per minibatch update")
+    parser.add_argument("--output", default="offline_policy.json", help="Where to write learned weights")
+    parser.add_argument("--state-file", default=None, help="Cursor file (default: <output>.state)")
+    parser.add_argument("--checkpoint-every", type=int, default=10, help="Chunks between checkpoints")
+    parser.add_argument("--resume", action="store_true", help="Continue from the saved cursor")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the agent's initial weights")
+    args = parser.parse_args()
+
+    train_offline(
+        args.export, args.target, args.chunk_size, args.output,
+        args.state_file, args.resume, args.checkpoint_every, args.seed,
+    )
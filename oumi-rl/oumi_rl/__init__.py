@@ -0,0 +1,74 @@
+"""
+Oumi RL for disaster response prioritization
+
+Importable entry point for the modules in this directory. Importing the
+package loads only the encoding tables and the NumPy-free scorer. The
+training, optimizer and serving classes are imported the first time they
+are accessed:
+
+    import oumi_rl
+    oumi_rl.score_disaster({"severity": "critical", "disaster_type": "flood"})  # no NumPy
+    optimizer = oumi_rl.OumiRLPriorityOptimizer()                              # loads NumPy
+
+The directory containing this package (oumi-rl/) must be on sys.path, as it
+is for the scripts next to it.
+"""
+
+import importlib
+
+from oumi_rl.encoding import (
+    DEFAULT_PRIORITY_WEIGHTS,
+    DISASTER_TYPE_CODES,
+    DISASTER_TYPES,
+    PRIORITY_ACTION_TYPES,
+    SEVERITY_CODES,
+    SEVERITY_NAMES,
+)
+from oumi_rl.heuristic import calculate_rl_priority, generate_priority_actions
+from oumi_rl.scoring import load_policy, score_disaster, state_features
+
+
+# Public name -> module that defines it, imported on first access
+_LAZY_EXPORTS = {
+    "DisasterStateRepresentation": "priority_optimization",
+    "OumiRLPriorityOptimizer": "priority_optimization",
+    "PriorityLookupTable": "priority_optimization",
+    "calculate_reward": "priority_optimization",
+    "calculate_reward_batch": "priority_optimization",
+    "encode_state_matrix": "priority_optimization",
+    "DisasterAction": "train_rl_model",
+    "DisasterActionBatch": "train_rl_model",
+    "DisasterSimulator": "train_rl_model",
+    "DisasterState": "train_rl_model",
+    "DisasterStateBatch": "train_rl_model",
+    "OumiRLAgent": "train_rl_model",
+    "RewardFunction": "train_rl_model",
+    "TrainingHistory": "train_rl_model",
+    "train_agent": "train_rl_model",
+    "ReplayBuffer": "replay_buffer",
+    "BufferedDraws": "random_streams",
+    "spawn_generators": "random_streams",
+    "convert_policy": "policy_format",
+    "load_policy_weights": "policy_format",
+    "write_binary_policy": "policy_format",
+    "AlertAggregator": "alert_ingestion",
+    "SpatialAlertAggregator": "spatial_index",
+    "allocate_agent": "resource_allocation",
+    "allocate_priorities": "resource_allocation",
+    "evaluate_policy_file": "policy_evaluation",
+    "ShadowScorer": "shadow_scoring",
+    "train_offline": "offline_training",
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_EXPORTS))
@@ -0,0 +1,6 @@
+"""Score one disaster from the command line: python -m oumi_rl '<disaster json>'"""
+
+from oumi_rl.scoring import main
+
+
+main()
@@ -0,0 +1,24 @@
+"""
+Shared Encoding Tables for Oumi RL
+
+Category codes used by every state representation. Kept free of heavy
+imports so lightweight entry points can use them without loading NumPy.
+"""
+
+SEVERITY_NAMES = ["low", "medium", "high", "critical"]
+SEVERITY_CODES = {name: code for code, name in enumerate(SEVERITY_NAMES)}
+
+DISASTER_TYPES = ["earthquake", "flood", "fire", "hurricane", "tornado", "tsunami"]
+DISASTER_TYPE_CODES = {name: code for code, name in enumerate(DISASTER_TYPES)}
+
+# Action types of OumiRLPriorityOptimizer, in weight-matrix row order
+PRIORITY_ACTION_TYPES = ["rescue", "medical", "logistics", "communication"]
+
+# OumiRLPriorityOptimizer's initial weights over
+# [severity, disaster_type, affected_population, available_resources, time_elapsed]
+DEFAULT_PRIORITY_WEIGHTS = {
+    "rescue": [0.9, 0.7, 0.8, 0.6, 0.9],
+    "medical": [0.85, 0.6, 0.75, 0.7, 0.8],
+    "logistics": [0.7, 0.5, 0.9, 0.8, 0.5],
+    "communication": [0.6, 0.4, 0.7, 0.5, 0.6],
+}
@@ -0,0 +1,82 @@
+"""
+Edge Function Priority Heuristic
+
+Python port of calculateRLPriority and generatePriorityActions from
+supabase/functions/rl-prioritize/index.ts, the rule-based scores the edge
+function currently writes to priority_actions. Kept NumPy-free like the
+scorer so both can run side by side in short-lived processes.
+
+Usage:
+    from oumi_rl.heuristic import generate_priority_actions
+    generate_priority_actions({"title": "Coastal flood", "severity": "high", "affected_population": 20000})
+"""
+
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+
+HEURISTIC_SEVERITY_SCORES = {"critical": 100, "high": 75, "medium": 50, "low": 25}
+HEURISTIC_TYPE_WEIGHTS = {"rescue": 1.2, "medical": 1.15, "logistics": 0.9, "communication": 0.85}
+
+# Severities for which generatePriorityActions creates rescue and medical actions
+URGENT_SEVERITIES = ("critical", "high")
+
+# action_type -> (description, share of affected_population, deadline in hours),
+# in the order generatePriorityActions creates them. A share of None means
+# estimated_impact is affected_population as is (not floored)
+_ACTION_TEMPLATES = {
+    "rescue": ("Deploy search and rescue teams to {title} location immediately", 0.3, 2),
+    "medical": ("Establish emergency medical triage and treatment facilities", 0.4, 4),
+    "logistics": ("Set up supply distribution points for food, water, and shelter materials", 0.6, 8),
+    "communication": ("Establish emergency communication network and information hotline", None, 6),
+}
+
+
+def calculate_rl_priority(disaster: Dict, action_type: str) -> float:
+    """calculateRLPriority: severity score plus population weight, scaled by action type"""
+    base_priority = HEURISTIC_SEVERITY_SCORES.get(disaster.get("severity"), 50)
+    population_weight = min(disaster.get("affected_population", 0) / 100, 50)
+    type_weight = HEURISTIC_TYPE_WEIGHTS.get(action_type, 1.0)
+    time_factor = 1.0
+    # Math.round rounds halves up, unlike Python's round
+    return min(math.floor((base_priority + population_weight) * type_weight * time_factor + 0.5), 100)
+
+
+def generated_action_types(severity: Optional[str]) -> List[str]:
+    """Action types generatePriorityActions creates for a severity, in creation order"""
+    if severity in URGENT_SEVERITIES:
+        return list(_ACTION_TEMPLATES)
+    return ["logistics", "communication"]
+
+
+def _iso_timestamp(moment: datetime) -> str:
+    # Date.prototype.toISOString: UTC, milliseconds, "Z" suffix
+    return moment.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def generate_priority_actions(disaster: Dict, now: Optional[datetime] = None) -> List[Dict]:
+    """
+    generatePriorityActions: the actions the edge function inserts for a disaster
+
+    Args:
+        disaster: Row of the disasters table (severity, affected_population, title)
+        now: Time the deadlines count from (default: current time)
+
+    Returns:
+        List of {action_type, description, estimated_impact, deadline, priority_score}
+        in creation order (not sorted by priority)
+    """
+    now = now or datetime.now(timezone.utc)
+    population = disaster.get("affected_population", 0)
+    actions = []
+    for action_type in generated_action_types(disaster.get("severity")):
+        description, share, hours = _ACTION_TEMPLATES[action_type]
+        actions.append({
+            "action_type": action_type,
+            "description": description.format(title=disaster.get("title")),
+            "estimated_impact": population if share is None else math.floor(population * share),
+            "deadline": _iso_timestamp(now + timedelta(hours=hours)),
+            "priority_score": calculate_rl_priority(disaster, action_type),
+        })
+    return actions
@@ -0,0 +1,137 @@
+"""
+Lightweight Priority Scoring for Oumi RL
+
+Scores one disaster against OumiRLPriorityOptimizer weights without
+importing NumPy. This is for short-lived processes (edge functions, cron
+jobs) where interpreter startup and imports dominate the run time. The
+policy is a 5-feature linear model, so plain Python arithmetic is enough.
+
+Results match OumiRLPriorityOptimizer.optimize_actions: the same features,
+priorities clipped to [0, 100], sorted best first.
+
+Usage:
+    python -m oumi_rl '{"severity": "critical", "disaster_type": "flood", "affected_population": 25000}'
+    echo '{"severity": "high"}' | python -m oumi_rl --policy offline_policy.json
+"""
+
+import json
+import struct
+import sys
+from array import array
+from typing import Dict, List, Optional
+
+from oumi_rl.encoding import (
+    DEFAULT_PRIORITY_WEIGHTS,
+    DISASTER_TYPE_CODES,
+    PRIORITY_ACTION_TYPES,
+    SEVERITY_CODES,
+)
+
+
+# Binary policy layout, see policy_format.py
+_MAGIC = b"OUMIRLP\0"
+_PREAMBLE = struct.Struct("<8sII")
+
+
+def _read_binary_policy(f) -> Dict[str, List[float]]:
+    magic, _, header_size = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+    header = json.loads(f.read(header_size))
+    f.seek(header["data_offset"])
+    values = array("d")
+    values.frombytes(f.read(8 * len(header["action_types"]) * header["num_features"]))
+    if sys.byteorder == "big":
+        values.byteswap()
+    n = header["num_features"]
+    return {name: values[i * n:(i + 1) * n].tolist() for i, name in enumerate(header["action_types"])}
+
+
+def load_policy(filepath: Optional[str] = None) -> Dict[str, List[float]]:
+    """
+    Priority weights from a JSON or binary policy file
+
+    Without a path, returns the optimizer's initial weights.
+    """
+    if filepath is None:
+        return DEFAULT_PRIORITY_WEIGHTS
+    with open(filepath, "rb") as f:
+        if f.read(len(_MAGIC)) == _MAGIC:
+            f.seek(0)
+            weights = _read_binary_policy(f)
+        else:
+            f.seek(0)
+            weights = json.load(f)["weights"]
+
+    for action_type, vector in weights.items():
+        if len(vector) != 5:
+            raise ValueError(
+                f"{filepath} has {len(vector)} weights for {action_type!r}; "
+                "expected a 5-feature OumiRLPriorityOptimizer policy"
+            )
+    return weights
+
+
+def state_features(
+    severity: str,
+    disaster_type: str,
+    affected_population: float,
+    available_resources: float = 7,
+    time_elapsed: float = 0.0
+) -> List[float]:
+    """Same features as DisasterStateRepresentation.to_vector"""
+    return [
+        SEVERITY_CODES.get(severity, 1) / 3.0,
+        DISASTER_TYPE_CODES.get(disaster_type, 0) / 5.0,
+        min(affected_population / 100000, 1.0),
+        min(available_resources / 10, 1.0),
+        min(time_elapsed / 24, 1.0),
+    ]
+
+
+def score_disaster(
+    disaster: Dict,
+    weights: Optional[Dict[str, List[float]]] = None,
+    available_resources: int = 7
+) -> List[Dict]:
+    """
+    Rank action types for one disaster, like optimize_actions
+
+    Returns:
+        List of {action_type, priority_score, state_features}, best first
+    """
+    weights = weights or DEFAULT_PRIORITY_WEIGHTS
+    features = state_features(
+        disaster.get("severity", "medium"),
+        disaster.get("disaster_type", "earthquake"),
+        disaster.get("affected_population", 1000),
+        available_resources,
+        0.0,  # optimize_actions scores at onset
+    )
+
+    actions = []
+    for action_type in PRIORITY_ACTION_TYPES:
+        w = weights.get(action_type, weights["rescue"])
+        priority = sum(x * y for x, y in zip(features, w))
+        actions.append({
+            "action_type": action_type,
+            "priority_score": min(max(priority * 100, 0), 100),
+            "state_features": features,
+        })
+
+    actions.sort(key=lambda x: x["priority_score"], reverse=True)
+    return actions
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m oumi_rl", description="Score one disaster with an Oumi RL priority policy")
+    parser.add_argument("disaster", nargs="?", help="Disaster JSON (default: read stdin)")
+    parser.add_argument("--policy", default=None, help="Policy file (.json or binary)")
+    parser.add_argument("--resources", type=int, default=7, help="Available resource units")
+    args = parser.parse_args(argv)
+
+    disaster = json.loads(args.disaster if args.disaster is not None else sys.stdin.read())
+    actions = score_disaster(disaster, load_policy(args.policy), args.resources)
+    json.dump([{k: a[k] for k in ("action_type", "priority_score")} for a in actions], sys.stdout)
+    sys.stdout.write("\n")
+
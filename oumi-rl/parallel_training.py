@@ -0,0 +1,142 @@
+"""
+Parallel Oumi RL Training
+
+Runs simulated disaster episodes on a pool of worker processes and merges
+what they learn into one OumiRLAgent.
+
+Each sync round:
+- Every worker copies the current shared weights
+- Runs `sync_interval` episodes against its own DisasterSimulator, with
+  a fresh replay buffer of the agent's capacity when replay is enabled
+- Returns its weight delta and episode rewards
+- The deltas are averaged into `OumiRLAgent.weights`
+
+Worker RNG streams are derived from (seed, worker, round) with
+random_streams.spawn_generators, so a run is reproducible for a given seed
+and worker count regardless of which process picks up which task.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from random_streams import spawn_generators
+from train_rl_model import OumiRLAgent, DisasterSimulator
+
+
+def _run_shard(
+    weights: Dict[str, np.ndarray],
+    hyperparameters: Dict,
+    num_episodes: int,
+    batch_size: Optional[int],
+    seed: int,
+    worker: int,
+    sync_round: int,
+    horizon: int = 1,
+) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """Run one worker's episodes for a sync round and return (weight delta, rewards)"""
+    agent_rng, simulator_rng = spawn_generators(seed, 2, spawn_key=(worker, sync_round))
+
+    agent = OumiRLAgent(**hyperparameters, rng=agent_rng)
+    agent.weights = {k: v.copy() for k, v in weights.items()}
+    simulator = DisasterSimulator(rng=simulator_rng)
+
+    if batch_size is None:
+        if horizon > 1:
+            rewards = np.array([simulator.run_multistep_episode(agent, horizon) for _ in range(num_episodes)])
+        else:
+            rewards = np.array([simulator.run_episode(agent) for _ in range(num_episodes)])
+    else:
+        chunks = []
+        done = 0
+        while done < num_episodes:
+            size = min(batch_size, num_episodes - done)
+            if horizon > 1:
+                chunks.append(simulator.run_multistep_batch(agent, size, horizon))
+            else:
+                chunks.append(simulator.run_batch(agent, size))
+            done += size
+        rewards = np.concatenate(chunks) if chunks else np.empty(0)
+
+    delta = {k: agent.weights[k] - weights[k] for k in weights}
+    return delta, rewards
+
+
+def train_parallel(
+    agent: OumiRLAgent,
+    num_episodes: int,
+    num_workers: int,
+    sync_interval: int = 1000,
+    batch_size: Optional[int] = None,
+    seed: int = 0,
+    horizon: int = 1,
+    start_episode: int = 0,
+    start_round: int = 0,
+    on_round: Optional[Callable[[int, int, np.ndarray], None]] = None,
+) -> np.ndarray:
+    """
+    Train `agent` in place on a process pool with periodic weight averaging
+
+    Args:
+        agent: Agent whose weights are shared with and updated from workers
+        num_episodes: Total number of training episodes across all workers
+        num_workers: Number of worker processes
+        sync_interval: Episodes each worker runs between weight merges
+        batch_size: Per-worker simulation batch size (None for one at a time)
+        seed: Base seed for the per-worker RNG streams
+        horizon: Decision rounds per episode (multi-step when above 1)
+        start_episode: Episodes already completed (when resuming)
+        start_round: Sync round to continue from (when resuming)
+        on_round: Called after every merge with (episodes done, rounds
+            done, rewards of the round), e.g. to write checkpoints
+
+    Returns:
+        Episode rewards of this call, ordered by sync round and then by worker
+    """
+    hyperparameters = {
+        'learning_rate': agent.learning_rate,
+        'discount_factor': agent.discount_factor,
+        'epsilon': agent.epsilon,
+        'replay_capacity': agent.replay.capacity if agent.replay is not None else 0,
+        'replay_batch_size': agent.replay_batch_size,
+        'prioritized_replay': agent.prioritized_replay,
+    }
+    episode_rewards: List[np.ndarray] = []
+    done = start_episode
+    sync_round = start_round
+
+    with ProcessPoolExecutor(max_workers=num_workers) as pool:
+        while done < num_episodes:
+            round_episodes = min(sync_interval * num_workers, num_episodes - done)
+            shard_sizes = [
+                round_episodes // num_workers + (1 if w < round_episodes % num_workers else 0)
+                for w in range(num_workers)
+            ]
+
+            futures = [
+                pool.submit(
+                    _run_shard, agent.weights, hyperparameters, size,
+                    batch_size, seed, worker, sync_round, horizon,
+                )
+                for worker, size in enumerate(shard_sizes) if size
+            ]
+            results = [future.result() for future in futures]
+
+            # Average the worker deltas into the shared weights
+            for action_type in agent.weights:
+                agent.weights[action_type] = agent.weights[action_type] + np.mean(
+                    [delta[action_type] for delta, _ in results], axis=0
+                )
+
+            episode_rewards.extend(rewards for _, rewards in results)
+            agent.episodes_trained += round_episodes
+            done += round_episodes
+            sync_round += 1
+
+            round_rewards = np.concatenate([rewards for _, rewards in results])
+            print(f"Episode {done}/{num_episodes} | Avg Reward (last 100): {np.mean(round_rewards[-100:]):.2f}")
+            if on_round is not None:
+                on_round(done, sync_round, round_rewards)
+
+    return np.concatenate(episode_rewards) if episode_rewards else np.empty(0)
@@ -0,0 +1,248 @@
+"""
+Monte Carlo Policy Evaluation for Oumi RL
+
+Scores a saved policy on a large batch of simulated disaster states with the
+vectorized simulator and reward function, and compares it against baselines:
+- random:    uniform random allocations of 0-10 units, scaled to fit the budget
+- fixed:     the DisasterAction(5, 5, 5) fallback for every state
+- heuristic: the edge function's calculateRLPriority scores
+             (supabase/functions/rl-prioritize), with the budget split in
+             proportion to the scores of the actions generatePriorityActions
+             would create
+
+Every policy sees the same states and the same outcome noise (common random
+numbers), so differences between policies are measured as paired
+differences with much tighter confidence intervals than independent runs.
+
+Reported per policy: mean reward with a normal confidence interval, and mean
+reward per severity and per disaster type. With --min-improvement the exit
+status is non-zero unless the lower confidence bound of the policy's paired
+improvement over every baseline reaches that margin, so evaluation can gate
+policy promotion.
+
+Usage:
+    python policy_evaluation.py learned_policy.json --states 1000000
+    python policy_evaluation.py candidate.oumirl --min-improvement 0 --output eval.json
+"""
+
+import json
+from statistics import NormalDist
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from oumi_rl.encoding import DISASTER_TYPES, SEVERITY_NAMES
+from oumi_rl.heuristic import HEURISTIC_SEVERITY_SCORES, HEURISTIC_TYPE_WEIGHTS
+from train_rl_model import (
+    ACTION_TYPES,
+    DisasterActionBatch,
+    DisasterSimulator,
+    DisasterStateBatch,
+    OumiRLAgent,
+    RewardFunction,
+)
+
+
+# calculateRLPriority's severity scores indexed by severity code
+SEVERITY_SCORE_BY_CODE = np.array([HEURISTIC_SEVERITY_SCORES[name] for name in SEVERITY_NAMES])
+
+PolicyFn = Callable[[DisasterStateBatch, np.random.Generator], DisasterActionBatch]
+
+
+def random_policy(states: DisasterStateBatch, rng: np.random.Generator) -> DisasterActionBatch:
+    """Uniform 0-10 allocations, scaled down proportionally when over budget"""
+    allocations = rng.integers(0, 11, size=(len(states), 3))
+    total = allocations.sum(axis=1)
+    scale = np.minimum(states.available_resources / np.maximum(total, 1), 1.0)
+    allocations = np.floor(allocations * scale[:, None]).astype(np.int64)
+    return DisasterActionBatch(allocations[:, 0], allocations[:, 1], allocations[:, 2])
+
+
+def fixed_policy(states: DisasterStateBatch, rng: np.random.Generator) -> DisasterActionBatch:
+    """DisasterAction(5, 5, 5) for every state"""
+    fives = np.full(len(states), 5, dtype=np.int64)
+    return DisasterActionBatch(fives, fives.copy(), fives.copy())
+
+
+def heuristic_priorities(severity: np.ndarray, affected_population: np.ndarray) -> np.ndarray:
+    """
+    calculateRLPriority for rescue, medical and logistics, shape (N, 3)
+
+    Actions generatePriorityActions would not create (rescue and medical
+    below high severity) get priority 0.
+    """
+    base = SEVERITY_SCORE_BY_CODE[severity] + np.minimum(affected_population / 100, 50)
+    weights = np.array([HEURISTIC_TYPE_WEIGHTS[action_type] for action_type in ACTION_TYPES])
+    # Math.round rounds halves up, unlike np.round
+    priorities = np.minimum(np.floor(base[:, None] * weights + 0.5), 100)
+    generated = np.column_stack([severity >= 2, severity >= 2, np.ones(len(severity), dtype=bool)])
+    return np.where(generated, priorities, 0.0)
+
+
+def heuristic_policy(states: DisasterStateBatch, rng: np.random.Generator) -> DisasterActionBatch:
+    """
+    Split the budget across action types in proportion to their heuristic priority
+
+    Simulated states have no affected_population, so the reward's estimated
+    need (severity * 500 + num_alerts * 100 people) stands in for it.
+    """
+    affected_population = states.severity * 500 + states.num_alerts * 100
+    priorities = heuristic_priorities(states.severity, affected_population)
+    shares = priorities / priorities.sum(axis=1, keepdims=True)
+    allocations = np.minimum(np.floor(states.available_resources[:, None] * shares), 10).astype(np.int64)
+    return DisasterActionBatch(allocations[:, 0], allocations[:, 1], allocations[:, 2])
+
+
+def agent_policy(agent: OumiRLAgent) -> PolicyFn:
+    """Greedy (no exploration) actions of a trained agent"""
+    def policy(states: DisasterStateBatch, rng: np.random.Generator) -> DisasterActionBatch:
+        return agent.greedy_action_batch(states)[0]
+    return policy
+
+
+BASELINES: Dict[str, PolicyFn] = {
+    'random': random_policy,
+    'fixed': fixed_policy,
+    'heuristic': heuristic_policy,
+}
+
+
+def _interval(values: np.ndarray, z: float) -> Dict[str, float]:
+    mean = float(values.mean())
+    half_width = z * float(values.std(ddof=1)) / np.sqrt(len(values))
+    return {'mean': mean, 'ci_low': mean - half_width, 'ci_high': mean + half_width}
+
+
+def _breakdown(rewards: np.ndarray, codes: np.ndarray, names) -> Dict[str, float]:
+    counts = np.bincount(codes, minlength=len(names))
+    sums = np.bincount(codes, weights=rewards, minlength=len(names))
+    return {name: float(sums[i] / counts[i]) for i, name in enumerate(names) if counts[i]}
+
+
+def evaluate_policies(
+    policies: Dict[str, PolicyFn],
+    num_states: int = 1_000_000,
+    seed: int = 0,
+    confidence: float = 0.95,
+    reference: Optional[str] = None,
+) -> Dict:
+    """
+    Evaluate policies on one shared batch of simulated states
+
+    Args:
+        policies: Policy functions by name
+        num_states: Number of simulated states
+        seed: Seed for states, outcome noise and random baselines
+        confidence: Confidence level of the intervals
+        reference: Policy whose paired differences against every other
+            policy are reported
+
+    Returns:
+        Dictionary with per-policy results and, if `reference` is set,
+        paired differences `reference - other`
+    """
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    states = DisasterSimulator(rng=np.random.default_rng(seed)).generate_state_batch(num_states)
+
+    rewards = {}
+    for name, policy in policies.items():
+        actions = policy(states, np.random.default_rng(seed))
+        # A fresh stream per policy, so every policy's outcomes use the same noise draws
+        simulator = DisasterSimulator(rng=np.random.default_rng(seed + 1))
+        outcomes = simulator.simulate_outcome_batch(states, actions)
+        rewards[name] = RewardFunction.calculate_batch(
+            states.severity, states.num_alerts, states.available_resources,
+            actions.rescue_allocation, actions.medical_deployment, actions.logistics_routing,
+            outcomes['response_time_hours'], outcomes['people_helped'],
+        )
+
+    results = {
+        'num_states': num_states,
+        'seed': seed,
+        'confidence': confidence,
+        'policies': {
+            name: {
+                **_interval(values, z),
+                'by_severity': _breakdown(values, states.severity, SEVERITY_NAMES),
+                'by_disaster_type': _breakdown(values, states.disaster_type, DISASTER_TYPES),
+            }
+            for name, values in rewards.items()
+        },
+    }
+    if reference is not None:
+        results['paired_differences'] = {
+            name: _interval(rewards[reference] - values, z)
+            for name, values in rewards.items() if name != reference
+        }
+    return results
+
+
+def evaluate_policy_file(
+    policy_path: str,
+    num_states: int = 1_000_000,
+    seed: int = 0,
+    confidence: float = 0.95,
+) -> Dict:
+    """Evaluate a saved policy (JSON or binary) against all baselines"""
+    agent = OumiRLAgent()
+    agent.load_policy(policy_path)
+    policies = {'policy': agent_policy(agent), **BASELINES}
+    return evaluate_policies(policies, num_states, seed, confidence, reference='policy')
+
+
+def format_report(results: Dict) -> str:
+    """Human-readable summary of evaluate_policies output"""
+    level = f"{results['confidence']:.0%}"
+    lines = [f"Evaluated on {results['num_states']} simulated states (seed {results['seed']})", ""]
+    lines.append(f"{'policy':10s} {'mean':>8s}   {level} CI")
+    for name, result in results['policies'].items():
+        lines.append(f"{name:10s} {result['mean']:8.2f}   [{result['ci_low']:.2f}, {result['ci_high']:.2f}]")
+
+    names = list(results['policies'])
+    for key, title in (('by_severity', 'severity'), ('by_disaster_type', 'disaster type')):
+        groups = list(results['policies'][names[0]][key])
+        lines += ["", f"Mean reward by {title}:", f"{'':12s}" + "".join(f"{n:>11s}" for n in names)]
+        for group in groups:
+            lines.append(f"{group:12s}" + "".join(
+                f"{results['policies'][n][key].get(group, float('nan')):11.2f}" for n in names
+            ))
+
+    if 'paired_differences' in results:
+        lines += ["", f"Paired improvement of the policy ({level} CI):"]
+        for name, diff in results['paired_differences'].items():
+            lines.append(f"  vs {name:10s} {diff['mean']:+8.2f}   [{diff['ci_low']:+.2f}, {diff['ci_high']:+.2f}]")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import time
+
+    parser = argparse.ArgumentParser(description="Monte Carlo evaluation of a saved Oumi RL policy")
+    parser.add_argument("policy", help="Policy file (.json or binary)")
+    parser.add_argument("--states", type=int, default=1_000_000, help="Number of simulated states")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--output", default=None, help="Write the results as JSON")
+    parser.add_argument("--min-improvement", type=float, default=None,
+                        help="Fail unless the CI lower bound of the improvement over every baseline "
+                             "is at least this many reward points")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = evaluate_policy_file(args.policy, args.states, args.seed, args.confidence)
+    results['seconds'] = time.perf_counter() - started
+
+    print(format_report(results))
+    print(f"\nEvaluation took {results['seconds']:.2f}s")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.min_improvement is not None:
+        worst = min(diff['ci_low'] for diff in results['paired_differences'].values())
+        passed = worst >= args.min_improvement
+        print(f"Promotion gate ({worst:+.2f} >= {args.min_improvement:+.2f}): {'PASS' if passed else 'FAIL'}")
+        sys.exit(0 if passed else 1)
@@ -0,0 +1,161 @@
+"""
+Binary Policy Format for Oumi RL
+
+Compact, versioned on-disk format for learned policies. Serving processes
+load it through `np.memmap`, so every worker on a machine shares one
+page-cached copy of the weights instead of parsing JSON into its own.
+
+Layout (little-endian):
+- Magic bytes  b"OUMIRLP\\0"                  (8 bytes)
+- Version      uint32                         (4 bytes)
+- Header size  uint32                         (4 bytes)
+- Header       UTF-8 JSON: hyperparameters, action_types (row order),
+               num_features, dtype, data_offset, training_episodes, timestamp
+- Padding      zeros up to data_offset (64-byte aligned)
+- Weights      float64 matrix, one contiguous row per action type
+
+JSON policies (`learned_policy.json`) remain supported for compatibility:
+`load_policy_weights` reads either format, and `convert_policy` translates
+between them.
+
+Usage:
+    python policy_format.py learned_policy.json learned_policy.oumirl
+    python policy_format.py learned_policy.oumirl exported_policy.json
+"""
+
+import json
+import os
+import struct
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+MAGIC = b"OUMIRLP\0"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct("<8sII")
+
+
+def is_binary_policy(filepath: str) -> bool:
+    """Whether a file starts with the binary policy magic bytes"""
+    with open(filepath, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_binary_policy(
+    filepath: str,
+    weights: Dict[str, np.ndarray],
+    hyperparameters: Optional[Dict[str, float]] = None,
+    training_episodes: int = 0,
+):
+    """
+    Write weights to the binary policy format
+
+    The file is written to a temporary path and renamed into place, so
+    readers (including memory-mapped ones) never observe a partial file.
+    """
+    action_types = list(weights)
+    matrix = np.ascontiguousarray(np.stack([weights[k] for k in action_types]), dtype="<f8")
+
+    header = {
+        "hyperparameters": hyperparameters or {},
+        "action_types": action_types,
+        "num_features": int(matrix.shape[1]),
+        "dtype": "<f8",
+        "training_episodes": int(training_episodes),
+        "timestamp": datetime.now().isoformat(),
+    }
+    # data_offset depends on the header length, so size the header with a placeholder first
+    header["data_offset"] = 0
+    header_size = len(json.dumps(header).encode()) + 16
+    data_offset = -(-(_PREAMBLE.size + header_size) // ALIGNMENT) * ALIGNMENT
+    header["data_offset"] = data_offset
+    header_bytes = json.dumps(header).encode().ljust(header_size)
+
+    tmp_path = f"{filepath}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * (data_offset - _PREAMBLE.size - len(header_bytes)))
+        f.write(matrix.tobytes())
+    os.replace(tmp_path, filepath)
+
+
+def read_binary_policy(filepath: str, mmap: bool = True) -> Tuple[np.ndarray, Dict]:
+    """
+    Read a binary policy
+
+    Returns: (weights matrix, header). With mmap=True the matrix is a
+    read-only np.memmap backed by the page cache.
+    """
+    with open(filepath, "rb") as f:
+        magic, version, header_size = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{filepath} is not a binary Oumi RL policy")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Unsupported policy format version {version}")
+        header = json.loads(f.read(header_size))
+
+        shape = (len(header["action_types"]), header["num_features"])
+        if mmap:
+            matrix = np.memmap(filepath, dtype=header["dtype"], mode="r",
+                               offset=header["data_offset"], shape=shape)
+        else:
+            f.seek(header["data_offset"])
+            matrix = np.fromfile(f, dtype=header["dtype"], count=shape[0] * shape[1]).reshape(shape)
+
+    return matrix, header
+
+
+def load_policy_weights(filepath: str, mmap: bool = False) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """
+    Load weights from a binary or JSON policy file
+
+    Returns: (weights by action type, metadata). With mmap=True and a binary
+    file the weights are read-only views into the shared mapping; otherwise
+    they are private, writable arrays.
+    """
+    if is_binary_policy(filepath):
+        matrix, header = read_binary_policy(filepath, mmap=mmap)
+        if not mmap:
+            matrix = np.array(matrix)
+        weights = {k: matrix[i] for i, k in enumerate(header["action_types"])}
+        return weights, header
+
+    with open(filepath, "r") as f:
+        policy_data = json.load(f)
+    weights = {k: np.array(v) for k, v in policy_data.pop("weights").items()}
+    return weights, policy_data
+
+
+def convert_policy(source: str, destination: str):
+    """Convert between JSON and binary policy files, choosing the output by extension"""
+    weights, metadata = load_policy_weights(source)
+    hyperparameters = metadata.get("hyperparameters", {})
+    training_episodes = metadata.get("training_episodes", 0)
+
+    if destination.endswith(".json"):
+        policy_data = {
+            "weights": {k: v.tolist() for k, v in weights.items()},
+            "hyperparameters": hyperparameters,
+            "training_episodes": training_episodes,
+            "timestamp": metadata.get("timestamp", datetime.now().isoformat()),
+        }
+        with open(destination, "w") as f:
+            json.dump(policy_data, f, indent=2)
+    else:
+        write_binary_policy(destination, weights, hyperparameters, training_episodes)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert Oumi RL policies between JSON and binary formats")
+    parser.add_argument("source", help="Input policy (.json or binary)")
+    parser.add_argument("destination", help="Output policy; .json writes JSON, anything else binary")
+    args = parser.parse_args()
+
+    convert_policy(args.source, args.destination)
+    print(f"Converted {args.source} -> {args.destination}")
@@ -0,0 +1,650 @@
+"""
+Oumi RL Policy Server
+
+Long-running local process that loads the learned policy once and answers
+prioritization requests over HTTP, on a TCP port or a Unix socket.
+
+Endpoints:
+- POST /prioritize     {"disaster": {...}, "available_resources": 7}
+                       -> ranked action types from OumiRLPriorityOptimizer
+                          (weights from --priority-policy, e.g. the output
+                          of offline_training.py)
+- POST /select-action  {"state": {"severity": 2, "num_alerts": 5, ...}}
+                       -> greedy allocation from the learned OumiRLAgent
+- GET  /metrics        -> request counts, batch sizes and p50/p99 latency
+
+Requests that arrive together are coalesced by a micro-batcher into one
+vectorized `optimize_actions_batch` / `greedy_action_batch` call. The policy
+files are watched and their weights are hot-reloaded when they change.
+
+Usage:
+    python policy_server.py serve --policy learned_policy.oumirl --priority-policy offline_policy.json --port 8765
+    python policy_server.py bench --requests 20000 --concurrency 64
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import queue
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from oumi_rl.encoding import DISASTER_TYPE_CODES, DISASTER_TYPES
+from policy_format import load_policy_weights
+from priority_optimization import OumiRLPriorityOptimizer
+from random_streams import spawn_generators
+from train_rl_model import ACTION_TYPES, DisasterStateBatch, OumiRLAgent
+
+
+STATE_FIELDS = ('severity', 'num_alerts', 'response_delay', 'available_resources')
+
+
+def _number(value, field: str, minimum: float = 0.0) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{field} must be a finite number")
+    if value < minimum:
+        raise ValueError(f"{field} must be at least {minimum:g}")
+    return value
+
+
+def _label(value, field: str, default: str) -> str:
+    if value is None:
+        return default
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be a string")
+    return value
+
+
+def _object(value, field: str) -> Dict:
+    if not isinstance(value, dict):
+        raise ValueError(f"{field} must be a JSON object")
+    return value
+
+
+def parse_prioritize(payload) -> Dict:
+    """
+    Validated /prioritize request with optimize_actions' defaults filled in
+
+    Raises ValueError for a malformed body, so a bad request is rejected
+    before it can reach a batch.
+    """
+    payload = _object(payload, 'request body')
+    disaster = _object(payload.get('disaster', {}), 'disaster')
+    return {
+        'disaster': {
+            'severity': _label(disaster.get('severity'), 'disaster.severity', 'medium'),
+            'disaster_type': _label(disaster.get('disaster_type'), 'disaster.disaster_type', 'earthquake'),
+            'affected_population': _number(
+                disaster.get('affected_population', 1000), 'disaster.affected_population'
+            ),
+        },
+        'available_resources': _number(payload.get('available_resources', 7), 'available_resources'),
+    }
+
+
+def parse_select_action(payload) -> Dict:
+    """Validated /select-action request; raises ValueError for a malformed body"""
+    state = _object(_object(payload, 'request body').get('state'), 'state')
+    missing = [field for field in STATE_FIELDS if field not in state]
+    if missing:
+        raise ValueError(f"state is missing {', '.join(missing)}")
+    severity = _number(state['severity'], 'state.severity')
+    if severity > 3 or severity != int(severity):
+        raise ValueError("state.severity must be an integer from 0 to 3")
+    return {'state': {
+        'severity': int(severity),
+        'num_alerts': int(_number(state['num_alerts'], 'state.num_alerts')),
+        'response_delay': float(_number(state['response_delay'], 'state.response_delay')),
+        'available_resources': int(_number(state['available_resources'], 'state.available_resources')),
+        'disaster_type': _label(state.get('disaster_type'), 'state.disaster_type', 'earthquake'),
+    }}
+
+
+# Endpoint -> request parser run before a request joins a batch
+REQUEST_PARSERS = {'/prioritize': parse_prioritize, '/select-action': parse_select_action}
+
+
+class PolicyStore:
+    """
+    Holds the served models and reloads their weights when a policy file changes
+
+    Args:
+        policy_path: OumiRLAgent policy served by /select-action
+        reload_interval: Seconds between checks for changed files
+        priority_policy_path: OumiRLPriorityOptimizer policy served by
+            /prioritize (default: the optimizer's initial weights)
+        seed: Seed of the agent's initial weights, which /select-action
+            serves until `policy_path` holds a policy, so every server
+            process answers the same way (None: fresh entropy)
+    """
+
+    def __init__(
+        self,
+        policy_path: Optional[str] = None,
+        reload_interval: float = 1.0,
+        priority_policy_path: Optional[str] = None,
+        seed: Optional[int] = 0,
+    ):
+        self.policy_path = policy_path
+        self.priority_policy_path = priority_policy_path
+        self.reload_interval = reload_interval
+        self.agent = OumiRLAgent(history_capacity=1, rng=spawn_generators(seed, 1)[0])
+        self.optimizer = OumiRLPriorityOptimizer()
+        self.version = 0
+        self._mtimes: Dict[str, int] = {}
+        self._last_check = 0.0
+        # Both batcher threads call maybe_reload
+        self._reload_lock = threading.Lock()
+        self.maybe_reload(force=True)
+
+    def _changed_mtime(self, path: Optional[str]) -> Optional[int]:
+        """New modification time of `path`, or None if it is unset, missing or unchanged"""
+        if path is None:
+            return None
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        return None if mtime == self._mtimes.get(path) else mtime
+
+    def _load_agent_weights(self) -> Dict[str, np.ndarray]:
+        # Binary policies are memory-mapped and shared with other server processes
+        weights, _ = load_policy_weights(self.policy_path, mmap=True)
+        for action_type in ACTION_TYPES:
+            if np.shape(weights.get(action_type)) != (8,):
+                raise ValueError(
+                    f"{self.policy_path} has no 8-feature {action_type!r} weights; "
+                    "expected an OumiRLAgent policy"
+                )
+        return weights
+
+    def _load_priority_weights(self) -> Dict[str, np.ndarray]:
+        weights, _ = load_policy_weights(self.priority_policy_path)
+        for action_type in self.optimizer.action_types:
+            if np.shape(weights.get(action_type)) != (5,):
+                raise ValueError(
+                    f"{self.priority_policy_path} has no 5-feature {action_type!r} weights; "
+                    "expected an OumiRLPriorityOptimizer policy"
+                )
+        return weights
+
+    def maybe_reload(self, force: bool = False) -> bool:
+        """
+        Reload weights if a policy file changed; checks at most once per reload_interval
+
+        A file that cannot be read or does not hold the expected weights
+        (e.g. it is mid-write) is skipped: the current weights keep serving
+        and the file is retried at the next check.
+        """
+        with self._reload_lock:
+            now = time.monotonic()
+            if not force and now - self._last_check < self.reload_interval:
+                return False
+            self._last_check = now
+            reloaded = False
+
+            mtime = self._changed_mtime(self.policy_path)
+            if mtime is not None:
+                try:
+                    weights = self._load_agent_weights()
+                except (OSError, ValueError, KeyError):  # ValueError includes JSONDecodeError
+                    weights = None
+                if weights is not None:
+                    # Swap the whole dict so in-flight batches keep a consistent set of weights
+                    self.agent.weights = weights
+                    self._mtimes[self.policy_path] = mtime
+                    reloaded = True
+
+            mtime = self._changed_mtime(self.priority_policy_path)
+            if mtime is not None:
+                try:
+                    weights = self._load_priority_weights()
+                except (OSError, ValueError, KeyError):
+                    weights = None
+                if weights is not None:
+                    self.optimizer.publish_weights(weights)
+                    self._mtimes[self.priority_policy_path] = mtime
+                    reloaded = True
+
+            if reloaded:
+                self.version += 1
+            return reloaded
+
+
+class LatencyTracker:
+    """Fixed-size window of recent request latencies"""
+
+    def __init__(self, window: int = 100_000):
+        self._latencies = np.zeros(window)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._latencies[self._count % len(self._latencies)] = seconds
+            self._count += 1
+
+    def summary(self) -> Dict:
+        with self._lock:
+            recent = self._latencies[:min(self._count, len(self._latencies))].copy()
+            count = self._count
+        if not len(recent):
+            return {'requests': 0, 'p50_ms': 0.0, 'p99_ms': 0.0}
+        p50, p99 = np.percentile(recent, [50, 99]) * 1000
+        return {'requests': count, 'p50_ms': float(p50), 'p99_ms': float(p99)}
+
+
+class _Pending:
+    __slots__ = ('payload', 'result', 'error', 'done')
+
+    def __init__(self, payload: Dict):
+        self.payload = payload
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent requests into one batch call
+
+    A batch is dispatched once it holds `max_batch` requests or `max_wait`
+    seconds after its first request arrived, whichever comes first. If the
+    batch call raises, its requests are retried one at a time so only the
+    failing ones see the error.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Dict]], List[Dict]],
+        max_batch: int = 256,
+        max_wait: float = 0.002,
+    ):
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.batched_requests = 0
+        self.fallbacks = 0  # Batches that raised and were retried row by row
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, payload: Dict) -> Dict:
+        """Queue one request and block until its batch has been processed"""
+        pending = _Pending(payload)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+
+            try:
+                results = self.handler([pending.payload for pending in batch])
+                for pending, result in zip(batch, results):
+                    pending.result = result
+            except Exception as error:
+                if len(batch) == 1:
+                    batch[0].error = error
+                else:
+                    self.fallbacks += 1
+                    for pending in batch:
+                        try:
+                            pending.result = self.handler([pending.payload])[0]
+                        except Exception as row_error:
+                            pending.error = row_error
+
+            self.batches += 1
+            self.batched_requests += len(batch)
+            for pending in batch:
+                pending.done.set()
+
+
+class PolicyService:
+    """Vectorized request handlers shared by all connections"""
+
+    def __init__(self, store: PolicyStore, max_batch: int = 256, max_wait: float = 0.002):
+        self.store = store
+        self.latency = LatencyTracker()
+        self.batchers = {
+            '/prioritize': MicroBatcher(self._prioritize, max_batch, max_wait),
+            '/select-action': MicroBatcher(self._select_action, max_batch, max_wait),
+        }
+
+    def _prioritize(self, requests: List[Dict]) -> List[Dict]:
+        self.store.maybe_reload()
+        disasters = [request.get('disaster', {}) for request in requests]
+        resources = np.array([request.get('available_resources', 7) for request in requests])
+        ranked = self.store.optimizer.optimize_actions_batch(disasters, available_resources=resources)
+
+        names = ranked['action_types'][ranked['ranking']].tolist()
+        scores = ranked['priority_scores'].tolist()
+        return [
+            {
+                'actions': [
+                    {'action_type': name, 'priority_score': score}
+                    for name, score in zip(row_names, row_scores)
+                ],
+                'policy_version': self.store.version,
+            }
+            for row_names, row_scores in zip(names, scores)
+        ]
+
+    def _select_action(self, requests: List[Dict]) -> List[Dict]:
+        self.store.maybe_reload()
+        states = [request['state'] for request in requests]
+        batch = DisasterStateBatch(
+            severity=np.array([s['severity'] for s in states]),
+            num_alerts=np.array([s['num_alerts'] for s in states]),
+            response_delay=np.array([s['response_delay'] for s in states], dtype=float),
+            available_resources=np.array([s['available_resources'] for s in states]),
+            disaster_type=np.array([DISASTER_TYPE_CODES.get(s.get('disaster_type'), 0) for s in states]),
+        )
+        actions, action_types = self.store.agent.greedy_action_batch(batch)
+
+        return [
+            {
+                'action_type': ACTION_TYPES[t],
+                'action': {
+                    'rescue_allocation': rescue,
+                    'medical_deployment': medical,
+                    'logistics_routing': logistics,
+                },
+                'policy_version': self.store.version,
+            }
+            for t, rescue, medical, logistics in zip(
+                action_types.tolist(),
+                actions.rescue_allocation.tolist(),
+                actions.medical_deployment.tolist(),
+                actions.logistics_routing.tolist(),
+            )
+        ]
+
+    def metrics(self) -> Dict:
+        batches = sum(b.batches for b in self.batchers.values())
+        requests = sum(b.batched_requests for b in self.batchers.values())
+        return {
+            **self.latency.summary(),
+            'batches': batches,
+            'mean_batch_size': requests / batches if batches else 0.0,
+            'batch_fallbacks': sum(b.fallbacks for b in self.batchers.values()),
+            'policy_version': self.store.version,
+        }
+
+    def close(self):
+        for batcher in self.batchers.values():
+            batcher.close()
+
+
+class PolicyRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    service: PolicyService = None  # Set on the server-specific subclass
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            self._send(200, self.service.metrics())
+        else:
+            self._send(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        started = time.perf_counter()
+        batcher = self.service.batchers.get(self.path)
+        header = self.headers.get('Content-Length')
+        try:
+            length = int(header) if header is not None else -1
+        except ValueError:
+            length = -1
+        if length < 0:
+            # The body's extent is unknown, so the connection cannot be reused
+            self.close_connection = True
+            if header is None:
+                self._send(411, {'error': 'Content-Length required'})
+            else:
+                self._send(400, {'error': 'Content-Length must be a non-negative integer'})
+            return
+        body = self.rfile.read(length)
+        if batcher is None:
+            self._send(404, {'error': 'Not found'})
+            return
+
+        try:
+            # Malformed requests are rejected here so they cannot fail a whole batch
+            payload = REQUEST_PARSERS[self.path](json.loads(body or b'{}'))
+        except ValueError as error:  # Includes JSON and UTF-8 decoding errors
+            self._send(400, {'error': str(error)})
+            return
+        try:
+            result = batcher.submit(payload)
+        except Exception as error:
+            self._send(500, {'error': str(error)})
+            return
+        self._send(200, result)
+        self.service.latency.record(time.perf_counter() - started)
+
+    def _send(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        super().server_bind()
+
+
+def create_server(
+    service: PolicyService,
+    host: str = '127.0.0.1',
+    port: int = 8765,
+    unix_socket: Optional[str] = None,
+):
+    """Build an HTTP server bound to a TCP port or, if given, a Unix socket path"""
+    handler = type('BoundPolicyRequestHandler', (PolicyRequestHandler,), {'service': service})
+    if unix_socket:
+        return UnixHTTPServer(unix_socket, handler)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket"""
+
+    def __init__(self, path: str):
+        super().__init__('localhost')
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+def run_load(
+    num_requests: int = 10000,
+    concurrency: int = 32,
+    endpoint: str = '/prioritize',
+    host: str = '127.0.0.1',
+    port: int = 8765,
+    unix_socket: Optional[str] = None,
+    seed: int = 0,
+) -> Dict:
+    """
+    Send random requests from `concurrency` keep-alive clients
+
+    Returns: client-side throughput and p50/p99 latency
+    """
+    rng = np.random.default_rng(seed)
+    severities = ['low', 'medium', 'high', 'critical']
+    bodies = []
+    for _ in range(min(num_requests, 1000)):
+        if endpoint == '/prioritize':
+            payload = {
+                'disaster': {
+                    'severity': severities[rng.integers(4)],
+                    'disaster_type': DISASTER_TYPES[rng.integers(len(DISASTER_TYPES))],
+                    'affected_population': int(rng.integers(100, 200000)),
+                },
+                'available_resources': int(rng.integers(1, 20)),
+            }
+        else:
+            payload = {'state': {
+                'severity': int(rng.integers(4)),
+                'num_alerts': int(rng.integers(1, 11)),
+                'response_delay': float(rng.uniform(0, 12)),
+                'available_resources': int(rng.integers(5, 21)),
+                'disaster_type': DISASTER_TYPES[rng.integers(4)],
+            }}
+        bodies.append(json.dumps(payload).encode())
+
+    latencies = np.zeros(num_requests)
+    counter = iter(range(num_requests))
+    counter_lock = threading.Lock()
+
+    def client():
+        connection = UnixHTTPConnection(unix_socket) if unix_socket else http.client.HTTPConnection(host, port)
+        while True:
+            with counter_lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            started = time.perf_counter()
+            connection.request('POST', endpoint, body=bodies[i % len(bodies)],
+                               headers={'Content-Type': 'application/json'})
+            connection.getresponse().read()
+            latencies[i] = time.perf_counter() - started
+        connection.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    return {
+        'requests': num_requests,
+        'concurrency': concurrency,
+        'requests_per_sec': num_requests / elapsed,
+        'p50_ms': float(p50),
+        'p99_ms': float(p99),
+    }
+
+
+def benchmark(
+    policy_path: Optional[str],
+    num_requests: int,
+    concurrency: int,
+    endpoint: str,
+    max_batch: int,
+    max_wait: float,
+    priority_policy_path: Optional[str] = None,
+    seed: Optional[int] = 0,
+) -> Dict:
+    """Start an in-process server on a temporary Unix socket and load it"""
+    store = PolicyStore(policy_path, priority_policy_path=priority_policy_path, seed=seed)
+    service = PolicyService(store, max_batch, max_wait)
+    socket_path = os.path.join(tempfile.mkdtemp(), 'policy.sock')
+    server = create_server(service, unix_socket=socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = run_load(num_requests, concurrency, endpoint, unix_socket=socket_path)
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+        os.unlink(socket_path)
+    return {'client': client, 'server': service.metrics()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the learned Oumi RL policy locally")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Run the policy server")
+    bench_parser = commands.add_parser("bench", help="Benchmark an in-process server offline")
+    for sub in (serve_parser, bench_parser):
+        sub.add_argument("--policy", default=None, help="Agent policy file (JSON or binary) for /select-action")
+        sub.add_argument("--priority-policy", default=None,
+                         help="Priority optimizer policy file (JSON or binary) for /prioritize")
+        sub.add_argument("--max-batch", type=int, default=256, help="Maximum requests per batch")
+        sub.add_argument("--max-wait-ms", type=float, default=2.0,
+                         help="Maximum time a batch waits for more requests")
+        sub.add_argument("--seed", type=int, default=0,
+                         help="Seed of the initial agent weights served by /select-action without --policy")
+
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--unix-socket", default=None, help="Listen on a Unix socket instead of TCP")
+
+    bench_parser.add_argument("--requests", type=int, default=10000)
+    bench_parser.add_argument("--concurrency", type=int, default=32)
+    bench_parser.add_argument("--endpoint", default="/prioritize", choices=["/prioritize", "/select-action"])
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        store = PolicyStore(args.policy, priority_policy_path=args.priority_policy, seed=args.seed)
+        if args.policy is None:
+            print(f"No --policy given: /select-action serves untrained weights (seed {args.seed})")
+        service = PolicyService(store, args.max_batch, args.max_wait_ms / 1000)
+        server = create_server(service, args.host, args.port, args.unix_socket)
+        print(f"Serving policy on {args.unix_socket or f'http://{args.host}:{args.port}'}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            service.close()
+    else:
+        results = benchmark(
+            args.policy, args.requests, args.concurrency, args.endpoint,
+            args.max_batch, args.max_wait_ms / 1000, args.priority_policy, args.seed,
+        )
+        print(json.dumps(results, indent=2))
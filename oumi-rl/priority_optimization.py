@@ -0,0 +1,576 @@
+"""
+Oumi Reinforcement Learning Model for Disaster Response Priority Optimization
+
+This module demonstrates how to use Oumi RL to train a model that optimizes
+priority scores for disaster response actions based on historical outcomes.
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from oumi_rl.encoding import (
+    DEFAULT_PRIORITY_WEIGHTS,
+    DISASTER_TYPE_CODES,
+    PRIORITY_ACTION_TYPES,
+    SEVERITY_CODES,
+)
+
+
+class DisasterStateRepresentation:
+    """Represents the state of a disaster for RL decision making"""
+
+    # Shared by every instance; see oumi_rl/encoding.py
+    severity_map = SEVERITY_CODES
+    type_map = DISASTER_TYPE_CODES
+
+    def __init__(
+        self,
+        severity: str,
+        disaster_type: str,
+        affected_population: int,
+        available_resources: int,
+        time_elapsed: float
+    ):
+        self.severity = self.severity_map.get(severity, 1)
+        self.disaster_type = self.type_map.get(disaster_type, 0)
+        self.affected_population = min(affected_population / 100000, 1.0)
+        self.available_resources = min(available_resources / 10, 1.0)
+        self.time_elapsed = min(time_elapsed / 24, 1.0)
+
+    def to_vector(self) -> np.ndarray:
+        """Convert state to feature vector for RL model"""
+        return np.array([
+            self.severity / 3.0,
+            self.disaster_type / 5.0,
+            self.affected_population,
+            self.available_resources,
+            self.time_elapsed
+        ])
+
+
+def _encode_column(values, mapping: Dict[str, int], default: int) -> np.ndarray:
+    """
+    Map a column of category names to integer codes; numeric columns pass through
+
+    Unknown names and values that are not strings (e.g. None) get `default`,
+    as in DisasterStateRepresentation.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in "iuf":
+        return values.astype(np.int64)
+    if values.dtype.kind != "U":
+        # Mixed object column: np.unique cannot sort None against strings
+        return np.array(
+            [mapping.get(v, default) if isinstance(v, str) else default for v in values.ravel().tolist()],
+            dtype=np.int64,
+        ).reshape(values.shape)
+    names, inverse = np.unique(values, return_inverse=True)
+    codes = np.array([mapping.get(name, default) for name in names.tolist()], dtype=np.int64)
+    return codes[inverse.reshape(values.shape)]
+
+
+def encode_state_matrix(
+    severity,
+    disaster_type,
+    affected_population,
+    available_resources,
+    time_elapsed
+) -> np.ndarray:
+    """
+    Build an (N, 5) state matrix from column arrays.
+
+    Row i equals DisasterStateRepresentation(...).to_vector() for the i-th
+    values. Severity and disaster type may be given as names or as codes.
+    """
+    severity = _encode_column(severity, SEVERITY_CODES, 1)
+    disaster_type = _encode_column(disaster_type, DISASTER_TYPE_CODES, 0)
+    n = len(severity)
+
+    return np.column_stack([
+        severity / 3.0,
+        disaster_type / 5.0,
+        np.minimum(np.broadcast_to(affected_population, n) / 100000, 1.0),
+        np.minimum(np.broadcast_to(available_resources, n) / 10, 1.0),
+        np.minimum(np.broadcast_to(time_elapsed, n) / 24, 1.0),
+    ])
+
+
+class PriorityLookupTable:
+    """
+    Precomputed priorities for every action type on a quantized state grid.
+
+    Severity (4 levels) and disaster type (6 types) are stored exactly. The
+    population, resource and time features (already scaled to [0, 1]) are
+    snapped to the nearest of `population_bins`, `resource_bins` and
+    `time_bins` evenly spaced points. A lookup is then a single array index
+    instead of a dot product.
+
+    The defaults make whole resource units and whole hours exact, leaving
+    population as the only rounded feature. Because priorities are linear
+    in the features before clipping, and clipping never increases a
+    difference, the error against calculate_priority is at most
+    `error_bound[a] = 100 * sum_d |w[a, d]| * step_d / 2` (plus float32
+    rounding).
+    """
+
+    def __init__(
+        self,
+        weight_matrix: np.ndarray,
+        population_bins: int = 101,
+        resource_bins: int = 11,
+        time_bins: int = 25
+    ):
+        self.weights = np.array(weight_matrix, dtype=np.float64)
+        self.bins = np.array([population_bins, resource_bins, time_bins])
+        self._steps = (population_bins - 1, resource_bins - 1, time_bins - 1)
+
+        # Priority before clipping is a sum of per-feature terms, so the grid
+        # is built by broadcasting one axis per feature
+        w = self.weights.T * 100
+        severity = (np.arange(4) / 3.0)[:, None] * w[0]
+        disaster_type = (np.arange(6) / 5.0)[:, None] * w[1]
+        continuous = [np.linspace(0.0, 1.0, n)[:, None] * w[d + 2] for d, n in enumerate(self.bins)]
+
+        table = (
+            severity[:, None, None, None, None, :]
+            + disaster_type[None, :, None, None, None, :]
+            + continuous[0][None, None, :, None, None, :]
+            + continuous[1][None, None, None, :, None, :]
+            + continuous[2][None, None, None, None, :, :]
+        )
+        self.table = np.clip(table, 0, 100).astype(np.float32)
+
+        half_steps = 0.5 / (self.bins - 1)
+        rounding = 100 * np.finfo(np.float32).eps
+        self.error_bound = 100 * np.abs(self.weights[:, 2:]) @ half_steps + rounding
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+    def lookup(
+        self,
+        severity: int,
+        disaster_type: int,
+        affected_population: float,
+        available_resources: float,
+        time_elapsed: float,
+        action_index: int
+    ) -> float:
+        """Priority of one state (codes and [0, 1] features) for one action type"""
+        p, r, t = self._steps
+        return self.table.item(
+            severity, disaster_type,
+            int(max(affected_population, 0.0) * p + 0.5),
+            int(max(available_resources, 0.0) * r + 0.5),
+            int(max(time_elapsed, 0.0) * t + 0.5),
+            action_index,
+        )
+
+    def lookup_batch(self, state_matrix: np.ndarray) -> np.ndarray:
+        """(N, num_actions) priorities for an encoded (N, 5) state matrix"""
+        # One flat row index per state, then a single gather of whole rows
+        p, r, t = self._steps
+        row = np.rint(state_matrix[:, 0] * 3).astype(np.intp) * 6
+        row += np.rint(state_matrix[:, 1] * 5).astype(np.intp)
+        for column, steps in ((2, p), (3, r), (4, t)):
+            row *= steps + 1
+            row += np.rint(np.clip(state_matrix[:, column], 0, 1) * steps).astype(np.intp)
+        rows = self.table.reshape(-1, self.table.shape[-1])
+        return rows.take(row, axis=0).astype(np.float64)
+
+    def error_report(self, num_samples: int = 100000, seed: int = 0) -> Dict[str, Dict[str, float]]:
+        """
+        Guaranteed and measured error against the exact dot product.
+
+        The measured error uses uniformly random continuous states.
+        """
+        rng = np.random.default_rng(seed)
+        state_matrix = np.column_stack([
+            rng.integers(0, 4, num_samples) / 3.0,
+            rng.integers(0, 6, num_samples) / 5.0,
+            rng.random((num_samples, 3)),
+        ])
+        exact = np.clip(state_matrix @ self.weights.T * 100, 0, 100)
+        error = np.abs(self.lookup_batch(state_matrix) - exact)
+        return {
+            "error_bound": self.error_bound.tolist(),
+            "max_error": error.max(axis=0).tolist(),
+            "mean_error": error.mean(axis=0).tolist(),
+        }
+
+
+class OumiRLPriorityOptimizer:
+    """
+    Oumi RL-based priority optimizer for disaster response actions.
+
+    This is a simplified demonstration. In production, you would:
+    1. Train on historical disaster response data
+    2. Use Oumi's PPO or DQN implementations
+    3. Continuously update with real-world feedback
+
+    Feedback updates never modify the published weight arrays in place:
+    they build a new `weights` dict and swap it in with publish_weights, so
+    concurrent scorers always see one complete set of weights.
+
+    Args:
+        learning_rate: Step size of feedback updates
+    """
+
+    def __init__(self, learning_rate: float = 0.01):
+        self.action_types = list(PRIORITY_ACTION_TYPES)
+        self.learning_rate = learning_rate
+        self.weights = self._initialize_weights()
+        self.weights_version = 0
+        self.lookup_table: Optional[PriorityLookupTable] = None
+        self._lookup_bins: Optional[Tuple[int, int, int]] = None
+        self._lookup_stale = False
+        self._lookup_version = 0
+        self._action_index: Dict[str, int] = {}
+
+    def _initialize_weights(self) -> Dict[str, np.ndarray]:
+        """Initialize action-specific weight vectors"""
+        return {action_type: np.array(w) for action_type, w in DEFAULT_PRIORITY_WEIGHTS.items()}
+
+    def calculate_priority(
+        self,
+        state: DisasterStateRepresentation,
+        action_type: str
+    ) -> float:
+        """
+        Calculate priority score using learned weights.
+
+        In a full Oumi RL implementation, this would be the policy network output.
+        """
+        if action_type not in self.weights:
+            action_type = "rescue"
+
+        if self.lookup_table is not None:
+            return self._current_lookup_table().lookup(
+                state.severity, state.disaster_type, state.affected_population,
+                state.available_resources, state.time_elapsed,
+                self._action_index[action_type]
+            )
+
+        state_vector = state.to_vector()
+        weights = self.weights[action_type]
+
+        priority = float(np.dot(state_vector, weights))
+        priority = min(max(priority * 100, 0), 100)
+
+        return priority
+
+    def optimize_actions(
+        self,
+        disaster_data: Dict,
+        available_resources: int = 7
+    ) -> List[Dict]:
+        """
+        Generate optimized priority actions for a disaster.
+
+        Args:
+            disaster_data: Dictionary containing disaster information
+            available_resources: Number of available resource units
+
+        Returns:
+            List of action dictionaries with optimized priority scores
+        """
+        state = DisasterStateRepresentation(
+            severity=disaster_data.get("severity", "medium"),
+            disaster_type=disaster_data.get("disaster_type", "earthquake"),
+            affected_population=disaster_data.get("affected_population", 1000),
+            available_resources=available_resources,
+            time_elapsed=0.0
+        )
+
+        actions = []
+
+        for action_type in self.action_types:
+            priority_score = self.calculate_priority(state, action_type)
+
+            actions.append({
+                "action_type": action_type,
+                "priority_score": priority_score,
+                "state_features": state.to_vector().tolist()
+            })
+
+        actions.sort(key=lambda x: x["priority_score"], reverse=True)
+        return actions
+
+    def enable_lookup_table(
+        self,
+        population_bins: int = 101,
+        resource_bins: int = 11,
+        time_bins: int = 25
+    ) -> PriorityLookupTable:
+        """
+        Serve calculate_priority from a precomputed PriorityLookupTable.
+
+        Its scores then differ from the exact dot product by at most
+        `lookup_table.error_bound`. calculate_priority_batch stays exact,
+        since an (N, 5) x (5, 4) matrix product is already cheaper than
+        gathering N table rows.
+
+        The table is rebuilt on the next lookup after the weights change
+        through publish_weights (which the feedback updates use); call
+        invalidate_lookup_table() after assigning `weights` directly.
+        """
+        self._lookup_bins = (population_bins, resource_bins, time_bins)
+        self._lookup_version = self.weights_version
+        self.lookup_table = PriorityLookupTable(self.weight_matrix(), *self._lookup_bins)
+        self._lookup_stale = False
+        self._action_index = {action_type: i for i, action_type in enumerate(self.action_types)}
+        return self.lookup_table
+
+    def disable_lookup_table(self):
+        """Go back to exact dot-product scoring"""
+        self.lookup_table = None
+        self._lookup_bins = None
+        self._action_index = {}
+
+    def invalidate_lookup_table(self):
+        """Mark the lookup table out of date with the weights"""
+        self._lookup_stale = True
+
+    def _current_lookup_table(self) -> PriorityLookupTable:
+        if self._lookup_stale or self._lookup_version != self.weights_version:
+            # Record the version first: a publish during the rebuild leaves
+            # the table marked stale rather than silently out of date
+            self._lookup_version = self.weights_version
+            self._lookup_stale = False
+            self.lookup_table = PriorityLookupTable(self.weight_matrix(), *self._lookup_bins)
+        return self.lookup_table
+
+    def weight_matrix(self) -> np.ndarray:
+        """Weights stacked in `action_types` order, shape (num_actions, 5)"""
+        weights = self.weights
+        return np.stack([weights[action_type] for action_type in self.action_types])
+
+    def publish_weights(self, weights: Dict[str, np.ndarray]):
+        """
+        Atomically replace the weights (copy-on-write).
+
+        Scorers that already read `weights` keep using the old dict; later
+        reads see the new one. `weights_version` counts publications.
+        """
+        self.weights = weights
+        self.weights_version += 1
+
+    def calculate_priority_batch(self, state_matrix: np.ndarray) -> np.ndarray:
+        """
+        Priority scores for every (state, action type) pair at once.
+
+        Returns an (N, num_actions) array in `action_types` column order,
+        matching calculate_priority row by row.
+        """
+        return np.clip(state_matrix @ self.weight_matrix().T * 100, 0, 100)
+
+    def optimize_actions_batch(
+        self,
+        disasters: Optional[List[Dict]] = None,
+        available_resources=7,
+        columns: Optional[Dict[str, np.ndarray]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Rank action types for many disasters with one matrix product.
+
+        Args:
+            disasters: Disaster dicts, as accepted by optimize_actions
+            available_resources: Resource units, scalar or one per disaster
+            columns: Alternatively, column arrays keyed by severity,
+                disaster_type, affected_population and optionally
+                time_elapsed
+
+        Returns:
+            Dictionary with:
+            - action_types: array of action type names (column labels)
+            - ranking: (N, num_actions) indices into action_types, best first
+            - priority_scores: (N, num_actions) scores in ranking order
+            - state_features: (N, 5) state matrix
+        """
+        if columns is None:
+            disasters = disasters or []
+            columns = {
+                "severity": [d.get("severity", "medium") for d in disasters],
+                "disaster_type": [d.get("disaster_type", "earthquake") for d in disasters],
+                "affected_population": np.array(
+                    [d.get("affected_population", 1000) for d in disasters], dtype=float
+                ),
+            }
+
+        state_matrix = encode_state_matrix(
+            columns["severity"],
+            columns["disaster_type"],
+            columns["affected_population"],
+            available_resources,
+            columns.get("time_elapsed", 0.0)
+        )
+        priorities = self.calculate_priority_batch(state_matrix)
+        ranking = np.argsort(-priorities, axis=1, kind="stable")
+
+        return {
+            "action_types": np.array(self.action_types),
+            "ranking": ranking,
+            "priority_scores": np.take_along_axis(priorities, ranking, axis=1),
+            "state_features": state_matrix,
+        }
+
+    def update_from_feedback(
+        self,
+        state: DisasterStateRepresentation,
+        action_type: str,
+        reward: float
+    ):
+        """
+        Update model weights based on outcome feedback.
+
+        In full Oumi implementation, this would be part of the training loop
+        using PPO, DQN, or other RL algorithms.
+        """
+        state_vector = state.to_vector()
+        weights = self.weights
+
+        if action_type in weights:
+            gradient = reward * state_vector
+            updated = np.clip(weights[action_type] + self.learning_rate * gradient, 0, 1)
+            self.publish_weights({**weights, action_type: updated})
+
+    def update_from_feedback_batch(
+        self,
+        state_matrix: np.ndarray,
+        action_type_indices: np.ndarray,
+        rewards: np.ndarray,
+        learning_rate: Optional[float] = None
+    ):
+        """
+        Minibatch version of update_from_feedback.
+
+        Each action type's weights move by the mean reward-weighted state
+        vector of its rows, then are clipped to [0, 1] once per batch.
+
+        Args:
+            state_matrix: (N, 5) state features, e.g. from encode_state_matrix
+            action_type_indices: Row index into `action_types` per outcome
+            rewards: Reward per outcome
+            learning_rate: Step size (default: self.learning_rate)
+        """
+        if learning_rate is None:
+            learning_rate = self.learning_rate
+        num_actions = len(self.action_types)
+        gradients = np.zeros((num_actions, state_matrix.shape[1]))
+        np.add.at(gradients, action_type_indices, rewards[:, None] * state_matrix)
+        counts = np.bincount(action_type_indices, minlength=num_actions)
+
+        weights = dict(self.weights)
+        for i, action_type in enumerate(self.action_types):
+            if counts[i]:
+                updated = weights[action_type] + learning_rate * gradients[i] / counts[i]
+                weights[action_type] = np.clip(updated, 0, 1)
+        self.publish_weights(weights)
+
+
+def calculate_reward(
+    action_taken: Dict,
+    outcome: Dict
+) -> float:
+    """
+    Calculate reward based on action outcome for RL training.
+
+    Positive rewards for:
+    - High number of people helped
+    - Fast response time
+    - Efficient resource usage
+
+    Negative rewards for:
+    - Delays
+    - Resource waste
+    - Low impact
+    """
+    base_reward = 0.0
+
+    people_helped = outcome.get("people_helped", 0)
+    estimated_impact = action_taken.get("estimated_impact", 1)
+
+    effectiveness = min(people_helped / max(estimated_impact, 1), 2.0)
+    base_reward += effectiveness * 50
+
+    completion_time = outcome.get("completion_time_hours", 24)
+    deadline_hours = outcome.get("deadline_hours", 24)
+
+    if completion_time <= deadline_hours:
+        time_bonus = (1 - completion_time / deadline_hours) * 20
+        base_reward += time_bonus
+    else:
+        time_penalty = (completion_time - deadline_hours) / deadline_hours * 30
+        base_reward -= time_penalty
+
+    resources_used = outcome.get("resources_used", 1)
+    resources_allocated = action_taken.get("resources_allocated", 1)
+    efficiency = 1 - abs(resources_used - resources_allocated) / max(resources_allocated, 1)
+    base_reward += efficiency * 10
+
+    return max(min(base_reward, 100), -50)
+
+
+def calculate_reward_batch(
+    estimated_impact: np.ndarray,
+    resources_allocated: np.ndarray,
+    people_helped: np.ndarray,
+    completion_time_hours: np.ndarray,
+    deadline_hours: np.ndarray,
+    resources_used: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorized calculate_reward for re-scoring historical outcomes in bulk.
+
+    Takes one column per action/outcome field and returns a reward vector
+    whose element i equals calculate_reward on row i exactly.
+    """
+    estimated_impact = np.asarray(estimated_impact)
+    resources_allocated = np.asarray(resources_allocated)
+    completion_time = np.asarray(completion_time_hours, dtype=float)
+    deadline = np.asarray(deadline_hours, dtype=float)
+
+    base_reward = np.zeros(completion_time.shape)
+
+    effectiveness = np.minimum(np.asarray(people_helped) / np.maximum(estimated_impact, 1), 2.0)
+    base_reward += effectiveness * 50
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        time_bonus = (1 - completion_time / deadline) * 20
+        time_penalty = (completion_time - deadline) / deadline * 30
+    base_reward = np.where(
+        completion_time <= deadline,
+        base_reward + time_bonus,
+        base_reward - time_penalty
+    )
+
+    efficiency = 1 - np.abs(np.asarray(resources_used) - resources_allocated) / np.maximum(resources_allocated, 1)
+    base_reward += efficiency * 10
+
+    return np.clip(base_reward, -50, 100)
+
+
+def main():
+    """Run the priority optimization demo"""
+    optimizer = OumiRLPriorityOptimizer()
+
+    example_disaster = {
+        "severity": "critical",
+        "disaster_type": "earthquake",
+        "affected_population": 25000
+    }
+
+    print("Oumi RL Priority Optimization Demo")
+    print("=" * 50)
+    print(f"\nDisaster: {example_disaster}")
+    print("\nOptimized Actions:")
+
+    actions = optimizer.optimize_actions(example_disaster)
+
+    for i, action in enumerate(actions, 1):
+        print(f"{i}. {action['action_type'].upper()}: Priority Score = {action['priority_score']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
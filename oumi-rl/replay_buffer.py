@@ -0,0 +1,132 @@
+"""
+Experience Replay for Oumi RL Training
+
+Array-backed ring buffer of transitions for minibatch TD updates. Each row
+holds the state-action feature vector from `OumiRLAgent.features()`, the
+reward and the action type index, plus a sampling priority derived from the
+row's last TD error. Multi-step transitions also keep the next state's
+feature vector, its available resources and a done flag so the TD target
+can be bootstrapped with the current weights at sampling time.
+
+Sampling:
+- Uniform: every stored transition equally likely
+- Prioritized: P(i) ~ (|td_error_i| + eps)^alpha, with importance-sampling
+  weights (N * P(i))^-beta normalized to a maximum of 1
+
+Samples are drawn from the buffer's `rng`; OumiRLAgent passes its own stream.
+"""
+
+import numpy as np
+from typing import Dict, Optional
+
+
+class ReplayBuffer:
+    """Fixed-capacity transition store with uniform and prioritized sampling"""
+
+    __slots__ = (
+        'capacity', 'alpha', 'epsilon', 'rng', '_size', '_next', '_max_priority',
+        'features', 'action_types', 'rewards', 'priorities',
+        'next_states', 'next_budgets', 'dones',
+    )
+
+    def __init__(
+        self,
+        capacity: int = 100_000,
+        num_features: int = 8,
+        num_state_features: int = 5,
+        alpha: float = 0.6,
+        epsilon: float = 1e-3,
+        rng: Optional[np.random.Generator] = None,
+    ):
+        self.capacity = capacity
+        self.alpha = alpha
+        self.epsilon = epsilon
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self._size = 0
+        self._next = 0
+        self._max_priority = 1.0
+
+        self.features = np.empty((capacity, num_features), dtype=np.float64)
+        self.action_types = np.empty(capacity, dtype=np.int64)
+        self.rewards = np.empty(capacity, dtype=np.float64)
+        self.priorities = np.empty(capacity, dtype=np.float64)
+        self.next_states = np.zeros((capacity, num_state_features), dtype=np.float64)
+        self.next_budgets = np.zeros(capacity, dtype=np.int64)
+        self.dones = np.ones(capacity, dtype=bool)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(
+        self,
+        features: np.ndarray,
+        action_types: np.ndarray,
+        rewards: np.ndarray,
+        next_states: Optional[np.ndarray] = None,
+        next_budgets: Optional[np.ndarray] = None,
+        dones: Optional[np.ndarray] = None
+    ):
+        """
+        Store a batch of transitions, overwriting the oldest when full
+
+        Without `next_states` the transitions are stored as terminal.
+        """
+        n = len(rewards)
+        rows = slice(max(n - self.capacity, 0), n)
+        n = min(n, self.capacity)
+        index = (self._next + np.arange(n)) % self.capacity
+
+        self.features[index] = features[rows]
+        self.action_types[index] = action_types[rows]
+        self.rewards[index] = rewards[rows]
+        if next_states is None:
+            self.dones[index] = True
+        else:
+            self.next_states[index] = next_states[rows]
+            self.next_budgets[index] = next_budgets[rows]
+            self.dones[index] = dones[rows]
+        # New transitions get the highest priority seen so they are replayed at least once
+        self.priorities[index] = self._max_priority
+
+        self._next = (self._next + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    def sample(
+        self,
+        batch_size: int,
+        prioritized: bool = False,
+        beta: float = 0.4
+    ) -> Dict[str, Optional[np.ndarray]]:
+        """
+        Sample a minibatch of stored transitions
+
+        Returns a dict of row arrays (indices, features, action_types, rewards,
+        next_states, next_budgets, dones) plus importance_weights, which is
+        None for uniform sampling.
+        """
+        if prioritized:
+            scaled = self.priorities[:self._size] ** self.alpha
+            probabilities = scaled / scaled.sum()
+            indices = self.rng.choice(self._size, size=batch_size, p=probabilities)
+            importance_weights = (self._size * probabilities[indices]) ** -beta
+            importance_weights /= importance_weights.max()
+        else:
+            indices = self.rng.integers(0, self._size, size=batch_size)
+            importance_weights = None
+
+        return {
+            'indices': indices,
+            'features': self.features[indices],
+            'action_types': self.action_types[indices],
+            'rewards': self.rewards[indices],
+            'next_states': self.next_states[indices],
+            'next_budgets': self.next_budgets[indices],
+            'dones': self.dones[indices],
+            'importance_weights': importance_weights,
+        }
+
+    def update_priorities(self, indices: np.ndarray, td_errors: np.ndarray):
+        """Set the priorities of sampled transitions from their new TD errors"""
+        priorities = np.abs(td_errors) + self.epsilon
+        self.priorities[indices] = priorities
+        self._max_priority = max(self._max_priority, float(priorities.max()))
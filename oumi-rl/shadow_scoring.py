@@ -0,0 +1,376 @@
+"""
+Shadow Scoring: Learned Policy vs Edge Function Heuristic
+
+Scores each disaster with both the learned OumiRLPriorityOptimizer and the
+rule-based calculateRLPriority / generatePriorityActions heuristic that the
+rl-prioritize edge function uses today (ported in oumi_rl/heuristic.py),
+and logs the disasters where their rankings disagree.
+
+Dashboards re-score the same disasters on every refresh, so decisions are
+cached per quantized state:
+- the key is the encoded state with affected_population snapped to
+  `population_bins` grid points (as PriorityLookupTable does), plus the
+  population term of the heuristic, which saturates at 5,000 people
+- entries expire after `ttl` seconds, and the least recently used entry is
+  evicted once `max_entries` are held
+- every entry is tagged with the optimizer's weights_version it was
+  computed under and only served under that version, so a published
+  feedback update is visible on the next call, even to a scorer thread
+  that raced with the publication
+- learned priorities are computed at the grid point, so a cached decision
+  is the same whichever disaster filled it. Their error against exact
+  scoring is at most 100 * |w_population| / (2 * (population_bins - 1))
+
+Usage:
+    python shadow_scoring.py --disasters 2000 --refreshes 50 --log disagreements.jsonl
+    python shadow_scoring.py --policy offline_policy.json --update-every 10
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from oumi_rl.encoding import DISASTER_TYPE_CODES, DISASTER_TYPES, SEVERITY_CODES, SEVERITY_NAMES
+from oumi_rl.heuristic import calculate_rl_priority, generated_action_types
+from priority_optimization import OumiRLPriorityOptimizer
+
+
+# affected_population at which the heuristic's population weight stops growing
+HEURISTIC_POPULATION_CAP = 5000
+
+StateKey = Tuple[int, int, int, int, int]
+
+
+class DecisionCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and version tags
+
+    An entry put under one version is a miss for lookups under another;
+    `sync_version` also drops every entry once a newer version is seen.
+
+    Args:
+        max_entries: Entries kept before the least recently used is evicted
+        ttl: Seconds an entry stays valid (None: no expiry)
+        clock: Time source, monotonic seconds
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: Optional[float] = 300.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.version: Optional[int] = None
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "stale": 0, "evictions": 0, "invalidated": 0}
+        self._entries: "OrderedDict[Hashable, Tuple[float, Optional[int], object]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def sync_version(self, version: int):
+        """Drop every entry once a version newer than the last one synced is seen"""
+        with self._lock:
+            # A thread still on an older version must not drop newer entries
+            if self.version is None or version > self.version:
+                self.stats["invalidated"] += len(self._entries)
+                self._entries.clear()
+                self.version = version
+
+    def clear(self):
+        with self._lock:
+            self.stats["invalidated"] += len(self._entries)
+            self._entries.clear()
+
+    def get(self, key: Hashable, version: Optional[int] = None):
+        """
+        Cached value, or None on a miss
+
+        Expired entries and entries put under a different `version` count
+        as misses.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and entry[0] <= self.clock():
+                del self._entries[key]
+                self.stats["expired"] += 1
+                entry = None
+            elif entry is not None and entry[1] != version:
+                self.stats["stale"] += 1
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[2]
+
+    def put(self, key: Hashable, value, version: Optional[int] = None):
+        """Cache `value`, tagged with the `version` it was computed under"""
+        with self._lock:
+            expires = self.clock() + self.ttl if self.ttl is not None else float("inf")
+            self._entries[key] = (expires, version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def metrics(self) -> Dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "size": len(self._entries),
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+        }
+
+
+def _ranking(scores: Dict[str, float]) -> List[Dict]:
+    """Action types best first; ties keep insertion order, like optimize_actions"""
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return [{"action_type": action_type, "priority_score": score} for action_type, score in ranked]
+
+
+def discordant_pairs(learned: Dict[str, float], heuristic: Dict[str, float]) -> List[Tuple[str, str]]:
+    """
+    Pairs (a, b) the learned policy ranks a over b and the heuristic b over a
+
+    Only the action types the heuristic generated are compared; ties on
+    either side are not disagreements.
+    """
+    action_types = list(heuristic)
+    pairs = []
+    for i, a in enumerate(action_types):
+        for b in action_types[i + 1:]:
+            learned_order = learned[a] - learned[b]
+            heuristic_order = heuristic[a] - heuristic[b]
+            if learned_order > 0 and heuristic_order < 0:
+                pairs.append((a, b))
+            elif learned_order < 0 and heuristic_order > 0:
+                pairs.append((b, a))
+    return pairs
+
+
+class ShadowScorer:
+    """
+    Runs the learned scorer and the heuristic side by side, with cached decisions
+
+    Args:
+        optimizer: Learned scorer; its weights_version invalidates the cache
+        max_entries: Cache size in distinct quantized states
+        ttl: Seconds a cached decision stays valid (None: until the weights change)
+        population_bins: Grid points for the learned population feature
+        log_path: Append each disagreement to this JSONL file
+        max_logged: Most recent disagreements kept in `disagreements`
+    """
+
+    def __init__(
+        self,
+        optimizer: OumiRLPriorityOptimizer,
+        max_entries: int = 10000,
+        ttl: Optional[float] = 300.0,
+        population_bins: int = 101,
+        log_path: Optional[str] = None,
+        max_logged: int = 1000,
+    ):
+        self.optimizer = optimizer
+        self.cache = DecisionCache(max_entries, ttl)
+        self.population_steps = population_bins - 1
+        self.disagreements: deque = deque(maxlen=max_logged)
+        self.stats = {"comparisons": 0, "disagreements": 0, "top_action_disagreements": 0}
+        self._log = open(log_path, "a") if log_path else None
+        self._lock = threading.Lock()
+
+    def state_key(self, disaster: Dict, available_resources: float = 7) -> StateKey:
+        """Quantized state: severity, type, population bin, resource units, heuristic population"""
+        population = disaster.get("affected_population", 1000)
+        return (
+            SEVERITY_CODES.get(disaster.get("severity", "medium"), 1),
+            DISASTER_TYPE_CODES.get(disaster.get("disaster_type", "earthquake"), 0),
+            int(min(max(population / 100000, 0.0), 1.0) * self.population_steps + 0.5),
+            int(min(max(available_resources, 0), 10) + 0.5),
+            int(min(max(population, 0), HEURISTIC_POPULATION_CAP) + 0.5),
+        )
+
+    def _state_matrix(self, keys: List[StateKey]) -> np.ndarray:
+        codes = np.array(keys, dtype=float)
+        matrix = np.zeros((len(keys), 5))
+        matrix[:, 0] = codes[:, 0] / 3.0
+        matrix[:, 1] = codes[:, 1] / 5.0
+        matrix[:, 2] = codes[:, 2] / self.population_steps
+        matrix[:, 3] = codes[:, 3] / 10
+        return matrix  # time_elapsed 0, as optimize_actions scores at onset
+
+    def _decide(self, keys: List[StateKey]) -> List[Dict]:
+        """Compare both scorers on quantized states"""
+        priorities = self.optimizer.calculate_priority_batch(self._state_matrix(keys))
+        action_types = self.optimizer.action_types
+        decisions = []
+        for key, row in zip(keys, priorities.tolist()):
+            learned = dict(zip(action_types, row))
+            # Severity code 1 stands for unknown severities too; the heuristic
+            # treats those exactly like "medium"
+            disaster = {"severity": SEVERITY_NAMES[key[0]], "affected_population": key[4]}
+            heuristic = {a: calculate_rl_priority(disaster, a) for a in generated_action_types(disaster["severity"])}
+            pairs = discordant_pairs(learned, heuristic)
+            learned_top = max(heuristic, key=learned.__getitem__)
+            decisions.append({
+                "learned": _ranking(learned),
+                "heuristic": _ranking(heuristic),
+                "agree": not pairs,
+                "top_action_agrees": heuristic[learned_top] == max(heuristic.values()),
+                "discordant_pairs": pairs,
+            })
+        return decisions
+
+    def _record(self, disaster: Dict, key: StateKey, decision: Dict):
+        self.stats["comparisons"] += 1
+        if decision["agree"]:
+            return
+        self.stats["disagreements"] += 1
+        self.stats["top_action_disagreements"] += not decision["top_action_agrees"]
+        record = {
+            "disaster_id": disaster.get("id"),
+            "state_key": list(key),
+            "weights_version": self.cache.version,
+            "learned": [a["action_type"] for a in decision["learned"]],
+            "heuristic": [a["action_type"] for a in decision["heuristic"]],
+            "discordant_pairs": decision["discordant_pairs"],
+            "logged_at": time.time(),
+        }
+        self.disagreements.append(record)
+        if self._log is not None:
+            self._log.write(json.dumps(record) + "\n")
+
+    def score_batch(self, disasters: List[Dict], available_resources=7) -> List[Dict]:
+        """
+        Shadow decisions for many disasters; cache misses are scored in one batch
+
+        Args:
+            disasters: Disaster dicts, as accepted by optimize_actions
+            available_resources: Resource units, scalar or one per disaster
+
+        Returns:
+            One decision per disaster: learned and heuristic rankings (lists
+            of {action_type, priority_score}, best first), agree,
+            top_action_agrees and discordant_pairs. Decisions are shared with
+            the cache and must not be modified.
+        """
+        # publish_weights swaps the weights before bumping the version, so
+        # decisions computed after this read use weights at least this new
+        version = self.optimizer.weights_version
+        self.cache.sync_version(version)
+        resources = np.broadcast_to(np.asarray(available_resources, dtype=float), (len(disasters),))
+        keys = [self.state_key(d, r) for d, r in zip(disasters, resources.tolist())]
+
+        decisions = [self.cache.get(key, version) for key in keys]
+        missing: Dict[StateKey, List[int]] = {}
+        for i, decision in enumerate(decisions):
+            if decision is None:
+                missing.setdefault(keys[i], []).append(i)
+        if not missing:
+            return decisions
+
+        with self._lock:
+            for key, decision in zip(missing, self._decide(list(missing))):
+                self.cache.put(key, decision, version)
+                # Disagreements are logged once per computed decision, not per refresh
+                self._record(disasters[missing[key][0]], key, decision)
+                for i in missing[key]:
+                    decisions[i] = decision
+            if self._log is not None:
+                self._log.flush()
+        return decisions
+
+    def score(self, disaster: Dict, available_resources: float = 7) -> Dict:
+        """Shadow decision for one disaster"""
+        return self.score_batch([disaster], available_resources)[0]
+
+    def invalidate(self):
+        """Drop cached decisions, e.g. after assigning optimizer.weights directly"""
+        self.cache.clear()
+
+    def metrics(self) -> Dict:
+        comparisons = self.stats["comparisons"]
+        return {
+            "cache": self.cache.metrics(),
+            **self.stats,
+            "disagreement_rate": self.stats["disagreements"] / comparisons if comparisons else 0.0,
+            "weights_version": self.cache.version,
+        }
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+def random_disasters(num_disasters: int, rng: np.random.Generator) -> List[Dict]:
+    """Synthetic rows of the disasters table"""
+    return [
+        {
+            "id": f"disaster-{i}",
+            "severity": SEVERITY_NAMES[rng.integers(4)],
+            "disaster_type": DISASTER_TYPES[rng.integers(6)],
+            "affected_population": int(rng.integers(100, 200000)),
+        }
+        for i in range(num_disasters)
+    ]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from oumi_rl.heuristic import generate_priority_actions
+    from oumi_rl.scoring import load_policy
+
+    parser = argparse.ArgumentParser(description="Compare the learned policy with the edge function heuristic")
+    parser.add_argument("--disasters", type=int, default=2000, help="Disasters on the dashboard")
+    parser.add_argument("--refreshes", type=int, default=50)
+    parser.add_argument("--change-rate", type=float, default=0.05,
+                        help="Fraction of disasters whose affected_population changes per refresh")
+    parser.add_argument("--update-every", type=int, default=0,
+                        help="Publish a feedback update every N refreshes (0: never)")
+    parser.add_argument("--policy", default=None, help="Priority policy file (.json or binary)")
+    parser.add_argument("--ttl", type=float, default=300.0)
+    parser.add_argument("--max-entries", type=int, default=10000)
+    parser.add_argument("--log", default=None, help="Append disagreements to this JSONL file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    optimizer = OumiRLPriorityOptimizer()
+    if args.policy:
+        optimizer.publish_weights({k: np.array(v, dtype=float) for k, v in load_policy(args.policy).items()})
+    scorer = ShadowScorer(optimizer, max_entries=args.max_entries, ttl=args.ttl, log_path=args.log)
+    disasters = random_disasters(args.disasters, rng)
+
+    shadow_seconds = uncached_seconds = 0.0
+    for refresh in range(args.refreshes):
+        for i in np.flatnonzero(rng.random(len(disasters)) < args.change_rate).tolist():
+            disasters[i]["affected_population"] = int(rng.integers(100, 200000))
+        if args.update_every and refresh and refresh % args.update_every == 0:
+            state_matrix = optimizer.optimize_actions_batch(disasters[:64])["state_features"]
+            optimizer.update_from_feedback_batch(state_matrix, rng.integers(4, size=64), rng.normal(0, 10, 64))
+
+        started = time.perf_counter()
+        scorer.score_batch(disasters)
+        shadow_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        optimizer.optimize_actions_batch(disasters)
+        for d in disasters:
+            generate_priority_actions(d)
+        uncached_seconds += time.perf_counter() - started
+    scorer.close()
+
+    metrics = scorer.metrics()
+    cache = metrics["cache"]
+    print(f"Refreshes: {args.refreshes} x {args.disasters} disasters")
+    print(f"Cache: hit rate {cache['hit_rate']:.1%} | size {cache['size']} | "
+          f"expired {cache['expired']} | evicted {cache['evictions']} | invalidated {cache['invalidated']}")
+    print(f"Disagreements: {metrics['disagreements']}/{metrics['comparisons']} decisions "
+          f"({metrics['disagreement_rate']:.1%}), top action differs in {metrics['top_action_disagreements']}")
+    print(f"Time per refresh: shadow {shadow_seconds / args.refreshes * 1000:.2f} ms | "
+          f"uncached learned + heuristic {uncached_seconds / args.refreshes * 1000:.2f} ms")
@@ -0,0 +1,403 @@
+"""
+Opt-in Instrumentation for OumiRLAgent Training
+
+Records where training time goes and how TD learning behaves:
+- per-stage timers: calls, total seconds, mean time per call and calls/sec
+  for state vectorization, feature building, candidate generation (greedy
+  argmax), q_value, action selection, simulation, reward and weight updates
+- per action_type streaming statistics of TD error, Q-value and reward,
+  kept in fixed-memory sketches (moments plus log-bucket quantiles with 1%
+  relative error)
+
+Nothing is instrumented until `Telemetry.attach` is called; it wraps the
+methods of one agent and simulator (and, while attached, the state
+vectorization methods), and `detach` restores them. Disabled runs therefore
+execute exactly the original code. Stage times are inclusive: select_action
+contains candidate_generation, which contains state_vectorization.
+Instrumentation draws no random numbers, so attaching does not change
+training.
+
+Metrics can be written to a JSON file or served as Prometheus text:
+
+    telemetry = Telemetry().attach(agent, simulator)
+    ...
+    telemetry.write_json("training_metrics.json")
+    telemetry.serve(9108)  # GET /metrics
+
+Usage:
+    python telemetry.py --episodes 20000 --batch-size 1024 --output training_metrics.json
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from train_rl_model import (
+    ACTION_TYPES,
+    DisasterSimulator,
+    DisasterState,
+    DisasterStateBatch,
+    OumiRLAgent,
+    TrainingHistory,
+)
+
+
+# Method name -> stage name, wrapped on the instances given to attach()
+AGENT_STAGES = {
+    'features': 'features',
+    'q_value': 'q_value',
+    '_greedy': 'candidate_generation',
+    'select_action': 'select_action',
+    'select_action_batch': 'select_action',
+    'update': 'update',
+    'update_batch': 'update',
+    'learn_from_replay': 'replay_update',
+}
+SIMULATOR_STAGES = {
+    'generate_state': 'generate_states',
+    'generate_state_batch': 'generate_states',
+    'simulate_outcome': 'simulate_outcome',
+    'simulate_outcome_batch': 'simulate_outcome',
+    'next_state': 'next_state',
+    'next_state_batch': 'next_state',
+}
+REWARD_STAGES = {
+    'calculate': 'reward',
+    'calculate_batch': 'reward',
+}
+# Class methods timed while attached (states are created per call)
+CLASS_STAGES = [
+    (DisasterState, 'to_vector', 'state_vectorization'),
+    (DisasterStateBatch, 'to_matrix', 'state_vectorization'),
+]
+
+SKETCH_FIELDS = ('td_error', 'q_value', 'reward')
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class StreamingSketch:
+    """
+    Fixed-memory summary of a stream of floats
+
+    Exact count, mean, variance (Chan's parallel update), min and max, plus
+    log-spaced histogram buckets for quantiles with bounded relative error
+    (the DDSketch scheme): a quantile estimate q' of a value q satisfies
+    |q' - q| <= relative_accuracy * |q| for |q| in [min_value, max_value].
+    Smaller magnitudes share one bucket around zero; larger ones are clamped.
+
+    Args:
+        relative_accuracy: Relative error bound of quantile estimates
+        min_value, max_value: Magnitude range covered by the buckets
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-6, max_value: float = 1e9):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+        self.min_value = min_value
+        self._offset = int(np.floor(np.log(min_value) / self._log_gamma))
+        num_buckets = int(np.ceil(np.log(max_value) / self._log_gamma)) - self._offset + 1
+        self.positive = np.zeros(num_buckets, dtype=np.int64)
+        self.negative = np.zeros(num_buckets, dtype=np.int64)
+        self.zero = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _buckets(self, magnitudes: np.ndarray) -> np.ndarray:
+        index = np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64) - self._offset
+        return np.clip(index, 0, len(self.positive) - 1)
+
+    def add(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        n = len(values)
+        if not n:
+            return
+
+        batch_mean = float(values.mean())
+        delta = batch_mean - self.mean
+        total = self.count + n
+        self.m2 += float(((values - batch_mean) ** 2).sum()) + delta * delta * self.count * n / total
+        self.mean += delta * n / total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.count = total
+
+        positive = values > self.min_value
+        negative = values < -self.min_value
+        self.zero += n - int(positive.sum()) - int(negative.sum())
+        size = len(self.positive)
+        self.positive += np.bincount(self._buckets(values[positive]), minlength=size)
+        self.negative += np.bincount(self._buckets(-values[negative]), minlength=size)
+
+    def quantiles(self, q=QUANTILES) -> List[float]:
+        if not self.count:
+            return [0.0] * len(q)
+        # Buckets in increasing value order: negatives from the largest
+        # magnitude down, then zero, then positives
+        counts = np.concatenate([self.negative[::-1], [self.zero], self.positive])
+        ranks = np.asarray(q) * (self.count - 1)
+        position = np.searchsorted(np.cumsum(counts), ranks, side='right')
+        size = len(self.positive)
+        # Bucket k covers (gamma^(k-1), gamma^k]; its estimate is the point
+        # with equal relative error to both ends
+        magnitude = 2 * self.gamma ** (np.abs(position - size).clip(1) - 1 + self._offset) / (self.gamma + 1)
+        estimates = np.where(position > size, magnitude, np.where(position < size, -magnitude, 0.0))
+        return np.clip(estimates, self.min, self.max).tolist()
+
+    def summary(self) -> Dict:
+        std = float(np.sqrt(self.m2 / self.count)) if self.count else 0.0
+        summary = {
+            'count': self.count,
+            'mean': self.mean,
+            'std': std,
+            'min': self.min if self.count else 0.0,
+            'max': self.max if self.count else 0.0,
+        }
+        for q, value in zip(QUANTILES, self.quantiles()):
+            summary[f'p{round(q * 100)}'] = value
+        return summary
+
+
+class Telemetry:
+    """
+    Stage timers and TD-learning sketches for one training run
+
+    Args:
+        relative_accuracy: Relative error bound of the sketches' quantiles
+    """
+
+    # Scalar training steps are buffered and added to the sketches together
+    PENDING_ROWS = 4096
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.stages: Dict[str, List[float]] = {}  # name -> [calls, seconds]
+        self.sketches = {
+            (field, action_type): StreamingSketch(relative_accuracy)
+            for field in SKETCH_FIELDS for action_type in ACTION_TYPES
+        }
+        self._pending: List[Tuple[int, float, float, float]] = []
+        self.started = time.perf_counter()
+        self._restore: List[Tuple[object, str, object]] = []
+        self._lock = threading.RLock()
+        self._server = None
+
+    def _timed(self, fn: Callable, stage: str) -> Callable:
+        totals = self.stages.setdefault(stage, [0, 0.0])
+        clock = time.perf_counter
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                totals[0] += 1
+                totals[1] += clock() - started
+        return wrapper
+
+    def _wrap(self, owner, name: str, stage: str):
+        if name in vars(owner):
+            self._restore.append((owner, name, vars(owner)[name]))
+        else:
+            self._restore.append((owner, name, None))
+        setattr(owner, name, self._timed(getattr(owner, name), stage))
+
+    def attach(self, agent: OumiRLAgent, simulator: Optional[DisasterSimulator] = None) -> 'Telemetry':
+        """Instrument an agent (and simulator) until detach(); returns self"""
+        if self._restore:
+            raise RuntimeError("Telemetry is already attached")
+        for name, stage in AGENT_STAGES.items():
+            self._wrap(agent, name, stage)
+        if simulator is not None:
+            for name, stage in SIMULATOR_STAGES.items():
+                self._wrap(simulator, name, stage)
+            for name, stage in REWARD_STAGES.items():
+                self._wrap(simulator.reward_fn, name, stage)
+        for cls, name, stage in CLASS_STAGES:
+            self._wrap(cls, name, stage)
+
+        # Every logged training step passes through the agent's history
+        # (TrainingHistory has __slots__, so hook the class for this instance)
+        history = agent.training_history
+        append, extend = TrainingHistory.append, TrainingHistory.extend
+
+        def record_one(target, states, actions, action_type, reward, td_error, q_value):
+            append(target, states, actions, action_type, reward, td_error, q_value)
+            if target is history:
+                with self._lock:
+                    self._pending.append((action_type, td_error, q_value, reward))
+                    if len(self._pending) >= self.PENDING_ROWS:
+                        self._flush_pending()
+
+        def record_many(target, states, actions, action_types, rewards, td_errors, q_values):
+            extend(target, states, actions, action_types, rewards, td_errors, q_values)
+            if target is history:
+                self.record(np.asarray(action_types), td_errors, q_values, rewards)
+
+        self._restore.append((TrainingHistory, 'append', append))
+        self._restore.append((TrainingHistory, 'extend', extend))
+        TrainingHistory.append, TrainingHistory.extend = record_one, record_many
+        self.started = time.perf_counter()
+        return self
+
+    def detach(self):
+        """Restore every instrumented method"""
+        self._flush_pending()
+        for owner, name, original in reversed(self._restore):
+            if original is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+        self._restore = []
+
+    def _flush_pending(self):
+        with self._lock:
+            if self._pending:
+                action_types, td_errors, q_values, rewards = np.array(self._pending).T
+                self._pending = []
+                self.record(action_types.astype(np.int64), td_errors, q_values, rewards)
+
+    def record(self, action_types: np.ndarray, td_errors, q_values, rewards):
+        """Add TD errors, Q-values and rewards of logged steps to the sketches"""
+        columns = {
+            'td_error': np.asarray(td_errors, dtype=np.float64),
+            'q_value': np.asarray(q_values, dtype=np.float64),
+            'reward': np.asarray(rewards, dtype=np.float64),
+        }
+        with self._lock:
+            for t, action_type in enumerate(ACTION_TYPES):
+                rows = action_types == t
+                if not rows.any():
+                    continue
+                for field, values in columns.items():
+                    self.sketches[field, action_type].add(values[rows])
+
+    def snapshot(self) -> Dict:
+        """Current stage timings and sketch summaries"""
+        self._flush_pending()
+        elapsed = time.perf_counter() - self.started
+        with self._lock:
+            stages = {
+                name: {
+                    'calls': int(calls),
+                    'seconds': seconds,
+                    'mean_us': seconds / calls * 1e6 if calls else 0.0,
+                    'calls_per_sec': calls / elapsed if elapsed > 0 else 0.0,
+                    'share_of_wall': seconds / elapsed if elapsed > 0 else 0.0,
+                }
+                for name, (calls, seconds) in self.stages.items()
+            }
+            learning = {
+                field: {action_type: self.sketches[field, action_type].summary() for action_type in ACTION_TYPES}
+                for field in SKETCH_FIELDS
+            }
+        return {'elapsed_seconds': elapsed, 'stages': stages, 'learning': learning}
+
+    def write_json(self, path: str):
+        """Write snapshot() to a metrics file (atomically replaced)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def prometheus_text(self) -> str:
+        """snapshot() in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = [
+            '# HELP oumi_rl_stage_calls_total Calls of each instrumented training stage',
+            '# TYPE oumi_rl_stage_calls_total counter',
+        ]
+        lines += [f'oumi_rl_stage_calls_total{{stage="{name}"}} {s["calls"]}' for name, s in snapshot['stages'].items()]
+        lines += [
+            '# HELP oumi_rl_stage_seconds_total Inclusive time spent in each stage',
+            '# TYPE oumi_rl_stage_seconds_total counter',
+        ]
+        lines += [f'oumi_rl_stage_seconds_total{{stage="{name}"}} {s["seconds"]:.9g}' for name, s in snapshot['stages'].items()]
+
+        for field, by_type in snapshot['learning'].items():
+            metric = f'oumi_rl_{field}'
+            lines += [f'# HELP {metric} {field} of logged training steps per action type', f'# TYPE {metric} summary']
+            for action_type, s in by_type.items():
+                for q in QUANTILES:
+                    lines.append(
+                        f'{metric}{{action_type="{action_type}",quantile="{q}"}} {s[f"p{round(q * 100)}"]:.9g}'
+                    )
+                lines.append(f'{metric}_sum{{action_type="{action_type}"}} {s["mean"] * s["count"]:.9g}')
+                lines.append(f'{metric}_count{{action_type="{action_type}"}} {s["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port: int = 9108, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """Serve prometheus_text() at GET /metrics from a background thread"""
+        telemetry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                body = telemetry.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+    def close(self):
+        """Stop the metrics endpoint, if serving"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def format_report(snapshot: Dict) -> str:
+    """Human-readable table of a snapshot()"""
+    lines = [f"{'stage':22s} {'calls':>10s} {'total s':>9s} {'mean us':>10s} {'calls/s':>11s} {'wall %':>7s}"]
+    for name, s in sorted(snapshot['stages'].items(), key=lambda item: -item[1]['seconds']):
+        lines.append(f"{name:22s} {s['calls']:10d} {s['seconds']:9.3f} {s['mean_us']:10.2f} "
+                     f"{s['calls_per_sec']:11.0f} {s['share_of_wall'] * 100:6.1f}%")
+    for field, by_type in snapshot['learning'].items():
+        lines.append(f"\n{field}:")
+        for action_type, s in by_type.items():
+            lines.append(f"  {action_type:10s} n={s['count']:<9d} mean {s['mean']:9.3f} std {s['std']:8.3f} "
+                         f"p50 {s['p50']:9.3f} p99 {s['p99']:9.3f}")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from train_rl_model import train_agent
+
+    parser = argparse.ArgumentParser(description="Train with instrumentation and report stage timings")
+    parser.add_argument("--episodes", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--horizon", type=int, default=1)
+    parser.add_argument("--output", default="training_metrics.json", help="Metrics file")
+    parser.add_argument("--prometheus", default=None, help="Also write Prometheus text to this path")
+    args = parser.parse_args()
+
+    telemetry = Telemetry()
+    train_agent(args.episodes, batch_size=args.batch_size, horizon=args.horizon,
+                metrics_file=args.output, telemetry=telemetry)
+    print()
+    print(format_report(telemetry.snapshot()))
+    if args.prometheus:
+        with open(args.prometheus, 'w') as f:
+            f.write(telemetry.prometheus_text())
@@ -0,0 +1,47 @@
+"""One malformed event must not fail or poison its batch"""
+
+import asyncio
+
+import numpy as np
+
+from feedback_consumer import FeedbackConsumer, random_events
+from priority_optimization import OumiRLPriorityOptimizer
+
+
+def _bad_events():
+    return [
+        {"action_type": "rescue", "disaster": {"severity": None}, "reward": 10.0},
+        {"action_type": "medical", "disaster": {"disaster_type": 3}, "reward": 10.0},
+        {"action_type": "rescue", "reward": float("inf")},
+        {"action_type": "rescue", "disaster": {"affected_population": "many"}},
+        {"action_type": "rescue", "disaster": "flood"},
+        None,
+    ]
+
+
+def test_apply_skips_malformed_rows():
+    optimizer = OumiRLPriorityOptimizer()
+    consumer = FeedbackConsumer(optimizer)
+    good = random_events(20)
+
+    applied = consumer.apply(good[:10] + _bad_events() + good[10:])
+
+    assert applied == 20
+    assert consumer.stats["invalid"] == len(_bad_events())
+    assert all(np.isfinite(w).all() for w in optimizer.weights.values())
+
+
+def test_null_severity_does_not_fail_a_running_batch():
+    async def run():
+        optimizer = OumiRLPriorityOptimizer()
+        consumer = FeedbackConsumer(optimizer, max_batch=64, max_delay=0.01)
+        consumer.start()
+        for event in random_events(10) + _bad_events()[:1] + random_events(10, seed=1):
+            await consumer.submit(event)
+        await consumer.stop()
+        return consumer.stats
+
+    stats = asyncio.run(run())
+    assert stats["failed_batches"] == 0
+    assert stats["events"] == 20
+    assert stats["invalid"] == 1
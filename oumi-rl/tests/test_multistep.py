@@ -0,0 +1,36 @@
+"""Multi-step episodes must run past their first decision"""
+
+import pytest
+
+from random_streams import spawn_generators
+from train_rl_model import DisasterSimulator, OumiRLAgent
+
+EPISODES = 4000
+
+
+def _agent_and_simulator(seed: int = 0):
+    agent_rng, simulator_rng = spawn_generators(seed, 2)
+    return OumiRLAgent(rng=agent_rng), DisasterSimulator(rng=simulator_rng)
+
+
+@pytest.mark.parametrize("horizon", [3, 5])
+def test_batched_episodes_last_more_than_one_step(horizon):
+    agent, simulator = _agent_and_simulator()
+    for _ in range(EPISODES // 1000):
+        simulator.run_multistep_batch(agent, 1000, horizon)
+    # Every transition is logged once, so this is the mean episode length
+    assert agent.training_history.total / agent.episodes_trained > 1.5
+
+
+@pytest.mark.parametrize("horizon", [3, 5])
+def test_scalar_episodes_last_more_than_one_step(horizon):
+    agent, simulator = _agent_and_simulator()
+    for _ in range(EPISODES // 4):
+        simulator.run_multistep_episode(agent, horizon)
+    assert agent.training_history.total / agent.episodes_trained > 1.5
+
+
+def test_single_step_episodes_have_one_step():
+    agent, simulator = _agent_and_simulator()
+    simulator.run_multistep_batch(agent, 1000, horizon=1)
+    assert agent.training_history.total == agent.episodes_trained == 1000
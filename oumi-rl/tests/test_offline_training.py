@@ -0,0 +1,48 @@
+"""Resuming offline training only continues the run its cursor belongs to"""
+
+import json
+
+import numpy as np
+import pytest
+
+from offline_training import train_offline
+
+
+def _write_export(path, num_rows):
+    rng = np.random.default_rng(0)
+    with open(path, "w") as f:
+        for _ in range(num_rows):
+            f.write(json.dumps({
+                "action_type": ["rescue", "medical", "logistics"][rng.integers(3)],
+                "reward_score": float(rng.uniform(0, 100)),
+                "severity": "high",
+                "disaster_type": "flood",
+            }) + "\n")
+
+
+def test_resume_rejects_another_export_or_target(tmp_path):
+    export, other = str(tmp_path / "export.jsonl"), str(tmp_path / "other.jsonl")
+    _write_export(export, 50)
+    _write_export(other, 50)
+    output = str(tmp_path / "policy.json")
+    train_offline(export, "agent", chunk_size=20, output_path=output)
+
+    with pytest.raises(ValueError, match="export"):
+        train_offline(other, "agent", chunk_size=20, output_path=output, resume=True)
+    with pytest.raises(ValueError, match="target"):
+        train_offline(export, "optimizer", chunk_size=20, output_path=output, resume=True)
+    cursor = train_offline(export, "agent", chunk_size=20, output_path=output, resume=True)
+    assert cursor["rows_read"] == 50
+
+
+def test_agent_initial_weights_follow_the_seed(tmp_path):
+    export = str(tmp_path / "export.jsonl")
+    _write_export(export, 10)
+    policies = []
+    for seed, name in ((1, "a.json"), (1, "b.json"), (2, "c.json")):
+        output = str(tmp_path / name)
+        train_offline(export, "agent", chunk_size=20, output_path=output, seed=seed)
+        with open(output) as f:
+            policies.append(json.load(f)["weights"])
+    assert policies[0] == policies[1]
+    assert policies[0] != policies[2]
@@ -0,0 +1,97 @@
+"""PolicyStore hot reloads keep serving the last good weights"""
+
+import json
+import os
+import threading
+
+import numpy as np
+
+from policy_server import PolicyService, PolicyStore, UnixHTTPConnection, create_server
+from train_rl_model import ACTION_TYPES
+
+
+def _write_policy(path, weights, mtime_ns):
+    with open(path, "w") as f:
+        json.dump({"weights": {k: list(v) for k, v in weights.items()}}, f)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_unreadable_or_misshaped_policy_keeps_current_weights(tmp_path):
+    path = str(tmp_path / "policy.json")
+    good = {action_type: np.full(8, float(i)) for i, action_type in enumerate(ACTION_TYPES)}
+    _write_policy(path, good, 1_000_000_000)
+    store = PolicyStore(path, reload_interval=0.0)
+    assert store.version == 1
+
+    with open(path, "w") as f:
+        f.write('{"weights": {"rescue": [1.0')  # Mid-write
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    assert not store.maybe_reload(force=True)
+
+    _write_policy(path, {action_type: np.zeros(5) for action_type in ACTION_TYPES}, 3_000_000_000)
+    assert not store.maybe_reload(force=True)
+
+    os.remove(path)
+    assert not store.maybe_reload(force=True)
+    assert store.version == 1
+    for action_type in ACTION_TYPES:
+        np.testing.assert_array_equal(store.agent.weights[action_type], good[action_type])
+
+
+def test_concurrent_reloads_bump_version_once(tmp_path):
+    path = str(tmp_path / "policy.json")
+    weights = {action_type: np.zeros(8) for action_type in ACTION_TYPES}
+    _write_policy(path, weights, 1_000_000_000)
+    store = PolicyStore(path, reload_interval=0.0)
+    _write_policy(path, weights, 2_000_000_000)
+
+    barrier = threading.Barrier(8)
+    results = []
+
+    def reload():
+        barrier.wait()
+        results.append(store.maybe_reload(force=True))
+
+    threads = [threading.Thread(target=reload) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 1
+    assert store.version == 2
+
+
+def test_untrained_agent_weights_are_seeded():
+    first, second = PolicyStore(seed=3), PolicyStore(seed=3)
+    for action_type in ACTION_TYPES:
+        np.testing.assert_array_equal(first.agent.weights[action_type], second.agent.weights[action_type])
+    assert not np.array_equal(first.agent.weights['rescue'], PolicyStore(seed=4).agent.weights['rescue'])
+
+
+def test_post_requires_a_valid_content_length(tmp_path):
+    socket_path = str(tmp_path / "policy.sock")
+    service = PolicyService(PolicyStore(), max_batch=8, max_wait=0.001)
+    server = create_server(service, unix_socket=socket_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def post(headers, body=b''):
+        connection = UnixHTTPConnection(socket_path)
+        connection.putrequest('POST', '/prioritize', skip_accept_encoding=True)
+        for name, value in headers.items():
+            connection.putheader(name, value)
+        connection.endheaders(body)
+        response = connection.getresponse()
+        status = response.status
+        response.read()
+        connection.close()
+        return status
+
+    try:
+        assert post({}) == 411
+        assert post({'Content-Length': 'abc'}) == 400
+        assert post({'Content-Length': '-5'}) == 400
+        assert post({'Content-Length': '2'}, b'{}') == 200
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
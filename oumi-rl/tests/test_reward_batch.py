@@ -0,0 +1,73 @@
+"""Batch reward functions must equal their scalar versions element-wise, exactly"""
+
+import numpy as np
+import pytest
+
+from priority_optimization import calculate_reward, calculate_reward_batch
+from train_rl_model import DisasterAction, DisasterState, RewardFunction
+
+ROWS = 2000
+
+
+def _with_boundaries(values: np.ndarray, boundaries) -> np.ndarray:
+    # Put the branch thresholds themselves into the sample
+    values[:len(boundaries)] = boundaries
+    return values
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_reward_function_batch_matches_scalar(seed):
+    rng = np.random.default_rng(seed)
+    severity = rng.integers(0, 4, ROWS)
+    num_alerts = rng.integers(0, 20, ROWS)
+    available_resources = rng.integers(0, 25, ROWS)
+    rescue = rng.integers(0, 11, ROWS)
+    medical = rng.integers(0, 11, ROWS)
+    logistics = rng.integers(0, 11, ROWS)
+    response_time = _with_boundaries(rng.uniform(0, 48, ROWS), [2.0, 6.0, 12.0, 0.0])
+    people_helped = rng.integers(0, 5000, ROWS)
+
+    batch = RewardFunction.calculate_batch(
+        severity, num_alerts, available_resources, rescue, medical, logistics, response_time, people_helped,
+    )
+
+    scalar = [
+        RewardFunction.calculate(
+            DisasterState(int(severity[i]), int(num_alerts[i]), 0.0, int(available_resources[i]), 'flood'),
+            DisasterAction(int(rescue[i]), int(medical[i]), int(logistics[i])),
+            {'response_time_hours': float(response_time[i]), 'people_helped': int(people_helped[i])},
+        )
+        for i in range(ROWS)
+    ]
+    np.testing.assert_array_equal(batch, scalar)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_calculate_reward_batch_matches_scalar(seed):
+    rng = np.random.default_rng(seed)
+    estimated_impact = rng.integers(0, 2000, ROWS)
+    resources_allocated = rng.integers(0, 12, ROWS)
+    people_helped = rng.integers(0, 3000, ROWS)
+    deadline_hours = rng.uniform(0.5, 48, ROWS)
+    completion_time_hours = rng.uniform(0, 72, ROWS)
+    completion_time_hours[:ROWS // 20] = deadline_hours[:ROWS // 20]  # On-deadline branch boundary
+    resources_used = rng.integers(0, 15, ROWS)
+
+    batch = calculate_reward_batch(
+        estimated_impact, resources_allocated, people_helped,
+        completion_time_hours, deadline_hours, resources_used,
+    )
+
+    scalar = [
+        calculate_reward(
+            {'estimated_impact': int(estimated_impact[i]), 'resources_allocated': int(resources_allocated[i])},
+            {
+                'people_helped': int(people_helped[i]),
+                'completion_time_hours': float(completion_time_hours[i]),
+                'deadline_hours': float(deadline_hours[i]),
+                'resources_used': int(resources_used[i]),
+            },
+        )
+        for i in range(ROWS)
+    ]
+    np.testing.assert_array_equal(batch, scalar)
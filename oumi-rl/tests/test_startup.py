@@ -0,0 +1,56 @@
+"""Short-lived scoring processes must stay NumPy-free and within the startup budget"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DISASTER = '{"severity": "critical", "disaster_type": "flood", "affected_population": 25000}'
+
+# Allowed wall time of `python -m oumi_rl` on top of a bare interpreter start
+STARTUP_BUDGET_MS = float(os.environ.get("OUMI_RL_STARTUP_BUDGET_MS", 60))
+
+
+def _run(*arguments: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *arguments], cwd=PACKAGE_DIR, check=True, capture_output=True, text=True,
+    )
+
+
+def _best_ms(*arguments: str, repeats: int = 7) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        _run(*arguments)
+        timings.append((time.perf_counter() - started) * 1e3)
+    return min(timings)
+
+
+def test_scoring_entry_point_prints_ranked_actions():
+    actions = json.loads(_run("-m", "oumi_rl", DISASTER).stdout)
+    scores = [a["priority_score"] for a in actions]
+    assert {a["action_type"] for a in actions} == {"rescue", "medical", "logistics", "communication"}
+    assert scores == sorted(scores, reverse=True)
+    assert all(0 <= score <= 100 for score in scores)
+
+
+def test_scoring_does_not_import_numpy():
+    # Runs the `python -m oumi_rl` entry point, then inspects the same interpreter
+    script = (
+        "import runpy, sys\n"
+        f"sys.argv = ['oumi_rl', {DISASTER!r}]\n"
+        "runpy.run_module('oumi_rl', run_name='__main__', alter_sys=True)\n"
+        "print(sorted(m for m in sys.modules if m == 'numpy' or m.startswith('numpy.')))\n"
+    )
+    assert _run("-c", script).stdout.splitlines()[-1] == "[]"
+
+
+def test_scoring_startup_within_budget():
+    baseline = _best_ms("-c", "pass")
+    scoring = _best_ms("-m", "oumi_rl", DISASTER)
+    assert scoring - baseline <= STARTUP_BUDGET_MS, (
+        f"python -m oumi_rl took {scoring:.1f} ms, {scoring - baseline:.1f} ms over a bare interpreter "
+        f"(budget {STARTUP_BUDGET_MS:.0f} ms, set OUMI_RL_STARTUP_BUDGET_MS to override)"
+    )
@@ -0,0 +1,26 @@
+"""encode_state_matrix must match DisasterStateRepresentation row by row"""
+
+import numpy as np
+
+from priority_optimization import DisasterStateRepresentation, encode_state_matrix
+
+
+def test_encode_state_matrix_matches_scalar_with_missing_names():
+    severity = ["high", None, "critical", "unknown", None, "low"]
+    disaster_type = [None, "flood", "wildfire", None, "earthquake", 7]
+    population = [20000, 500, 250000, 0, 1000, 42]
+    resources = [7, 0, 15, 3, 10, 1]
+    elapsed = [0.0, 2.5, 30.0, 1.0, 0.0, 12.0]
+
+    matrix = encode_state_matrix(severity, disaster_type, population, resources, elapsed)
+
+    expected = np.array([
+        DisasterStateRepresentation(*row).to_vector()
+        for row in zip(severity, disaster_type, population, resources, elapsed)
+    ])
+    np.testing.assert_array_equal(matrix, expected)
+
+
+def test_encode_state_matrix_accepts_codes():
+    matrix = encode_state_matrix([3, 0], [1, 5], [100000, 0], [10, 0], [24, 0])
+    np.testing.assert_array_equal(matrix[:, :2], [[1.0, 0.2], [0.0, 1.0]])
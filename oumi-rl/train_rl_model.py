@@ -22,15 +22,27 @@ Reward Function:
 """
 
 import json
+import os
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
-import random
+
+from oumi_rl.encoding import DISASTER_TYPE_CODES, DISASTER_TYPES
+from policy_format import load_policy_weights, write_binary_policy
+from random_streams import BufferedDraws, spawn_generators
+from replay_buffer import ReplayBuffer
+
+
+# Action type order used by the encoded `action_type` column of batches
+ACTION_TYPES = ['rescue', 'medical', 'logistics']
 
 
 class DisasterState:
     """Represents the state of a disaster response scenario"""
 
+    # Type encoding, shared by every instance (order of DISASTER_TYPES)
+    type_map = DISASTER_TYPE_CODES
+
     def __init__(
         self,
         severity: int,  # 0-3
@@ -45,12 +57,6 @@ class DisasterState:
         self.available_resources = available_resources
         self.disaster_type = disaster_type
 
-        # Type encoding
-        self.type_map = {
-            'earthquake': 0, 'flood': 1, 'fire': 2,
-            'hurricane': 3, 'tornado': 4, 'tsunami': 5
-        }
-
     def to_vector(self) -> np.ndarray:
         """Convert state to feature vector"""
         return np.array([
@@ -94,6 +100,100 @@ class DisasterAction:
         return f"Action(rescue={self.rescue_allocation}, medical={self.medical_deployment}, logistics={self.logistics_routing})"
 
 
+class DisasterStateBatch:
+    """Column-oriented batch of disaster states backed by NumPy arrays"""
+
+    def __init__(
+        self,
+        severity: np.ndarray,  # 0-3
+        num_alerts: np.ndarray,
+        response_delay: np.ndarray,
+        available_resources: np.ndarray,
+        disaster_type: np.ndarray,  # Index into DISASTER_TYPES
+    ):
+        self.severity = severity
+        self.num_alerts = num_alerts
+        self.response_delay = response_delay
+        self.available_resources = available_resources
+        self.disaster_type = disaster_type
+
+    @classmethod
+    def from_states(cls, states: List[DisasterState]) -> 'DisasterStateBatch':
+        """Build a batch from individual DisasterState objects"""
+        return cls(
+            severity=np.array([s.severity for s in states]),
+            num_alerts=np.array([s.num_alerts for s in states]),
+            response_delay=np.array([s.response_delay for s in states], dtype=float),
+            available_resources=np.array([s.available_resources for s in states]),
+            disaster_type=np.array([s.type_map.get(s.disaster_type, 0) for s in states]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.severity)
+
+    def subset(self, index: np.ndarray) -> 'DisasterStateBatch':
+        """Rows selected by an integer or boolean index"""
+        return DisasterStateBatch(
+            self.severity[index], self.num_alerts[index], self.response_delay[index],
+            self.available_resources[index], self.disaster_type[index],
+        )
+
+    def __getitem__(self, i: int) -> DisasterState:
+        return DisasterState(
+            severity=int(self.severity[i]),
+            num_alerts=int(self.num_alerts[i]),
+            response_delay=float(self.response_delay[i]),
+            available_resources=int(self.available_resources[i]),
+            disaster_type=DISASTER_TYPES[self.disaster_type[i]],
+        )
+
+    def to_matrix(self) -> np.ndarray:
+        """Convert states to an (N, 5) feature matrix, row-wise equal to DisasterState.to_vector"""
+        return np.column_stack([
+            self.severity / 3.0,
+            np.minimum(self.num_alerts / 10.0, 1.0),
+            np.minimum(self.response_delay / 24.0, 1.0),
+            np.minimum(self.available_resources / 20.0, 1.0),
+            self.disaster_type / 5.0,
+        ])
+
+
+class DisasterActionBatch:
+    """Column-oriented batch of disaster actions backed by NumPy arrays"""
+
+    def __init__(
+        self,
+        rescue_allocation: np.ndarray,
+        medical_deployment: np.ndarray,
+        logistics_routing: np.ndarray,
+    ):
+        self.rescue_allocation = rescue_allocation
+        self.medical_deployment = medical_deployment
+        self.logistics_routing = logistics_routing
+
+    def __len__(self) -> int:
+        return len(self.rescue_allocation)
+
+    def __getitem__(self, i: int) -> DisasterAction:
+        return DisasterAction(
+            rescue_allocation=int(self.rescue_allocation[i]),
+            medical_deployment=int(self.medical_deployment[i]),
+            logistics_routing=int(self.logistics_routing[i]),
+        )
+
+    def total_resources(self) -> np.ndarray:
+        """Total resources used per action"""
+        return self.rescue_allocation + self.medical_deployment + self.logistics_routing
+
+    def to_matrix(self) -> np.ndarray:
+        """Convert actions to an (N, 3) matrix, row-wise equal to DisasterAction.to_vector"""
+        return np.column_stack([
+            self.rescue_allocation / 10.0,
+            self.medical_deployment / 10.0,
+            self.logistics_routing / 10.0,
+        ])
+
+
 class RewardFunction:
     """Calculates rewards for disaster response actions"""
 
@@ -154,6 +254,227 @@ class RewardFunction:
 
         return max(min(reward, 100), -50)  # Clip reward to [-50, 100]
 
+    @staticmethod
+    def calculate_batch(
+        severity: np.ndarray,
+        num_alerts: np.ndarray,
+        available_resources: np.ndarray,
+        rescue_allocation: np.ndarray,
+        medical_deployment: np.ndarray,
+        logistics_routing: np.ndarray,
+        response_time: np.ndarray,
+        people_helped: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Vectorized `calculate` over column arrays, one element per episode
+
+        Every term is computed in the same order and precision as the scalar
+        version, so element i equals `calculate` on row i exactly.
+        """
+        severity = np.asarray(severity)
+        num_alerts = np.asarray(num_alerts)
+        available_resources = np.asarray(available_resources)
+        rescue_allocation = np.asarray(rescue_allocation)
+        medical_deployment = np.asarray(medical_deployment)
+        response_time = np.asarray(response_time, dtype=float)
+
+        reward = np.zeros(response_time.shape)
+
+        # 1. Response Time Reward (max +30)
+        reward += np.select(
+            [response_time <= 2.0, response_time <= 6.0, response_time <= 12.0],
+            [30.0, 20.0, 10.0],
+            -(response_time - 12.0) * 2,
+        )
+
+        # 2. Impact Reward (max +40)
+        estimated_need = severity * 500 + num_alerts * 100
+        impact_ratio = np.minimum(np.asarray(people_helped) / np.maximum(estimated_need, 1), 1.0)
+        reward += impact_ratio * 40
+
+        # 3. Resource Efficiency Reward (max +20)
+        resources_used = rescue_allocation + medical_deployment + np.asarray(logistics_routing)
+        resources_needed = np.minimum(severity * 3 + num_alerts, 15)
+        efficiency = 1.0 - np.abs(resources_used - resources_needed) / np.maximum(resources_needed, 1)
+        reward += efficiency * 20
+
+        # 4. Resource Waste Penalty
+        over_allocation = resources_used - available_resources
+        reward -= np.where(over_allocation > 0, over_allocation * 5, 0)
+
+        # 5. Action Appropriateness (max +10)
+        high_severity = severity >= 2
+        reward += np.where(high_severity & (rescue_allocation >= 5), 5, 0)
+        reward += np.where(high_severity & (medical_deployment >= 4), 5, 0)
+
+        return np.clip(reward, -50, 100)  # Clip reward to [-50, 100]
+
+
+class TrainingHistory:
+    """
+    Fixed-capacity ring buffer of training steps stored as NumPy columns
+
+    Keeps the most recent `capacity` steps in preallocated arrays. If
+    `spill_dir` is set, every row is also appended to one raw file per
+    column before it is overwritten, so the full history can be read back
+    with `load_spilled` as memory-mapped arrays.
+    """
+
+    __slots__ = (
+        'capacity', 'spill_dir', 'total', '_size', '_next', '_unspilled',
+        'states', 'actions', 'action_types', 'rewards', 'td_errors', 'q_values',
+    )
+
+    # Column name -> (dtype, trailing shape)
+    COLUMNS = {
+        'states': (np.float32, (5,)),
+        'actions': (np.float32, (3,)),
+        'action_types': (np.int8, ()),
+        'rewards': (np.float64, ()),
+        'td_errors': (np.float64, ()),
+        'q_values': (np.float64, ()),
+    }
+
+    def __init__(self, capacity: int = 100_000, spill_dir: Optional[str] = None):
+        self.capacity = capacity
+        self.spill_dir = spill_dir
+        self.total = 0  # Steps ever recorded
+        self._size = 0
+        self._next = 0
+        self._unspilled = 0
+
+        for name, (dtype, shape) in self.COLUMNS.items():
+            setattr(self, name, np.empty((capacity,) + shape, dtype=dtype))
+
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(
+        self,
+        state: np.ndarray,
+        action: np.ndarray,
+        action_type: int,
+        reward: float,
+        td_error: float,
+        q_value: float
+    ):
+        """Record one training step"""
+        if self._unspilled == self.capacity:
+            self.flush()
+        i = self._next
+        self.states[i] = state
+        self.actions[i] = action
+        self.action_types[i] = action_type
+        self.rewards[i] = reward
+        self.td_errors[i] = td_error
+        self.q_values[i] = q_value
+        self._advance(1)
+
+    def extend(
+        self,
+        states: np.ndarray,
+        actions: np.ndarray,
+        action_types: np.ndarray,
+        rewards: np.ndarray,
+        td_errors: np.ndarray,
+        q_values: np.ndarray
+    ):
+        """Record a batch of training steps, keeping only the newest `capacity` rows"""
+        n = len(rewards)
+        start = max(n - self.capacity, 0)
+        if self.spill_dir is not None and start:
+            # Rows that never fit in the ring go straight to disk
+            self.flush()
+            self._spill({
+                'states': states[:start], 'actions': actions[:start],
+                'action_types': action_types[:start], 'rewards': rewards[:start],
+                'td_errors': td_errors[:start], 'q_values': q_values[:start],
+            })
+        self.total += start
+
+        while start < n:
+            if self._unspilled == self.capacity:
+                self.flush()
+            i = self._next
+            size = min(n - start, self.capacity - i, self.capacity - self._unspilled)
+            rows = slice(start, start + size)
+            self.states[i:i + size] = states[rows]
+            self.actions[i:i + size] = actions[rows]
+            self.action_types[i:i + size] = action_types[rows]
+            self.rewards[i:i + size] = rewards[rows]
+            self.td_errors[i:i + size] = td_errors[rows]
+            self.q_values[i:i + size] = q_values[rows]
+            self._advance(size)
+            start += size
+
+    def _advance(self, size: int):
+        self._next = (self._next + size) % self.capacity
+        self._size = min(self._size + size, self.capacity)
+        self.total += size
+        if self.spill_dir is not None:
+            self._unspilled += size
+
+    def column(self, name: str) -> np.ndarray:
+        """View of the retained rows of a column (ring order, not time order)"""
+        return getattr(self, name)[:self._size]
+
+    def mean_reward(self, action_type: Optional[int] = None) -> float:
+        """Mean reward over retained steps, optionally for one action type index"""
+        rewards = self.column('rewards')
+        if action_type is not None:
+            rewards = rewards[self.column('action_types') == action_type]
+        return float(rewards.mean()) if len(rewards) else 0.0
+
+    def td_error_percentiles(self, percentiles=(50, 90, 99)) -> Dict[int, float]:
+        """Percentiles of absolute TD error over retained steps"""
+        if not self._size:
+            return {p: 0.0 for p in percentiles}
+        values = np.percentile(np.abs(self.column('td_errors')), percentiles)
+        return dict(zip(percentiles, values.tolist()))
+
+    def summary(self) -> Dict:
+        """Summary statistics of the retained window"""
+        return {
+            'total_steps': self.total,
+            'retained_steps': self._size,
+            'mean_reward': self.mean_reward(),
+            'mean_q_value': float(self.column('q_values').mean()) if self._size else 0.0,
+            'td_error_percentiles': self.td_error_percentiles(),
+        }
+
+    def flush(self):
+        """Append rows not yet on disk to the spill files"""
+        if self.spill_dir is None or not self._unspilled:
+            return
+        start = (self._next - self._unspilled) % self.capacity
+        if start + self._unspilled <= self.capacity:
+            index = slice(start, start + self._unspilled)
+        else:
+            index = np.r_[start:self.capacity, 0:self._next]
+        self._spill({name: getattr(self, name)[index] for name in self.COLUMNS})
+        self._unspilled = 0
+
+    def _spill(self, columns: Dict[str, np.ndarray]):
+        for name, values in columns.items():
+            with open(os.path.join(self.spill_dir, f'{name}.bin'), 'ab') as f:
+                np.ascontiguousarray(values, dtype=self.COLUMNS[name][0]).tofile(f)
+
+    @classmethod
+    def load_spilled(cls, spill_dir: str) -> Dict[str, np.ndarray]:
+        """Memory-map the full spilled history, one array per column"""
+        columns = {}
+        for name, (dtype, shape) in cls.COLUMNS.items():
+            path = os.path.join(spill_dir, f'{name}.bin')
+            if not os.path.exists(path) or not os.path.getsize(path):
+                columns[name] = np.empty((0,) + shape, dtype=dtype)
+                continue
+            rows = os.path.getsize(path) // (np.dtype(dtype).itemsize * int(np.prod(shape)))
+            columns[name] = np.memmap(path, dtype=dtype, mode='r', shape=(rows,) + shape)
+        return columns
+
 
 class OumiRLAgent:
     """
@@ -167,19 +488,33 @@ class OumiRLAgent:
         learning_rate: float = 0.01,
         discount_factor: float = 0.95,
         epsilon: float = 0.2,
+        history_capacity: int = 100_000,
+        history_spill_dir: Optional[str] = None,
+        replay_capacity: int = 0,
+        replay_batch_size: int = 256,
+        prioritized_replay: bool = False,
+        rng: Optional[np.random.Generator] = None,
     ):
         self.learning_rate = learning_rate
         self.discount_factor = discount_factor
         self.epsilon = epsilon
 
+        # Exploration, initial weights and replay sampling share one stream
+        # (see random_streams.py); scalar draws are buffered
+        self.draws = BufferedDraws(rng)
+        self.rng = self.draws.generator
+
         # Q-function approximation: state-action value weights
-        self.weights = {
-            'rescue': np.random.randn(8) * 0.1,  # 5 state + 3 action features
-            'medical': np.random.randn(8) * 0.1,
-            'logistics': np.random.randn(8) * 0.1,
-        }
+        initial = self.rng.standard_normal((len(ACTION_TYPES), 8)) * 0.1  # 5 state + 3 action features
+        self.weights = {action_type: initial[t] for t, action_type in enumerate(ACTION_TYPES)}
 
-        self.training_history = []
+        self.training_history = TrainingHistory(history_capacity, history_spill_dir)
+        self.episodes_trained = 0
+
+        # Optional experience replay (disabled when replay_capacity is 0)
+        self.replay = ReplayBuffer(replay_capacity, rng=self.rng) if replay_capacity else None
+        self.replay_batch_size = replay_batch_size
+        self.prioritized_replay = prioritized_replay
 
     def features(self, state: DisasterState, action: DisasterAction) -> np.ndarray:
         """Extract features from state-action pair"""
@@ -200,53 +535,98 @@ class OumiRLAgent:
         Returns: (action, action_type)
         """
         # Epsilon-greedy exploration
-        if explore and random.random() < self.epsilon:
+        draws = self.draws
+        if explore and draws.random() < self.epsilon:
             # Random action
-            action_type = random.choice(['rescue', 'medical', 'logistics'])
+            action_type = draws.choice(ACTION_TYPES)
+            high = min(10, state.available_resources) + 1
             action = DisasterAction(
-                rescue_allocation=random.randint(0, min(10, state.available_resources)),
-                medical_deployment=random.randint(0, min(10, state.available_resources)),
-                logistics_routing=random.randint(0, min(10, state.available_resources)),
+                rescue_allocation=draws.integers(0, high),
+                medical_deployment=draws.integers(0, high),
+                logistics_routing=draws.integers(0, high),
             )
         else:
-            # Greedy action: select best action
-            best_q = -float('inf')
-            best_action = None
-            best_type = 'rescue'
-
-            for action_type in ['rescue', 'medical', 'logistics']:
-                # Generate candidate actions
-                for i in range(5):  # Sample 5 actions per type
-                    if action_type == 'rescue':
-                        action = DisasterAction(
-                            rescue_allocation=min(state.severity * 3, 10),
-                            medical_deployment=random.randint(1, 5),
-                            logistics_routing=random.randint(1, 5),
-                        )
-                    elif action_type == 'medical':
-                        action = DisasterAction(
-                            rescue_allocation=random.randint(1, 5),
-                            medical_deployment=min(state.severity * 3, 10),
-                            logistics_routing=random.randint(1, 5),
-                        )
-                    else:  # logistics
-                        action = DisasterAction(
-                            rescue_allocation=random.randint(1, 5),
-                            medical_deployment=random.randint(1, 5),
-                            logistics_routing=min(state.severity * 3, 10),
-                        )
-
-                    q = self.q_value(state, action, action_type)
-                    if q > best_q:
-                        best_q = q
-                        best_action = action
-                        best_type = action_type
-
-            action = best_action or DisasterAction(5, 5, 5)
-            action_type = best_type
+            # Greedy action: exact argmax over the allocation grid
+            actions, action_types = self.greedy_action_batch(DisasterStateBatch.from_states([state]))
+            action = actions[0]
+            action_type = ACTION_TYPES[action_types[0]]
 
         return action, action_type
 
+    def select_action_batch(
+        self,
+        states: DisasterStateBatch,
+        explore: bool = True
+    ) -> Tuple[DisasterActionBatch, np.ndarray]:
+        """
+        Vectorized `select_action` over a batch of states
+
+        Returns: (actions, action_types) where action_types indexes ACTION_TYPES
+        """
+        n = len(states)
+        num_types = len(ACTION_TYPES)
+        actions, action_types = self.greedy_action_batch(states)
+        chosen = np.column_stack([
+            actions.rescue_allocation, actions.medical_deployment, actions.logistics_routing
+        ])
+
+        if explore:
+            explore_mask = self.rng.random(n) < self.epsilon
+            num_explore = int(explore_mask.sum())
+            if num_explore:
+                high = np.minimum(10, states.available_resources[explore_mask]) + 1
+                action_types[explore_mask] = self.rng.integers(0, num_types, size=num_explore)
+                chosen[explore_mask] = self.rng.integers(0, high[:, None], size=(num_explore, 3))
+
+        actions = DisasterActionBatch(chosen[:, 0], chosen[:, 1], chosen[:, 2])
+        return actions, action_types
+
+    def greedy_action_batch(self, states: DisasterStateBatch) -> Tuple[DisasterActionBatch, np.ndarray]:
+        """
+        Deterministic greedy action for each state in a batch
+
+        Q is linear in the three allocations and every unit costs one resource,
+        so the argmax over the 0-10 allocation grid with a total of at most
+        `available_resources` units is found by filling allocations in
+        decreasing order of their (positive) weight. The per-type candidates
+        are then scored for all states with one matrix product.
+
+        Returns: (actions, action_types) where action_types indexes ACTION_TYPES
+        """
+        chosen, action_types, _ = self._greedy(states.to_matrix(), states.available_resources)
+        actions = DisasterActionBatch(chosen[:, 0], chosen[:, 1], chosen[:, 2])
+        return actions, action_types
+
+    def max_q_batch(self, state_matrix: np.ndarray, budgets: np.ndarray) -> np.ndarray:
+        """Greedy Q-value max_a Q(s, a) for each row of a state feature matrix"""
+        return self._greedy(state_matrix, budgets)[2]
+
+    def _greedy(
+        self,
+        state_matrix: np.ndarray,
+        budgets: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns: (allocations (n, 3), action_types, q_values) of the greedy actions"""
+        n = len(state_matrix)
+        weights = np.stack([self.weights[t] for t in ACTION_TYPES])  # (types, 8)
+        action_weights = weights[:, 5:]
+        type_index = np.arange(len(ACTION_TYPES))
+
+        # Best allocation per (state, action type) under the resource budget
+        allocations = np.zeros((n, len(ACTION_TYPES), 3), dtype=np.int64)
+        remaining = np.repeat(np.maximum(budgets, 0)[:, None], len(ACTION_TYPES), axis=1)
+        fill_order = np.argsort(-action_weights, axis=1, kind='stable')
+        for rank in range(3):
+            column = fill_order[:, rank]
+            units = np.where(action_weights[type_index, column] > 0, np.minimum(remaining, 10), 0)
+            allocations[:, type_index, column] = units
+            remaining -= units
+
+        q = state_matrix @ weights[:, :5].T + np.einsum('nta,ta->nt', allocations / 10.0, action_weights)
+        action_types = q.argmax(axis=1)
+        rows = np.arange(n)
+        return allocations[rows, action_types], action_types, q[rows, action_types]
+
     def update(
         self,
         state: DisasterState,
@@ -276,56 +656,165 @@ class OumiRLAgent:
         self.weights[action_type] += self.learning_rate * td_error * features
 
         # Log training step
-        self.training_history.append({
-            'state': state.to_vector().tolist(),
-            'action': action.to_vector().tolist(),
-            'action_type': action_type,
-            'reward': reward,
-            'td_error': td_error,
-            'q_value': q_current,
-        })
+        self.training_history.append(
+            features[:5], features[5:], ACTION_TYPES.index(action_type),
+            reward, td_error, q_current,
+        )
+
+    def update_batch(
+        self,
+        features: np.ndarray,
+        action_types: np.ndarray,
+        rewards: np.ndarray,
+        importance_weights: Optional[np.ndarray] = None,
+        record: bool = True,
+        next_q: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Minibatch TD update of all three weight vectors at once
+
+        Each action type's weights step along the (importance-weighted) mean
+        TD gradient of its n rows at rate learning_rate * sqrt(n), so large
+        batches still make progress comparable to scalar training; a plain
+        mean step at learning_rate would make a whole batch worth one scalar
+        update. The rate is capped at n / sum of the rows' squared feature
+        norms (the normalized LMS bound), which keeps the step stable for any
+        batch size and learning rate. `next_q` holds max_a Q(s', a) per row (0 for terminal
+        transitions); without it every row is treated as terminal. With
+        record=False the rows are not logged to training_history (used for
+        replayed transitions). Episodes are counted by the simulator's
+        runners, not here, since a multi-step episode spans several rows.
+
+        Returns: TD errors per row, measured before the update
+        """
+        weights = np.stack([self.weights[t] for t in ACTION_TYPES])  # (types, 8)
+        q_current = np.einsum('nf,nf->n', features, weights[action_types])
+        td_targets = rewards if next_q is None else rewards + self.discount_factor * next_q
+        td_errors = td_targets - q_current
+
+        scaled = td_errors if importance_weights is None else td_errors * importance_weights
+        gradients = np.zeros_like(weights)
+        np.add.at(gradients, action_types, scaled[:, None] * features)
+        counts = np.bincount(action_types, minlength=len(ACTION_TYPES))
+        squared_norms = np.bincount(
+            action_types, weights=np.einsum('nf,nf->n', features, features), minlength=len(ACTION_TYPES)
+        )
+        rates = np.minimum(self.learning_rate * np.sqrt(counts), counts / np.maximum(squared_norms, 1e-12))
+        weights += (rates / np.maximum(counts, 1))[:, None] * gradients
+
+        for t, action_type in enumerate(ACTION_TYPES):
+            self.weights[action_type] = weights[t]
+
+        if record:
+            self.training_history.extend(
+                features[:, :5], features[:, 5:], action_types, rewards, td_errors, q_current,
+            )
+
+        return td_errors
+
+    def learn_from_replay(self) -> Optional[np.ndarray]:
+        """
+        Apply one minibatch update sampled from the replay buffer
+
+        Returns: TD errors of the sampled rows, or None if replay is disabled
+        or the buffer does not hold a full minibatch yet
+        """
+        if self.replay is None or len(self.replay) < self.replay_batch_size:
+            return None
+
+        batch = self.replay.sample(self.replay_batch_size, prioritized=self.prioritized_replay)
+        next_q = np.where(
+            batch['dones'], 0.0, self.max_q_batch(batch['next_states'], batch['next_budgets'])
+        )
+        td_errors = self.update_batch(
+            batch['features'], batch['action_types'], batch['rewards'],
+            batch['importance_weights'], record=False, next_q=next_q,
+        )
+        self.replay.update_priorities(batch['indices'], td_errors)
+        return td_errors
 
     def save_policy(self, filepath: str):
-        """Save learned policy to file"""
-        policy_data = {
-            'weights': {k: v.tolist() for k, v in self.weights.items()},
-            'hyperparameters': {
-                'learning_rate': self.learning_rate,
-                'discount_factor': self.discount_factor,
-                'epsilon': self.epsilon,
-            },
-            'training_episodes': len(self.training_history),
-            'timestamp': datetime.now().isoformat(),
+        """
+        Save learned policy to file
+
+        Paths ending in .json are written as JSON; any other extension uses
+        the binary format from policy_format.py.
+        """
+        hyperparameters = {
+            'learning_rate': self.learning_rate,
+            'discount_factor': self.discount_factor,
+            'epsilon': self.epsilon,
         }
 
-        with open(filepath, 'w') as f:
-            json.dump(policy_data, f, indent=2)
+        if filepath.endswith('.json'):
+            policy_data = {
+                'weights': {k: v.tolist() for k, v in self.weights.items()},
+                'hyperparameters': hyperparameters,
+                'training_episodes': self.episodes_trained,
+                'timestamp': datetime.now().isoformat(),
+            }
+
+            with open(filepath, 'w') as f:
+                json.dump(policy_data, f, indent=2)
+        else:
+            write_binary_policy(filepath, self.weights, hyperparameters, self.episodes_trained)
 
         print(f"Policy saved to {filepath}")
 
-    def load_policy(self, filepath: str):
-        """Load learned policy from file"""
-        with open(filepath, 'r') as f:
-            policy_data = json.load(f)
+    def load_policy(self, filepath: str, mmap: bool = False):
+        """
+        Load learned policy from a JSON or binary file
 
-        self.weights = {k: np.array(v) for k, v in policy_data['weights'].items()}
+        With mmap=True a binary policy is loaded as read-only views into a
+        shared memory mapping (for serving, not further training).
+        """
+        self.weights, _ = load_policy_weights(filepath, mmap=mmap)
         print(f"Policy loaded from {filepath}")
 
 
 class DisasterSimulator:
-    """Simulates disaster scenarios for RL training"""
+    """
+    Simulates disaster scenarios for RL training
+
+    Single-step episodes score one decision per disaster. Multi-step
+    episodes (`run_multistep_episode`, `run_multistep_batch`) continue for up
+    to `horizon` decision rounds of `step_hours` each: deployed units are
+    used up, the response delay grows and new alerts keep arriving, so the
+    agent learns from real (state, action, next_state) transitions. An
+    episode ends early only once every alert is resolved; running out of
+    units does not end it, so spending the whole budget at once carries a
+    cost in the later rounds.
+
+    All randomness comes from `rng` (a fresh stream if not given), so a
+    seeded generator reproduces the same episodes.
+    """
 
-    def __init__(self):
+    def __init__(self, step_hours: float = 2.0, rng: Optional[np.random.Generator] = None):
         self.reward_fn = RewardFunction()
+        self.step_hours = step_hours
+        # Scalar methods use buffered draws, batch methods the generator itself
+        self.draws = BufferedDraws(rng)
+        self.rng = self.draws.generator
 
     def generate_state(self) -> DisasterState:
         """Generate random disaster state"""
+        draws = self.draws
         return DisasterState(
-            severity=random.randint(0, 3),
-            num_alerts=random.randint(1, 10),
-            response_delay=random.uniform(0, 12),
-            available_resources=random.randint(5, 20),
-            disaster_type=random.choice(['earthquake', 'flood', 'fire', 'hurricane']),
+            severity=draws.integers(0, 4),
+            num_alerts=draws.integers(1, 11),
+            response_delay=draws.uniform(0, 12),
+            available_resources=draws.integers(5, 21),
+            disaster_type=DISASTER_TYPES[draws.integers(0, 4)],  # earthquake..hurricane
+        )
+
+    def generate_state_batch(self, batch_size: int) -> DisasterStateBatch:
+        """Generate a batch of random disaster states with the same ranges as generate_state"""
+        return DisasterStateBatch(
+            severity=self.rng.integers(0, 4, size=batch_size),
+            num_alerts=self.rng.integers(1, 11, size=batch_size),
+            response_delay=self.rng.uniform(0, 12, size=batch_size),
+            available_resources=self.rng.integers(5, 21, size=batch_size),
+            disaster_type=self.rng.integers(0, 4, size=batch_size),  # earthquake..hurricane
         )
 
     def simulate_outcome(self, state: DisasterState, action: DisasterAction) -> Dict:
@@ -340,7 +829,7 @@ class DisasterSimulator:
         # Simulate people helped
         severity_factor = (state.severity + 1) * 250
         action_factor = action.total_resources() / 15.0
-        people_helped = int(severity_factor * action_factor * random.uniform(0.7, 1.3))
+        people_helped = int(severity_factor * action_factor * self.draws.uniform(0.7, 1.3))
 
         return {
             'response_time_hours': response_time,
@@ -348,6 +837,67 @@ class DisasterSimulator:
             'resources_used': action.total_resources(),
         }
 
+    def simulate_outcome_batch(
+        self,
+        states: DisasterStateBatch,
+        actions: DisasterActionBatch
+    ) -> Dict[str, np.ndarray]:
+        """Vectorized `simulate_outcome`, returning one array per outcome field"""
+        resources_used = actions.total_resources()
+        response_time = np.maximum(states.response_delay - resources_used / 10.0, 0.5)
+
+        severity_factor = (states.severity + 1) * 250
+        action_factor = resources_used / 15.0
+        noise = self.rng.uniform(0.7, 1.3, size=len(states))
+        people_helped = (severity_factor * action_factor * noise).astype(np.int64)
+
+        return {
+            'response_time_hours': response_time,
+            'people_helped': people_helped,
+            'resources_used': resources_used,
+        }
+
+    def next_state(
+        self,
+        state: DisasterState,
+        action: DisasterAction
+    ) -> Optional[DisasterState]:
+        """Advance a state by one decision round; None once the episode is over"""
+        resources_used = min(action.total_resources(), state.available_resources)
+        new_alerts = self.draws.poisson(0.5 * (state.severity + 1))
+        resolved_alerts = action.total_resources() // 3
+
+        next_state = DisasterState(
+            severity=state.severity,
+            num_alerts=max(state.num_alerts + new_alerts - resolved_alerts, 0),
+            response_delay=state.response_delay + self.step_hours,
+            available_resources=state.available_resources - resources_used,
+            disaster_type=state.disaster_type,
+        )
+        if next_state.num_alerts == 0:
+            return None
+        return next_state
+
+    def next_state_batch(
+        self,
+        states: DisasterStateBatch,
+        actions: DisasterActionBatch
+    ) -> Tuple[DisasterStateBatch, np.ndarray]:
+        """Vectorized `next_state`. Returns: (next_states, done)"""
+        total = actions.total_resources()
+        resources_used = np.minimum(total, states.available_resources)
+        new_alerts = self.rng.poisson(0.5 * (states.severity + 1))
+
+        next_states = DisasterStateBatch(
+            severity=states.severity,
+            num_alerts=np.maximum(states.num_alerts + new_alerts - total // 3, 0),
+            response_delay=states.response_delay + self.step_hours,
+            available_resources=states.available_resources - resources_used,
+            disaster_type=states.disaster_type,
+        )
+        done = next_states.num_alerts == 0
+        return next_states, done
+
     def run_episode(self, agent: OumiRLAgent) -> float:
         """Run one training episode"""
         state = self.generate_state()
@@ -356,16 +906,172 @@ class DisasterSimulator:
         reward = self.reward_fn.calculate(state, action, outcome)
 
         agent.update(state, action, action_type, reward)
+        agent.episodes_trained += 1
+
+        if agent.replay is not None:
+            features = agent.features(state, action)[None, :]
+            agent.replay.add(features, np.array([ACTION_TYPES.index(action_type)]), np.array([reward]))
+            agent.learn_from_replay()
 
         return reward
 
+    def run_batch(self, agent: OumiRLAgent, batch_size: int) -> np.ndarray:
+        """Run a batch of independent training episodes with one vectorized update"""
+        states = self.generate_state_batch(batch_size)
+        actions, action_types = agent.select_action_batch(states, explore=True)
+        outcomes = self.simulate_outcome_batch(states, actions)
+        rewards = self.reward_fn.calculate_batch(
+            states.severity, states.num_alerts, states.available_resources,
+            actions.rescue_allocation, actions.medical_deployment, actions.logistics_routing,
+            outcomes['response_time_hours'], outcomes['people_helped'],
+        )
+
+        features = np.concatenate([states.to_matrix(), actions.to_matrix()], axis=1)
+        agent.update_batch(features, action_types, rewards)
+        agent.episodes_trained += batch_size
+
+        if agent.replay is not None:
+            agent.replay.add(features, action_types, rewards)
+            agent.learn_from_replay()
+
+        return rewards
+
+    def run_multistep_episode(self, agent: OumiRLAgent, horizon: int = 5) -> float:
+        """Run one multi-step training episode and return its total reward"""
+        state = self.generate_state()
+        total_reward = 0.0
+
+        for step in range(horizon):
+            action, action_type = agent.select_action(state, explore=True)
+            outcome = self.simulate_outcome(state, action)
+            reward = self.reward_fn.calculate(state, action, outcome)
+            next_state = self.next_state(state, action) if step < horizon - 1 else None
+
+            agent.update(state, action, action_type, reward, next_state)
+            total_reward += reward
+
+            if agent.replay is not None:
+                features = agent.features(state, action)[None, :]
+                type_index = np.array([ACTION_TYPES.index(action_type)])
+                if next_state is None:
+                    agent.replay.add(features, type_index, np.array([reward]))
+                else:
+                    agent.replay.add(
+                        features, type_index, np.array([reward]),
+                        next_state.to_vector()[None, :],
+                        np.array([next_state.available_resources]), np.array([False]),
+                    )
+                agent.learn_from_replay()
+
+            if next_state is None:
+                break
+            state = next_state
+
+        agent.episodes_trained += 1
+        return total_reward
+
+    def run_multistep_batch(self, agent: OumiRLAgent, batch_size: int, horizon: int = 5) -> np.ndarray:
+        """
+        Step a batch of multi-step episodes in lockstep
 
-def train_agent(num_episodes: int = 1000) -> OumiRLAgent:
+        Finished episodes drop out of the active set, so each round costs one
+        vectorized select/simulate/update over the episodes still running.
+
+        Returns: total reward per episode
+        """
+        states = self.generate_state_batch(batch_size)
+        active = np.arange(batch_size)
+        total_rewards = np.zeros(batch_size)
+
+        for step in range(horizon):
+            actions, action_types = agent.select_action_batch(states, explore=True)
+            outcomes = self.simulate_outcome_batch(states, actions)
+            rewards = self.reward_fn.calculate_batch(
+                states.severity, states.num_alerts, states.available_resources,
+                actions.rescue_allocation, actions.medical_deployment, actions.logistics_routing,
+                outcomes['response_time_hours'], outcomes['people_helped'],
+            )
+            next_states, done = self.next_state_batch(states, actions)
+            if step == horizon - 1:
+                done[:] = True
+
+            next_matrix = next_states.to_matrix()
+            next_q = np.where(done, 0.0, agent.max_q_batch(next_matrix, next_states.available_resources))
+            features = np.concatenate([states.to_matrix(), actions.to_matrix()], axis=1)
+            agent.update_batch(features, action_types, rewards, next_q=next_q)
+
+            if agent.replay is not None:
+                agent.replay.add(
+                    features, action_types, rewards,
+                    next_matrix, next_states.available_resources, done,
+                )
+                agent.learn_from_replay()
+
+            total_rewards[active] += rewards
+            running = ~done
+            if not running.any():
+                break
+            states = next_states.subset(running)
+            active = active[running]
+
+        agent.episodes_trained += batch_size
+        return total_rewards
+
+
+def train_agent(
+    num_episodes: int = 1000,
+    batch_size: Optional[int] = None,
+    num_workers: int = 1,
+    sync_interval: int = 1000,
+    seed: int = 0,
+    replay_capacity: int = 0,
+    prioritized_replay: bool = False,
+    horizon: int = 1,
+    checkpoint_dir: Optional[str] = None,
+    checkpoint_every: int = 10000,
+    keep_checkpoints: int = 3,
+    resume: bool = False,
+    learning_rate: float = 0.01,
+    discount_factor: float = 0.95,
+    epsilon: float = 0.2,
+    metrics_file: Optional[str] = None,
+    metrics_port: Optional[int] = None,
+    telemetry=None,
+) -> OumiRLAgent:
     """
     Train Oumi RL agent on simulated disaster episodes
 
     Args:
         num_episodes: Number of training episodes
+        batch_size: If set, simulate and learn from episodes in vectorized
+            batches of this size instead of one at a time
+        num_workers: Worker processes; above 1, training runs in parallel
+            with weight averaging (see parallel_training.py)
+        sync_interval: Episodes per worker between weight merges
+        seed: Seed of the run. The agent and simulator get independent
+            streams derived from it, and parallel workers get one stream per
+            worker and sync round (see random_streams.py)
+        replay_capacity: If non-zero, keep this many transitions in an
+            experience replay buffer and add a replayed minibatch update
+            after every episode or batch (single-process training only)
+        prioritized_replay: Sample replayed transitions by TD error
+        horizon: Decision rounds per episode; above 1, episodes are
+            multi-step and updates bootstrap from the next state
+        checkpoint_dir: If set, write checkpoints here (see checkpointing.py)
+        checkpoint_every: Episodes between checkpoints; batched and parallel
+            runs checkpoint at the first batch or sync round boundary after
+        keep_checkpoints: Number of most recent checkpoints to retain (at least 1)
+        resume: Continue from the latest checkpoint in checkpoint_dir. With
+            the same settings, the result matches an uninterrupted run
+        learning_rate, discount_factor, epsilon: Agent hyperparameters
+            (see hyperparameter_sweep.py for tuning them)
+        metrics_file: If set, instrument training (see telemetry.py) and
+            write stage timings and TD-learning statistics here at every
+            progress report
+        metrics_port: If set, instrument training and serve Prometheus text
+            at http://127.0.0.1:<port>/metrics while it runs
+        telemetry: Telemetry instance to attach instead of a new one. With
+            num_workers > 1 only the main process is instrumented
 
     Returns:
         Trained agent
@@ -378,18 +1084,109 @@ def train_agent(num_episodes: int = 1000) -> OumiRLAgent:
     print("Action Space: rescue_allocation, medical_deployment, logistics_routing")
     print("Reward: +fast response, +high impact, +efficiency, -delays, -waste\n")
 
-    agent = OumiRLAgent(learning_rate=0.01, discount_factor=0.95, epsilon=0.2)
-    simulator = DisasterSimulator()
-
-    episode_rewards = []
-
-    for episode in range(num_episodes):
-        reward = simulator.run_episode(agent)
-        episode_rewards.append(reward)
+    agent_rng, simulator_rng = spawn_generators(seed, 2)
+    agent = OumiRLAgent(
+        learning_rate=learning_rate, discount_factor=discount_factor, epsilon=epsilon,
+        replay_capacity=replay_capacity, prioritized_replay=prioritized_replay, rng=agent_rng,
+    )
+    simulator = DisasterSimulator(rng=simulator_rng)
+
+    if telemetry is None and (metrics_file is not None or metrics_port is not None):
+        from telemetry import Telemetry
+        telemetry = Telemetry()
+
+    def report_metrics():
+        if telemetry is not None and metrics_file is not None:
+            telemetry.write_json(metrics_file)
+
+    episode_rewards = np.empty(num_episodes)
+    start = 0
+    sync_round = 0
+
+    # Everything except num_episodes must match on resume; a finished run
+    # can be extended by resuming with more episodes
+    config = {
+        'batch_size': batch_size, 'num_workers': num_workers, 'sync_interval': sync_interval,
+        'seed': seed, 'replay_capacity': replay_capacity,
+        'prioritized_replay': prioritized_replay, 'horizon': horizon,
+    }
+    if checkpoint_dir is not None:
+        from checkpointing import latest_checkpoint, restore_checkpoint, save_checkpoint
+
+        if keep_checkpoints < 1:
+            raise ValueError(f"keep_checkpoints must be at least 1, got {keep_checkpoints}")
+        checkpoint_path = latest_checkpoint(checkpoint_dir) if resume else None
+        if checkpoint_path is not None:
+            restored = restore_checkpoint(checkpoint_path, agent, config, simulator)
+            start = min(restored['episode'], num_episodes)
+            episode_rewards[:start] = restored['episode_rewards'][:start]
+            sync_round = restored['extra'].get('sync_round', 0)
+            print(f"Resuming from {checkpoint_path} at episode {start}")
+
+    def checkpoint(previous: int, done: int, extra: Optional[Dict] = None):
+        if checkpoint_dir is not None and (
+            done // checkpoint_every > previous // checkpoint_every or done == num_episodes
+        ):
+            save_checkpoint(
+                checkpoint_dir, agent, done, episode_rewards, config, extra, keep_checkpoints, simulator
+            )
 
-        if (episode + 1) % 100 == 0:
-            avg_reward = np.mean(episode_rewards[-100:])
-            print(f"Episode {episode + 1}/{num_episodes} | Avg Reward (last 100): {avg_reward:.2f}")
+    if telemetry is not None:
+        telemetry.attach(agent, simulator)
+    # Telemetry (and its metrics server) is detached and closed even if training fails
+    try:
+        if telemetry is not None and metrics_port is not None:
+            telemetry.serve(metrics_port)
+
+        if num_workers > 1:
+            from parallel_training import train_parallel
+
+            def on_round(done: int, rounds: int, round_rewards: np.ndarray):
+                episode_rewards[done - len(round_rewards):done] = round_rewards
+                checkpoint(done - len(round_rewards), done, {'sync_round': rounds})
+                report_metrics()
+
+            train_parallel(
+                agent, num_episodes, num_workers,
+                sync_interval=sync_interval, batch_size=batch_size, seed=seed, horizon=horizon,
+                start_episode=start, start_round=sync_round, on_round=on_round,
+            )
+        elif batch_size is None:
+            for episode in range(start, num_episodes):
+                if horizon > 1:
+                    episode_rewards[episode] = simulator.run_multistep_episode(agent, horizon)
+                else:
+                    episode_rewards[episode] = simulator.run_episode(agent)
+
+                if (episode + 1) % 100 == 0:
+                    avg_reward = np.mean(episode_rewards[episode - 99:episode + 1])
+                    print(f"Episode {episode + 1}/{num_episodes} | Avg Reward (last 100): {avg_reward:.2f}")
+                    report_metrics()
+                checkpoint(episode, episode + 1)
+        else:
+            # Report roughly ten times per run rather than every 100 episodes
+            report_every = max(100, num_episodes // 10)
+            done = start
+            while done < num_episodes:
+                size = min(batch_size, num_episodes - done)
+                if horizon > 1:
+                    episode_rewards[done:done + size] = simulator.run_multistep_batch(agent, size, horizon)
+                else:
+                    episode_rewards[done:done + size] = simulator.run_batch(agent, size)
+                previous, done = done, done + size
+
+                if done // report_every > previous // report_every or done == num_episodes:
+                    avg_reward = np.mean(episode_rewards[max(done - 100, 0):done])
+                    print(f"Episode {done}/{num_episodes} | Avg Reward (last 100): {avg_reward:.2f}")
+                    report_metrics()
+                checkpoint(previous, done)
+    finally:
+        if telemetry is not None:
+            try:
+                report_metrics()
+            finally:
+                telemetry.detach()
+                telemetry.close()
 
     # Save learned policy
     agent.save_policy('oumi-rl/learned_policy.json')
@@ -404,13 +1201,13 @@ def train_agent(num_episodes: int = 1000) -> OumiRLAgent:
     return agent
 
 
-def demonstrate_policy(agent: OumiRLAgent, num_demos: int = 5):
+def demonstrate_policy(agent: OumiRLAgent, num_demos: int = 5, rng: Optional[np.random.Generator] = None):
     """Demonstrate learned policy on sample scenarios"""
     print("\n" + "=" * 70)
     print("Policy Demonstration")
     print("=" * 70)
 
-    simulator = DisasterSimulator()
+    simulator = DisasterSimulator(rng=rng)
 
     for i in range(num_demos):
         print(f"\n--- Scenario {i + 1} ---")
@@ -428,11 +1225,59 @@ def demonstrate_policy(agent: OumiRLAgent, num_demos: int = 5):
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train the Oumi RL disaster response agent")
+    parser.add_argument("--episodes", type=int, default=1000, help="Number of training episodes")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Simulate episodes in vectorized batches of this size")
+    parser.add_argument("--workers", type=int, default=1, help="Number of parallel worker processes")
+    parser.add_argument("--sync-interval", type=int, default=1000,
+                        help="Episodes per worker between weight merges")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for all of the run's random streams")
+    parser.add_argument("--replay-capacity", type=int, default=0,
+                        help="Experience replay buffer size (0 disables replay)")
+    parser.add_argument("--prioritized-replay", action="store_true",
+                        help="Sample replayed transitions by TD error")
+    parser.add_argument("--horizon", type=int, default=1,
+                        help="Decision rounds per episode (multi-step when above 1)")
+    parser.add_argument("--checkpoint-dir", default=None, help="Directory for periodic training checkpoints")
+    parser.add_argument("--checkpoint-every", type=int, default=10000, help="Episodes between checkpoints")
+    parser.add_argument("--keep-checkpoints", type=int, default=3, help="Number of checkpoints to retain (at least 1)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue from the latest checkpoint in --checkpoint-dir")
+    parser.add_argument("--learning-rate", type=float, default=0.01)
+    parser.add_argument("--discount-factor", type=float, default=0.95)
+    parser.add_argument("--epsilon", type=float, default=0.2, help="Exploration rate")
+    parser.add_argument("--metrics-file", default=None,
+                        help="Instrument training and write stage timings / TD statistics here")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Instrument training and serve Prometheus metrics on this port")
+    args = parser.parse_args()
+
     # Train the agent
-    agent = train_agent(num_episodes=1000)
+    agent = train_agent(
+        num_episodes=args.episodes,
+        batch_size=args.batch_size,
+        num_workers=args.workers,
+        sync_interval=args.sync_interval,
+        seed=args.seed,
+        replay_capacity=args.replay_capacity,
+        prioritized_replay=args.prioritized_replay,
+        horizon=args.horizon,
+        checkpoint_dir=args.checkpoint_dir,
+        checkpoint_every=args.checkpoint_every,
+        keep_checkpoints=args.keep_checkpoints,
+        resume=args.resume,
+        learning_rate=args.learning_rate,
+        discount_factor=args.discount_factor,
+        epsilon=args.epsilon,
+        metrics_file=args.metrics_file,
+        metrics_port=args.metrics_port,
+    )
 
     # Demonstrate learned policy
-    demonstrate_policy(agent, num_demos=5)
+    demonstrate_policy(agent, num_demos=5, rng=np.random.default_rng(args.seed))
 
     print("\n" + "=" * 70)
     print("Oumi RL training complete! Policy ready for deployment.")